@@ -0,0 +1,125 @@
+import asyncio
+from concurrent.futures import Executor
+from contextlib import nullcontext, AbstractContextManager
+from functools import partial
+from typing import Optional, Callable, TypeVar, Coroutine, Any, Sequence
+
+T = TypeVar("T")
+
+
+class ExecutorAdapter:
+    """
+    Base of adapters that run the blocking calls of a synchronous object in an executor, so that they can be awaited.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        lock: Optional[asyncio.Lock] = None,
+        thread_lock: Optional[AbstractContextManager] = None,
+    ):
+        """
+        Constructor.
+        :param executor: executor to run blocking calls in (the running event loop's default executor if `None`).
+                         Adapters sharing an executor share its threads, regardless of how many adapters there are
+        :param lock: lock to hold whilst running blocking calls, so that calls to an object that is not thread safe are
+                     run one at a time. Calls waiting for the lock are suspended, rather than occupying a thread
+        :param thread_lock: lock to hold in the executor's thread whilst running blocking calls, so that they are also
+                            run one at a time with users of the object in other threads
+        """
+        self._executor = executor
+        self._lock = lock
+        self._thread_lock = thread_lock
+
+    async def _run_blocking(self, callable: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Runs the given blocking callable in the executor, under the adapter's locks.
+        :param callable: callable to run
+        :param args: args for the callable
+        :param kwargs: kwargs for the callable
+        :return: result of the callable
+        """
+        locks = (self._lock,) if self._lock is not None else ()
+        return await self._run_blocking_under(locks, self._thread_lock, callable, *args, **kwargs)
+
+    async def _run_blocking_under(
+        self,
+        locks: Sequence[asyncio.Lock],
+        thread_lock: Optional[AbstractContextManager],
+        callable: Callable[..., T],
+        *args,
+        **kwargs,
+    ) -> T:
+        """
+        Runs the given blocking callable in the executor, holding the given locks until it has completed.
+
+        A call cannot be stopped once it is running in the executor, so if the awaiting task is cancelled (e.g. by a
+        timeout) the locks are still held until the call completes.
+        :param locks: locks to hold, acquired in order
+        :param thread_lock: lock to hold in the executor's thread whilst running the callable
+        :param callable: callable to run
+        :param args: args for the callable
+        :param kwargs: kwargs for the callable
+        :return: result of the callable
+        """
+        acquired = []
+
+        def release(_: Optional[asyncio.Future] = None):
+            for lock in reversed(acquired):
+                lock.release()
+
+        try:
+            for lock in locks:
+                await lock.acquire()
+                acquired.append(lock)
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, partial(_call_under, thread_lock, callable, *args, **kwargs)
+            )
+        except BaseException:
+            release()
+            raise
+        future.add_done_callback(release)
+        return await asyncio.shield(future)
+
+
+def _call_under(thread_lock: Optional[AbstractContextManager], callable: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Calls the given callable, holding the given lock.
+    :param thread_lock: lock to hold (none if `None`)
+    :param callable: callable to call
+    :param args: args for the callable
+    :param kwargs: kwargs for the callable
+    :return: result of the callable
+    """
+    with thread_lock if thread_lock is not None else nullcontext():
+        return callable(*args, **kwargs)
+
+
+class EventLoopAdapter:
+    """
+    Base of adapters that expose an asynchronous object synchronously, by running its coroutines on an event loop that
+    is running in another thread.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        """
+        Constructor.
+        :param loop: event loop to run coroutines on
+        """
+        self._loop = loop
+
+    def _run_coroutine(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Runs the given coroutine on the event loop, blocking until it completes.
+        :param coroutine: coroutine to run
+        :return: result of the coroutine
+        :raises RuntimeError: if called from the event loop's thread (which would deadlock)
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            coroutine.close()
+            raise RuntimeError("Cannot block on a coroutine from the thread running its event loop")
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
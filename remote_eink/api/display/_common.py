@@ -1,6 +1,7 @@
 from http import HTTPStatus
 from itertools import product
-from typing import Callable, Any, Optional, Iterator, List, Union
+from threading import RLock
+from typing import Callable, Any, Optional, Iterator, List, Union, Iterable, TypeVar, Hashable
 
 from flask import current_app, make_response
 from marshmallow import Schema, fields
@@ -9,13 +10,15 @@ from more_itertools import flatten
 from remote_eink.app import APP_ID_PROPERTY
 from remote_eink.app_data import apps_data
 from remote_eink.controllers.base import DisplayController
-from remote_eink.drivers.base import DisplayDriver
+from remote_eink.drivers.base import DisplayDriver, NativeFormat
 from remote_eink.images import ImageType, Image
-from remote_eink.storage.image.base import ImageStore
+from remote_eink.storage.image.base import ImageStore, ImageIdPage
 from remote_eink.transformers import ImageTransformerSequence, ImageTransformer
 
 CONTENT_TYPE_HEADER = "Content-Type"
 
+T = TypeVar("T")
+
 ImageTypeToMimeTypes = {
     ImageType.BMP: ("image/bmp",),
     ImageType.JPG: ("image/jpeg", "image/jpg"),
@@ -66,30 +69,30 @@ def to_target_process(wrappable: Callable) -> Callable:
             app_id = current_app.config[APP_ID_PROPERTY]
         kwargs["target_process"] = True
         kwargs["app_id"] = app_id
-        return _on_target_process(unwrapped, *args, **kwargs)
+        # Calls to the same display are handled one at a time, so are queued together
+        return _on_target_process(unwrapped, *args, dispatch_queue=kwargs.get("displayId"), **kwargs)
 
     return wrapped
 
 
-def _on_target_process(callable: Callable, *args, **kwargs) -> Any:
+def _on_target_process(callable: Callable, *args, dispatch_queue: Optional[Hashable] = None, **kwargs) -> Any:
     """
     Executes the given callable it on the "target" process (that which instantiated `AppData` and is  listening to
-    requests on a `CommunicationPipe`).
+    requests on a `CommunicationPipe`), see `AppData.dispatch`.
     :param callable: callable to execute on target process
+    :param dispatch_queue: see `AppData.dispatch`
     :return: return from the target process
     """
     with current_app.app_context():
         app_id = current_app.config[APP_ID_PROPERTY]
 
-    app_data = apps_data[app_id]
-    communication_pipe = app_data.communication_pipe
-
-    return communication_pipe.sender.communicate(callable, *args, **kwargs)
+    return apps_data[app_id].dispatch(callable, *args, dispatch_queue=dispatch_queue, **kwargs)
 
 
 def _display_id_handler(wrappable: Callable) -> Callable:
     """
-    Converts `displayId` to `display_controller` in the response handler.
+    Converts `displayId` to `display_controller` in the response handler, which is called holding the display
+    controller's lock (see `AppData.get_display_controller_lock`).
     :param wrappable: handler to wrap, where the `displayId` is the first positional or kwarg (with no args)
     :return: handler wrapped in layer to take display ID, validate it and then pass the corresponding display controller
              to the handler
@@ -102,14 +105,17 @@ def _display_id_handler(wrappable: Callable) -> Callable:
             raise AssertionError(
                 "Expected `app_id` data (is the annotation placed _after_ `to_target_process`?)"
             ) from e
+        app_data = apps_data[app_id]
         try:
-            display_controller = apps_data[app_id].display_controllers[displayId]
+            display_controller = app_data.display_controllers[displayId]
             if not isinstance(display_controller, DisplayController):
                 raise AssertionError("Unexpected type of display controller")
+            lock = app_data.get_display_controller_lock(displayId)
         except KeyError:
             raise DisplayControllerNotFoundError(displayId)
         assert "display_controller" not in kwargs
-        return wrappable(*args, display_controller=display_controller, **kwargs)
+        with lock:
+            return wrappable(*args, display_controller=display_controller, **kwargs)
 
     return wrapped
 
@@ -126,22 +132,35 @@ class RemoteThreadBase:
         self.display_id = display_id
         self._remote_object_factory = remote_object_factory
 
-    @to_target_process
     @_add_display_id
+    @to_target_process
     @_display_id_handler
     def _call_on_remote(self, method, *args, display_controller: DisplayController, **kwargs) -> Any:
         assert isinstance(display_controller, DisplayController)
         return getattr(self._remote_object_factory(display_controller), method)(*args, **kwargs)
 
+    @_add_display_id
     @to_target_process
+    @_display_id_handler
+    def snapshot(self, serialiser: Callable[[Any], T], display_controller: DisplayController) -> T:
+        """
+        Serialises the remote object on the target process, so that all the fields read by the serialiser are gathered
+        in a single round trip (rather than one per field read through this proxy).
+        :param serialiser: function that serialises the remote object, e.g. a module-level function that dumps a schema
+        :return: the serialised object
+        """
+        assert isinstance(display_controller, DisplayController)
+        return serialiser(self._remote_object_factory(display_controller))
+
     @_add_display_id
+    @to_target_process
     @_display_id_handler
     def _set_on_remote(self, property_name: str, value: Any, display_controller: DisplayController) -> Any:
         assert isinstance(display_controller, DisplayController)
         return setattr(self._remote_object_factory(display_controller), property_name, value)
 
-    @to_target_process
     @_add_display_id
+    @to_target_process
     @_display_id_handler
     def _read_on_remote(self, property_name: str, display_controller: DisplayController) -> Any:
         assert isinstance(display_controller, DisplayController)
@@ -171,10 +190,18 @@ class RemoteThreadDisplayController(DisplayController, RemoteThreadBase):
 
     @property
     def image_transformers(self) -> ImageTransformerSequence:
-        return self._read_on_remote("image_transformers")
+        # Not read from the display controller, which would return the live sequence if dispatched directly
+        return RemoteThreadImageTransformerSequence(self.display_id)
+
+    @property
+    def lock(self) -> RLock:
+        # Calls are made holding the display controller's lock on the target process, so this only serialises the use
+        # of the proxy in this process
+        return self._lock
 
     def __init__(self, display_id: str):
         super().__init__(display_id, lambda display_controller: display_controller)
+        self._lock = RLock()
 
     def display(self, image_id: str):
         return self._call_on_remote("display", image_id)
@@ -191,6 +218,10 @@ class RemoteThreadImageStore(ImageStore, RemoteThreadBase):
     def friendly_type_name(self) -> str:
         return self._read_on_remote("friendly_type_name")
 
+    @property
+    def spool_directory(self) -> Optional[str]:
+        return self._read_on_remote("spool_directory")
+
     def __init__(self, display_id: str):
         super().__init__(display_id, lambda display_controller: display_controller.image_store)
 
@@ -215,6 +246,23 @@ class RemoteThreadImageStore(ImageStore, RemoteThreadBase):
     def remove(self, image_id: str) -> bool:
         return self._call_on_remote("remove", image_id)
 
+    def get_thumbnail(
+        self, image_id: str, width: Optional[int] = None, height: Optional[int] = None
+    ) -> Optional[Image]:
+        return self._call_on_remote("get_thumbnail", image_id, width, height)
+
+    def list_ids(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> ImageIdPage:
+        return self._call_on_remote("list_ids", limit, cursor)
+
+    def add_many(self, images: Iterable[Image]):
+        return self._call_on_remote("add_many", list(images))
+
+    def remove_many(self, image_ids: Iterable[str]) -> List[str]:
+        return self._call_on_remote("remove_many", list(image_ids))
+
+    def replace_many(self, images: Iterable[Image], remove_image_ids: Iterable[str] = ()) -> List[str]:
+        return self._call_on_remote("replace_many", list(images), list(remove_image_ids))
+
 
 class RemoteThreadDisplayDriver(DisplayDriver, RemoteThreadBase):
     @property
@@ -225,6 +273,10 @@ class RemoteThreadDisplayDriver(DisplayDriver, RemoteThreadBase):
     def image(self) -> Optional[Image]:
         return self._read_on_remote("image")
 
+    @property
+    def native_format(self) -> Optional[NativeFormat]:
+        return self._read_on_remote("native_format")
+
     def __init__(self, display_id: str):
         super().__init__(display_id, lambda display_controller: display_controller.driver)
 
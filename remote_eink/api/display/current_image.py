@@ -1,18 +1,20 @@
 from http import HTTPStatus
+from typing import Optional, Any
 
 from remote_eink.api.display._common import (
     ImageSchema,
     RemoteThreadDisplayController,
     handle_display_controller_not_found_response,
 )
+from remote_eink.controllers.base import DisplayController
 
 
 @handle_display_controller_not_found_response
 def search(displayId: str):
-    display_controller = RemoteThreadDisplayController(displayId)
-    if display_controller.current_image is None:
+    current_image = RemoteThreadDisplayController(displayId).snapshot(_serialise_current_image)
+    if current_image is None:
         return None, HTTPStatus.NOT_FOUND
-    return ImageSchema(only=["identifier"]).dump(display_controller.current_image), HTTPStatus.OK
+    return current_image, HTTPStatus.OK
 
 
 @handle_display_controller_not_found_response
@@ -35,3 +37,14 @@ def put(displayId: str, body: dict):
         return f"Image not found: {image_id}", HTTPStatus.BAD_REQUEST
     display_controller.display(image_id)
     return f"Image displayed: {image_id}", HTTPStatus.OK
+
+
+def _serialise_current_image(display_controller: DisplayController) -> Optional[dict[str, Any]]:
+    """
+    Serialises the current image of the given display controller, on the target process.
+    :param display_controller: display controller
+    :return: the serialised current image or `None` if there is no current image
+    """
+    if display_controller.current_image is None:
+        return None
+    return ImageSchema(only=["identifier"]).dump(display_controller.current_image)
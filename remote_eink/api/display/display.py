@@ -1,5 +1,5 @@
 from http import HTTPStatus
-from typing import Iterable
+from typing import Iterable, Any
 
 from marshmallow import Schema, fields
 
@@ -10,6 +10,7 @@ from remote_eink.api.display._common import (
     handle_display_controller_not_found_response,
 )
 from remote_eink.app_data import apps_data
+from remote_eink.controllers.base import DisplayController
 
 
 def search():
@@ -18,8 +19,7 @@ def search():
 
 @handle_display_controller_not_found_response
 def get(displayId: str):
-    display_controller = RemoteThreadDisplayController(displayId)
-    return _DisplayControllerSchema().dump(display_controller), HTTPStatus.OK
+    return RemoteThreadDisplayController(displayId).snapshot(_serialise_display_controller), HTTPStatus.OK
 
 
 @to_target_process
@@ -33,6 +33,15 @@ def _get_display_controller_ids(app_id: str) -> Iterable[str]:
     return tuple(app_data.display_controllers.keys())
 
 
+def _serialise_display_controller(display_controller: DisplayController) -> dict[str, Any]:
+    """
+    Serialises the given display controller, on the target process.
+    :param display_controller: display controller to serialise
+    :return: the serialised display controller
+    """
+    return _DisplayControllerSchema().dump(display_controller)
+
+
 class _DisplayControllerSchema(Schema):
     identifier = fields.Str(data_key="id")
     display_controller_type = fields.Function(
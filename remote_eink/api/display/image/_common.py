@@ -1,10 +1,9 @@
-import io
 import json
+import os
 from http import HTTPStatus
 from types import MappingProxyType
+from typing import BinaryIO
 
-from PIL import Image as PilImage
-from PIL import UnidentifiedImageError
 from flask import make_response, Response
 from marshmallow import Schema, fields
 
@@ -14,45 +13,104 @@ from remote_eink.api.display._common import (
     to_target_process,
     _display_id_handler,
     handle_display_controller_not_found_response,
+    RemoteThreadImageStore,
 )
 from remote_eink.controllers.base import DisplayController
-from remote_eink.images import FunctionBasedImage, Image
-from remote_eink.storage.image.base import ImageAlreadyExistsError
+from remote_eink.images import (
+    Image,
+    IMAGE_TYPE_HEADER_SIZE,
+    get_image_type_from_header,
+    FileBasedImage,
+    DataBasedImage,
+)
+from remote_eink.storage.image.base import ImageAlreadyExistsError, spool
 
 
-@handle_display_controller_not_found_response
-def put_image(
-    image_id: str,
-    display_id: str,
-    content_type: str,
-    data: bytes,
-    metadata: dict = MappingProxyType({}),
-    *,
-    overwrite: bool,
-) -> Response:
+class InvalidImageUploadError(ValueError):
+    """
+    Raised when uploaded image data cannot be accepted.
+    """
+
+    def __init__(self, message: str, status: HTTPStatus):
+        super().__init__(message)
+        self.status = status
+
+
+def read_uploaded_image(
+    image_id: str, display_id: str, content_type: str, data: BinaryIO, metadata: dict = MappingProxyType({})
+) -> Image:
+    """
+    Reads an uploaded image, spooling its data into the display's image store if the store supports it (see
+    `discard_uploaded_image`).
+    :param image_id: ID of the image
+    :param display_id: ID of the display the image is being uploaded to
+    :param content_type: content type of the image data
+    :param data: image data
+    :param metadata: image metadata
+    :return: the image
+    :raises InvalidImageUploadError: if the image cannot be accepted
+    """
     if content_type is None:
-        return make_response(f"{CONTENT_TYPE_HEADER} header is required", HTTPStatus.BAD_REQUEST)
+        raise InvalidImageUploadError(f"{CONTENT_TYPE_HEADER} header is required", HTTPStatus.BAD_REQUEST)
 
     image_type = MimeTypeToImageType.get(content_type)
     if image_type is None:
         # TODO: try sniffing
-        return make_response(
+        raise InvalidImageUploadError(
             f"Unsupported image format: {image_type} (based on content type: {content_type})",
             HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
         )
 
-    try:
-        PilImage.open(io.BytesIO(data))
-    except UnidentifiedImageError:
-        return make_response("Invalid image file data", HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
+    # Only the header is checked, to avoid decoding the whole image
+    header = data.read(IMAGE_TYPE_HEADER_SIZE)
+    data_image_type = get_image_type_from_header(header)
+    if data_image_type is None:
+        raise InvalidImageUploadError("Invalid image file data", HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
+    if data_image_type != image_type:
+        raise InvalidImageUploadError(
+            f"Image data is of type {data_image_type.name}, not {image_type.name} (based on content type: "
+            f"{content_type})",
+            HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+        )
+
+    spool_directory = RemoteThreadImageStore(display_id).spool_directory
+    if spool_directory is not None:
+        path, md5 = spool(data, spool_directory, header)
+        # TODO: full metadata support
+        return FileBasedImage(image_id, path, image_type, metadata=metadata, digest=md5, transferable=True)
+    return DataBasedImage(image_id, header + data.read(), image_type, metadata=metadata)
+
+
+def discard_uploaded_image(image: Image):
+    """
+    Discards any spooled data of the given uploaded image that the image store has not taken ownership of.
+    :param image: image read by `read_uploaded_image`
+    """
+    if isinstance(image, FileBasedImage) and image.transferable and os.path.exists(image.path):
+        os.remove(image.path)
 
-    # TODO: full metadata support
-    image = FunctionBasedImage(image_id, lambda: data, image_type, metadata=metadata)
+
+@handle_display_controller_not_found_response
+def put_image(
+    image_id: str,
+    display_id: str,
+    content_type: str,
+    data: BinaryIO,
+    metadata: dict = MappingProxyType({}),
+    *,
+    overwrite: bool,
+) -> Response:
+    try:
+        image = read_uploaded_image(image_id, display_id, content_type, data, metadata)
+    except InvalidImageUploadError as e:
+        return make_response(str(e), e.status)
 
     try:
         updated = _put_image(image=image, overwrite=overwrite, displayId=display_id)
     except ImageAlreadyExistsError:
         return make_response(f"Image with same ID already exists: {image_id}", HTTPStatus.CONFLICT)
+    finally:
+        discard_uploaded_image(image)
 
     return Response(
         response=json.dumps({"id": image_id}),
@@ -0,0 +1,73 @@
+import json
+from http import HTTPStatus
+from typing import List
+
+from flask import request, Response, make_response
+
+from remote_eink.api.display._common import (
+    CONTENT_TYPE_HEADER,
+    ImageSchema,
+    to_target_process,
+    _display_id_handler,
+    handle_display_controller_not_found_response,
+)
+from remote_eink.api.display.image._common import (
+    InvalidImageUploadError,
+    read_uploaded_image,
+    discard_uploaded_image,
+)
+from remote_eink.controllers.base import DisplayController
+from remote_eink.images import Image
+
+
+@handle_display_controller_not_found_response
+def post(displayId: str, **kwargs) -> Response:
+    content_type = request.headers.get(CONTENT_TYPE_HEADER)
+    if content_type is None or not content_type.startswith("multipart/form-data"):
+        return make_response(
+            f"Unsupported content type (expected 'multipart/form-data'): {CONTENT_TYPE_HEADER}",
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    files = request.files.getlist("data")
+    metadata = kwargs.get("body", {}).get("metadata", {})
+    remove_image_ids = request.form.getlist("remove")
+
+    image_ids = [file.filename for file in files]
+    if any(not image_id for image_id in image_ids):
+        return make_response("Image data must have a file name, which is used as the image ID", HTTPStatus.BAD_REQUEST)
+    if len(set(image_ids)) != len(image_ids):
+        return make_response("Image IDs must be unique within a batch", HTTPStatus.BAD_REQUEST)
+
+    images = []
+    try:
+        for file in files:
+            try:
+                images.append(
+                    read_uploaded_image(
+                        file.filename, displayId, file.content_type, file.stream, metadata.get(file.filename, {})
+                    )
+                )
+            except InvalidImageUploadError as e:
+                return make_response(f"{file.filename}: {e}", e.status)
+        removed = _apply_batch(images=images, remove_image_ids=remove_image_ids, displayId=displayId)
+    finally:
+        for image in images:
+            discard_uploaded_image(image)
+
+    return Response(
+        response=json.dumps(
+            {
+                "added": ImageSchema().dump(images, many=True),
+                "removed": [{"id": image_id} for image_id in removed],
+            }
+        ),
+        status=HTTPStatus.OK,
+        mimetype="application/json",
+    )
+
+
+@to_target_process
+@_display_id_handler
+def _apply_batch(display_controller: DisplayController, images: List[Image], remove_image_ids: List[str]) -> List[str]:
+    return display_controller.image_store.replace_many(images, remove_image_ids)
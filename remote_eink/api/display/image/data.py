@@ -1,5 +1,6 @@
+import os
 from http import HTTPStatus
-from io import BytesIO
+from typing import Optional
 
 from flask import make_response, send_file, request, Response
 
@@ -10,19 +11,25 @@ from remote_eink.api.display._common import (
     RemoteThreadImageStore,
 )
 from remote_eink.api.display.image import put_image
+from remote_eink.images import ImageBufferStream, Image, FileBasedImage
 
 
 @handle_display_controller_not_found_response
-def search(imageId: str, displayId: str) -> Response:
-    image = RemoteThreadImageStore(displayId).get(image_id=imageId)
+def search(imageId: str, displayId: str, width: Optional[int] = None, height: Optional[int] = None) -> Response:
+    image_store = RemoteThreadImageStore(displayId)
+    if width is None and height is None:
+        image = image_store.get(image_id=imageId)
+    else:
+        image = image_store.get_thumbnail(imageId, width, height)
     if image is None:
         return make_response(f"Image not found: {imageId}", HTTPStatus.NOT_FOUND)
 
-    return send_file(BytesIO(image.data), ImageTypeToMimeTypes[image.type][0])
+    return _send_image(image)
 
 
 @handle_display_controller_not_found_response
 def put(imageId: str, displayId: str, body: bytes) -> Response:
+    # `body` is empty: the data is streamed from the request instead (see `remote_eink.app.UploadStreamingRequest`)
     image = RemoteThreadImageStore(displayId).get(image_id=imageId)
     if image is None:
         return make_response(f"Image not found: {imageId}", HTTPStatus.NOT_FOUND)
@@ -32,7 +39,31 @@ def put(imageId: str, displayId: str, body: bytes) -> Response:
         image_id=imageId,
         display_id=displayId,
         content_type=content_type,
-        data=body,
+        data=request.stream,
         metadata=image.metadata,
         overwrite=True,
     )
+
+
+def _send_image(image: Image) -> Response:
+    """
+    Sends the data of the given image, with the image's digest as a (strong) ETag.
+
+    Conditional (`If-None-Match`) requests for unchanged data are answered without accessing the data. Byte ranges of
+    the data are sent from the image's buffer, so the data is not read in full.
+    :param image: image to send
+    :return: response
+    """
+    etag = image.digest
+    if request.if_none_match.contains(etag):
+        response = make_response("", HTTPStatus.NOT_MODIFIED)
+        response.set_etag(etag)
+        return response
+
+    stream = ImageBufferStream(image.buffer())
+    response = send_file(stream, ImageTypeToMimeTypes[image.type][0], etag=etag, conditional=False)
+    response.content_length = len(stream)
+    response.accept_ranges = "bytes"
+    if isinstance(image, FileBasedImage):
+        response.last_modified = os.stat(image.path).st_mtime
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(stream))
@@ -1,6 +1,6 @@
 import json
 from http import HTTPStatus
-from io import BytesIO
+from typing import Optional
 from uuid import uuid4
 
 from flask import request, Response, make_response
@@ -8,7 +8,6 @@ from requests_toolbelt import MultipartEncoder
 
 from remote_eink.api.display._common import (
     CONTENT_TYPE_HEADER,
-    ImageSchema,
     ImageTypeToMimeTypes,
     RemoteThreadImageStore,
     handle_display_controller_not_found_response,
@@ -16,12 +15,18 @@ from remote_eink.api.display._common import (
 from remote_eink.api.display.image._common import (
     put_image,
 )
+from remote_eink.images import ImageBufferStream
+
+
+NEXT_CURSOR_HEADER = "Next-Cursor"
 
 
 @handle_display_controller_not_found_response
-def search(displayId: str):
-    images = RemoteThreadImageStore(displayId).list()
-    return ImageSchema(only=["identifier"]).dump(images, many=True), HTTPStatus.OK
+def search(displayId: str, limit: Optional[int] = None, cursor: Optional[str] = None):
+    # Only IDs are listed, so that images do not have to be retrieved from the store
+    page = RemoteThreadImageStore(displayId).list_ids(limit, cursor)
+    headers = {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor is not None else {}
+    return [{"id": image_id} for image_id in page.image_ids], HTTPStatus.OK, headers
 
 
 @handle_display_controller_not_found_response
@@ -33,7 +38,7 @@ def get(imageId: str, displayId: str) -> Response:
     multipart_content = MultipartEncoder(
         fields={
             "metadata": (None, json.dumps(image.metadata), "application/json"),
-            "data": (None, BytesIO(image.data), ImageTypeToMimeTypes[image.type][0]),
+            "data": (None, ImageBufferStream(image.buffer()), ImageTypeToMimeTypes[image.type][0]),
         }
     )
 
@@ -58,7 +63,7 @@ def put(imageId: str, displayId: str, **kwargs) -> Response:
 
     content_type = kwargs["data"].content_type
     metadata = kwargs["body"]["metadata"]
-    data = data.stream.read()
+    data = data.stream
 
     del kwargs["body"]
     del kwargs["data"]
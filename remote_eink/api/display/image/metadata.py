@@ -1,4 +1,6 @@
+from functools import partial
 from http import HTTPStatus
+from typing import Optional
 
 from flask import make_response
 
@@ -8,14 +10,16 @@ from remote_eink.api.display._common import (
     ImageTypeToMimeTypes,
 )
 from remote_eink.api.display.image import put_image
+from remote_eink.images import ImageBufferStream, ImageMetadata
+from remote_eink.storage.image.base import ImageStore
 
 
 @handle_display_controller_not_found_response
 def search(imageId: str, displayId: str):
-    image = RemoteThreadImageStore(displayId).get(image_id=imageId)
-    if image is None:
+    metadata = RemoteThreadImageStore(displayId).snapshot(partial(_get_metadata, imageId))
+    if metadata is None:
         return make_response(f"Image not found: {imageId}", HTTPStatus.NOT_FOUND)
-    return image.metadata, HTTPStatus.OK
+    return metadata, HTTPStatus.OK
 
 
 @handle_display_controller_not_found_response
@@ -28,7 +32,18 @@ def put(imageId: str, displayId: str, body: dict):
         display_id=displayId,
         # XXX: the backwards-forward conversion of content type is perverse
         content_type=ImageTypeToMimeTypes[image.type][0],
-        data=image.data,
+        data=ImageBufferStream(image.buffer()),
         metadata=body,
         overwrite=True,
     )
+
+
+def _get_metadata(image_id: str, image_store: ImageStore) -> Optional[ImageMetadata]:
+    """
+    Gets the metadata of the given image, on the target process, so that the image itself is not transferred.
+    :param image_id: ID of the image
+    :param image_store: image store containing the image
+    :return: the image's metadata or `None` if the image is not in the store
+    """
+    image = image_store.get(image_id)
+    return dict(image.metadata) if image is not None else None
@@ -1,6 +1,7 @@
 from enum import unique, Enum
+from functools import partial
 from http import HTTPStatus
-from typing import Dict
+from typing import Dict, Any, Optional, List
 
 from flask import Response, make_response
 from marshmallow import Schema, fields
@@ -9,29 +10,26 @@ from remote_eink.api.display._common import (
     RemoteThreadImageTransformerSequence,
     handle_display_controller_not_found_response,
 )
+from remote_eink.transformers import ImageTransformerSequence
 from remote_eink.transformers.base import InvalidConfigurationError, InvalidPositionError
 
 
 @handle_display_controller_not_found_response
 def search(displayId: str):
     image_transformers = RemoteThreadImageTransformerSequence(displayId)
-    return _ImageTransformerSchema(only=["identifier"]).dump(image_transformers, many=True), HTTPStatus.OK
+    return image_transformers.snapshot(_serialise_image_transformer_ids), HTTPStatus.OK
 
 
 @handle_display_controller_not_found_response
 def get(displayId: str, imageTransformerId: str) -> Response:
     image_transformers = RemoteThreadImageTransformerSequence(displayId)
-    try:
-        # Both should be in try block as it's possible for it to be removed mid-operation due to the lack of lock
-        image_transformer = image_transformers.get_by_id(imageTransformerId)
-        position = image_transformers.get_position(imageTransformerId)
-    except KeyError:
+    serialised_image_transformer = image_transformers.snapshot(
+        partial(_serialise_image_transformer, imageTransformerId)
+    )
+    if serialised_image_transformer is None:
         return make_response(
             f"Image transformer with given ID does not exist: {imageTransformerId}", HTTPStatus.NOT_FOUND
         )
-
-    # XXX: there is probably a better way to deal with the concept of "position"
-    serialised_image_transformer = dict(**_ImageTransformerSchema().dump(image_transformer), position=position)
     return make_response(serialised_image_transformer, HTTPStatus.OK)
 
 
@@ -75,6 +73,32 @@ def put(displayId: str, imageTransformerId: str, body: Dict) -> Response:
 # TODO: support for deleting transformer?
 
 
+def _serialise_image_transformer_ids(image_transformers: ImageTransformerSequence) -> List[Dict[str, Any]]:
+    """
+    Serialises the IDs of the image transformers in the given sequence, on the target process.
+    :param image_transformers: image transformer sequence
+    :return: the serialised image transformer IDs
+    """
+    return _ImageTransformerSchema(only=["identifier"]).dump(image_transformers, many=True)
+
+
+def _serialise_image_transformer(
+    image_transformer_id: str, image_transformers: ImageTransformerSequence
+) -> Optional[Dict[str, Any]]:
+    """
+    Serialises the given image transformer, including its position in the sequence, on the target process.
+    :param image_transformer_id: ID of the image transformer
+    :param image_transformers: image transformer sequence containing the image transformer
+    :return: the serialised image transformer or `None` if it is not in the sequence
+    """
+    image_transformer = image_transformers.get_by_id(image_transformer_id)
+    if image_transformer is None:
+        return None
+    # XXX: there is probably a better way to deal with the concept of "position"
+    position = image_transformers.get_position(image_transformer_id)
+    return dict(**_ImageTransformerSchema().dump(image_transformer), position=position)
+
+
 @unique
 class _ModifiableParameter(Enum):
     POSITION = "position"
@@ -1,14 +1,17 @@
 import os
-from typing import Collection, Optional
+from http import HTTPStatus
+from typing import Collection, Optional, Iterable
 from uuid import uuid4
 
 import connexion
 from connexion import FlaskApp
-from flask import current_app
+from flask import current_app, Request
 from flask_cors import CORS
 
-from remote_eink.app_data import apps_data, AppData
+from remote_eink.app_data import apps_data, AppData, DispatchMode
 from remote_eink.controllers.base import DisplayController
+from remote_eink.multiprocess import RequestTimeoutError, QueueBusyError
+from remote_eink.storage.image.file_system import FileSystemImageStore, DEFAULT_SECONDS_BETWEEN_CONSISTENCY_CHECK
 from remote_eink.resolver import CustomRestResolver
 
 OPEN_API_LOCATION = os.path.join(os.path.dirname(os.path.realpath(__file__)), "../openapi.yml")
@@ -16,22 +19,49 @@ OPEN_API_LOCATION = os.path.join(os.path.dirname(os.path.realpath(__file__)), ".
 APP_ID_PROPERTY = "APP_ID"
 
 
-def create_app(display_controllers: Collection[DisplayController]) -> FlaskApp:
+class UploadStreamingRequest(Request):
+    """
+    Request whose image data body is not read into memory by `get_data`, which connexion calls for every request, so
+    that the body can be streamed from `stream` by the request handler.
+    """
+
+    def get_data(self, cache: bool = True, as_text: bool = False, parse_form_data: bool = False):
+        if self.mimetype.startswith("image/"):
+            return "" if as_text else b""
+        return super().get_data(cache, as_text, parse_form_data)
+
+
+def create_app(
+    display_controllers: Collection[DisplayController],
+    dispatch_mode: DispatchMode = DispatchMode.AUTO,
+    file_system_image_stores: Iterable[FileSystemImageStore] = (),
+    check_consistency_every_seconds: float = DEFAULT_SECONDS_BETWEEN_CONSISTENCY_CHECK,
+) -> FlaskApp:
     """
     Creates the Flask app.
     :param display_controllers: display controllers that the created app should have
+    :param dispatch_mode: how request handlers call the display controllers. By default, they are called directly if
+                          the app is served in the process that created it, else via the communication pipe
+    :param file_system_image_stores: file system image stores used by the display controllers, which are checked for
+                                     consistency in the background until the app is destroyed (see `AppData`)
+    :param check_consistency_every_seconds: number of seconds between consistency checks of the image stores
     :return: Flask app
     """
     app = connexion.App(__name__, options=dict(swagger_ui=True))
     # Turning off strict validation due to bug: https://github.com/zalando/connexion/issues/1020#issuecomment-574437207
     app.add_api(OPEN_API_LOCATION, resolver=CustomRestResolver("remote_eink.api"), strict_validation=False)
+    app.add_error_handler(RequestTimeoutError, _handle_request_timeout)
+    app.add_error_handler(QueueBusyError, _handle_queue_busy)
     CORS(app.app)
+    app.app.request_class = UploadStreamingRequest
 
     identifier = str(uuid4())
     with app.app.app_context():
         app.app.config[APP_ID_PROPERTY] = identifier
 
-    apps_data[identifier] = AppData(display_controllers)
+    apps_data[identifier] = AppData(
+        display_controllers, dispatch_mode, file_system_image_stores, check_consistency_every_seconds
+    )
 
     return app.app
 
@@ -54,3 +84,22 @@ def destroy_app(app: Optional[FlaskApp] = None):
     """
     app_data = get_app_data(app)
     app_data.destroy()
+
+
+def _handle_request_timeout(error: RequestTimeoutError):
+    """
+    Handles the target process not responding to a request in time (e.g. due to a hung display driver).
+    :param error: the timeout error
+    :return: response
+    """
+    return f"Timed out waiting for the display: {error}", HTTPStatus.GATEWAY_TIMEOUT
+
+
+def _handle_queue_busy(error: QueueBusyError):
+    """
+    Handles the target process rejecting a request to a display that is still handling a request that timed out (e.g.
+    due to a hung display driver).
+    :param error: the busy error
+    :return: response
+    """
+    return f"Display is busy: {error}", HTTPStatus.SERVICE_UNAVAILABLE
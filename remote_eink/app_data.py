@@ -1,9 +1,13 @@
 import os
-from threading import Thread
-from typing import Dict, Callable, Any, Iterable, Mapping
+from contextlib import contextmanager
+from enum import Enum, unique, auto
+from threading import Thread, RLock
+from typing import Dict, Callable, Any, Iterable, Mapping, Iterator, Optional, Hashable
 
 from remote_eink.controllers.base import DisplayController
+from remote_eink.controllers.cycling import CyclableDisplayController
 from remote_eink.multiprocess import CommunicationPipe
+from remote_eink.storage.image.file_system import FileSystemImageStore, DEFAULT_SECONDS_BETWEEN_CONSISTENCY_CHECK
 
 apps_data: Dict[str, "AppData"] = {}
 
@@ -22,6 +26,21 @@ def _use_only_in_created_process(wrappable: Callable) -> Callable:
     return wrapped
 
 
+@unique
+class DispatchMode(Enum):
+    """
+    How calls to be executed on the target process (that which created the `AppData`) are dispatched.
+    """
+
+    # Always send calls over the communication pipe
+    PIPE = auto()
+    # Always call directly, which requires the server to run in the process that created the app data
+    DIRECT = auto()
+    # Call directly when already on the target process (i.e. a single-process server), else use the pipe (e.g. for
+    # pre-forked servers)
+    AUTO = auto()
+
+
 class AppData:
     """
     Data used in Flask application.
@@ -36,20 +55,35 @@ class AppData:
     def display_controllers(self) -> Mapping[str, DisplayController]:
         return dict(self._display_controllers)
 
-    def __init__(self, display_controllers: Iterable[DisplayController]):
+    def __init__(
+        self,
+        display_controllers: Iterable[DisplayController],
+        dispatch_mode: DispatchMode = DispatchMode.AUTO,
+        file_system_image_stores: Iterable[FileSystemImageStore] = (),
+        check_consistency_every_seconds: float = DEFAULT_SECONDS_BETWEEN_CONSISTENCY_CHECK,
+    ):
         """
         Constructor.
         :param display_controllers: display controllers
+        :param dispatch_mode: how calls to the target process are dispatched (see `dispatch`)
+        :param file_system_image_stores: file system image stores used by the display controllers, which are checked for
+                                         consistency in the background until the app data is destroyed (when they are
+                                         closed)
+        :param check_consistency_every_seconds: number of seconds between consistency checks of the image stores
         """
+        self.dispatch_mode = dispatch_mode
+        self._file_system_image_stores = list(file_system_image_stores)
         self._display_controllers: dict[str, DisplayController] = {}
 
-        communication_pipe = CommunicationPipe()
+        communication_pipe = CommunicationPipe(self._serving_request)
         Thread(target=communication_pipe.receiver.run).start()
         self._communication_pipe = communication_pipe
         self._created_pid = os.getpid()
 
         for display_controller in display_controllers:
             self.add_display_controller(display_controller)
+        for image_store in self._file_system_image_stores:
+            image_store.start_consistency_checks(check_consistency_every_seconds)
 
     @_use_only_in_created_process
     def add_display_controller(self, display_controller: DisplayController):
@@ -69,11 +103,64 @@ class AppData:
         """
         del self._display_controllers[display_controller.identifier]
 
+    @_use_only_in_created_process
+    def get_display_controller_lock(self, display_controller_id: str) -> RLock:
+        """
+        Gets the lock that requests to the given display controller are served under (see `DisplayController.lock`).
+        Requests are served concurrently but display controllers (and their drivers) are not thread safe, so requests
+        to the same display are served one at a time, and not whilst the display controller is used in the background
+        (e.g. to cycle images). Requests received on the communication pipe are also queued by display, so that those waiting
+        for a busy display do not occupy the receiver's workers.
+        :param display_controller_id: ID of the display controller
+        :return: the display controller's lock
+        :raises KeyError: if there is no display controller with the given ID
+        """
+        return self._display_controllers[display_controller_id].lock
+
+    def dispatch(self, callable: Callable, *args, dispatch_queue: Optional[Hashable] = None, **kwargs) -> Any:
+        """
+        Executes the given callable on the target process (that which created the app data), according to the
+        dispatch mode.
+
+        When called directly, the callable is executed in the same context as requests received on the communication
+        pipe, without being serialised, and its result is returned without being copied.
+        :param callable: callable to execute on the target process
+        :param dispatch_queue: queue that the call is handled in if sent over the communication pipe (see
+                               `RequestReceiver`), e.g. the ID of the display that the call uses
+        :return: result of the callable
+        """
+        if self.dispatch_mode == DispatchMode.DIRECT or (
+            self.dispatch_mode == DispatchMode.AUTO and os.getpid() == self._created_pid
+        ):
+            with self._serving_request(dispatch_queue):
+                return callable(*args, **kwargs)
+        return self.communication_pipe.sender.call(callable, args, kwargs, queue=dispatch_queue)
+
+    @contextmanager
+    def _serving_request(self, dispatch_queue: Optional[Hashable] = None) -> Iterator[None]:
+        """
+        Context in which a request is served. If the request is to a display (i.e. it is queued by display ID),
+        background pre-rendering by the display's controller is paused so that it does not compete with the request.
+        :param dispatch_queue: queue that the request is handled in (see `dispatch`)
+        """
+        display_controller = self._display_controllers.get(dispatch_queue)
+        if isinstance(display_controller, CyclableDisplayController):
+            with display_controller.pause_pre_rendering():
+                yield
+        else:
+            yield
+
     @_use_only_in_created_process
     def destroy(self):
         """
-        Functionally destroy the app data by clearing its data and stopping the communication receiver.
+        Functionally destroy the app data by clearing its data, closing its display controllers and file system image
+        stores, and stopping the communication receiver.
         """
+        for display_controller in self._display_controllers.values():
+            if isinstance(display_controller, CyclableDisplayController):
+                display_controller.close()
+        for image_store in self._file_system_image_stores:
+            image_store.close()
         self.communication_pipe.sender.stop_receiver()
         self._communication_pipe = None
         self._display_controllers.clear()
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from threading import RLock
+from typing import TypeVar, Generic, Callable, Optional, Hashable, List
+
+KeyType = TypeVar("KeyType", bound=Hashable)
+ValueType = TypeVar("ValueType")
+
+
+class LruCache(Generic[KeyType, ValueType]):
+    """
+    Thread-safe, least recently used cache, bounded by the total size of the values it holds.
+    """
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the values in the cache.
+        :return: size
+        """
+        return self._size
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def __init__(self, max_size: int, size_of: Callable[[ValueType], int] = len):
+        """
+        Constructor.
+        :param max_size: maximum total size of the values in the cache
+        :param size_of: gets the size of a value (by default, its length)
+        """
+        self._max_size = max_size
+        self._size_of = size_of
+        self._values: OrderedDict[KeyType, ValueType] = OrderedDict()
+        self._sizes: dict[KeyType, int] = {}
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: KeyType) -> bool:
+        return key in self._values
+
+    def get(self, key: KeyType) -> Optional[ValueType]:
+        """
+        Gets the value cached with the given key, marking it as the most recently used.
+        :param key: key of the value
+        :return: the value or `None` if no value is cached with the key
+        """
+        with self._lock:
+            try:
+                self._values.move_to_end(key)
+            except KeyError:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return self._values[key]
+
+    def put(self, key: KeyType, value: ValueType) -> bool:
+        """
+        Caches the given value with the given key, evicting the least recently used values to make space for it.
+        :param key: key of the value
+        :param value: value to cache
+        :return: `True` if the value was cached or `False` if it is larger than the cache
+        """
+        size = self._size_of(value)
+        with self._lock:
+            self.remove(key)
+            if size > self._max_size:
+                return False
+            while self._size + size > self._max_size:
+                self.remove(next(iter(self._values)))
+            self._values[key] = value
+            self._sizes[key] = size
+            self._size += size
+            return True
+
+    def remove(self, key: KeyType) -> bool:
+        """
+        Removes the value cached with the given key.
+        :param key: key of the value
+        :return: `True` if a value was removed else `False`
+        """
+        with self._lock:
+            if key not in self._values:
+                return False
+            del self._values[key]
+            self._size -= self._sizes.pop(key)
+            return True
+
+    def keys(self) -> List[KeyType]:
+        """
+        Gets the keys of the cached values, from least to most recently used.
+        :return: the keys
+        """
+        with self._lock:
+            return list(self._values.keys())
+
+    def clear(self):
+        """
+        Removes all values from the cache.
+        """
+        with self._lock:
+            self._values.clear()
+            self._sizes.clear()
+            self._size = 0
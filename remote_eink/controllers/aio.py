@@ -0,0 +1,206 @@
+import asyncio
+from abc import ABCMeta, abstractmethod
+from concurrent.futures import Executor
+from threading import RLock
+from typing import Optional
+
+from remote_eink.aio import ExecutorAdapter, EventLoopAdapter
+from remote_eink.controllers.base import DisplayController
+from remote_eink.drivers.aio import AsyncDisplayDriver, ExecutorDisplayDriver, EventLoopDisplayDriver
+from remote_eink.drivers.base import DisplayDriver
+from remote_eink.images import Image
+from remote_eink.storage.image.aio import AsyncImageStore, ExecutorImageStore, EventLoopImageStore
+from remote_eink.storage.image.base import ImageStore
+from remote_eink.transformers import ImageTransformerSequence
+
+
+class AsyncDisplayController(metaclass=ABCMeta):
+    """
+    Asynchronous display controller (see `DisplayController`).
+
+    Displays can be updated together by awaiting their controllers together, e.g. using `asyncio.gather`.
+    """
+
+    @property
+    @abstractmethod
+    def friendly_type_name(self) -> str:
+        """
+        See `DisplayController.friendly_type_name`.
+        """
+
+    @property
+    @abstractmethod
+    def identifier(self) -> str:
+        """
+        See `DisplayController.identifier`.
+        """
+
+    @property
+    @abstractmethod
+    def current_image(self) -> Optional[Image]:
+        """
+        See `DisplayController.current_image`.
+        """
+
+    @property
+    @abstractmethod
+    def driver(self) -> AsyncDisplayDriver:
+        """
+        See `DisplayController.driver`.
+        """
+
+    @property
+    @abstractmethod
+    def image_store(self) -> AsyncImageStore:
+        """
+        See `DisplayController.image_store`.
+        """
+
+    @property
+    @abstractmethod
+    def image_transformers(self) -> ImageTransformerSequence:
+        """
+        See `DisplayController.image_transformers`.
+        """
+
+    @abstractmethod
+    async def display(self, image_id: str):
+        """
+        See `DisplayController.display`.
+        """
+
+    @abstractmethod
+    async def clear(self):
+        """
+        See `DisplayController.clear`.
+        """
+
+    @abstractmethod
+    async def apply_image_transforms(self, image: Image) -> Image:
+        """
+        See `DisplayController.apply_image_transforms`.
+        """
+
+
+class ExecutorDisplayController(AsyncDisplayController, ExecutorAdapter):
+    """
+    Asynchronous interface to a display controller, which runs the controller's blocking calls (e.g. image transforms
+    and display refreshes) in an executor.
+
+    Calls that use the display's driver are run one at a time, as are calls to the driver made via `driver` and calls
+    that change the store via `image_store` (whose event listeners may update the display). They are run holding the
+    display controller's lock (see `DisplayController.lock`), so are also run one at a time with other users of the
+    display controller (e.g. request handlers or auto cycling). Whilst a display is refreshing, calls waiting to use it
+    are suspended rather than occupying a thread, so one event loop and a small executor can drive many displays.
+    """
+
+    @property
+    def friendly_type_name(self) -> str:
+        return self._display_controller.friendly_type_name
+
+    @property
+    def identifier(self) -> str:
+        return self._display_controller.identifier
+
+    @property
+    def current_image(self) -> Optional[Image]:
+        return self._display_controller.current_image
+
+    @property
+    def driver(self) -> AsyncDisplayDriver:
+        return self._driver
+
+    @property
+    def image_store(self) -> AsyncImageStore:
+        return self._image_store
+
+    @property
+    def image_transformers(self) -> ImageTransformerSequence:
+        return self._display_controller.image_transformers
+
+    def __init__(self, display_controller: DisplayController, executor: Optional[Executor] = None):
+        """
+        Constructor.
+        :param display_controller: display controller to run calls of
+        :param executor: see `ExecutorAdapter.__init__`
+        """
+        super().__init__(executor, asyncio.Lock(), display_controller.lock)
+        self._display_controller = display_controller
+        self._driver = ExecutorDisplayDriver(display_controller.driver, executor, self._lock, self._thread_lock)
+        self._image_store = ExecutorImageStore(
+            display_controller.image_store,
+            executor,
+            mutation_lock=self._lock,
+            mutation_thread_lock=self._thread_lock,
+        )
+
+    async def display(self, image_id: str):
+        await self._run_blocking(self._display_controller.display, image_id)
+
+    async def clear(self):
+        await self._run_blocking(self._display_controller.clear)
+
+    async def apply_image_transforms(self, image: Image) -> Image:
+        # Does not use the driver, so is not run under the lock
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._display_controller.apply_image_transforms, image
+        )
+
+
+class EventLoopDisplayController(DisplayController, EventLoopAdapter):
+    """
+    Synchronous interface to an asynchronous display controller, which runs the controller on an event loop.
+
+    The interface has its own lock, rather than that of the display controller that the asynchronous controller may
+    wrap: calls are run holding that lock in the asynchronous controller's threads, so holding it whilst blocking on
+    them would deadlock.
+    """
+
+    @property
+    def friendly_type_name(self) -> str:
+        return self._display_controller.friendly_type_name
+
+    @property
+    def identifier(self) -> str:
+        return self._display_controller.identifier
+
+    @property
+    def current_image(self) -> Optional[Image]:
+        return self._display_controller.current_image
+
+    @property
+    def driver(self) -> DisplayDriver:
+        return self._driver
+
+    @property
+    def image_store(self) -> ImageStore:
+        return self._image_store
+
+    @property
+    def image_transformers(self) -> ImageTransformerSequence:
+        return self._display_controller.image_transformers
+
+    @property
+    def lock(self) -> RLock:
+        return self._lock
+
+    def __init__(self, display_controller: AsyncDisplayController, loop: asyncio.AbstractEventLoop):
+        """
+        Constructor.
+        :param display_controller: asynchronous display controller
+        :param loop: see `EventLoopAdapter.__init__`
+        """
+        super().__init__(loop)
+        self._display_controller = display_controller
+        self._lock = RLock()
+        self._driver = EventLoopDisplayDriver(display_controller.driver, loop)
+        self._image_store = EventLoopImageStore(display_controller.image_store, loop)
+
+    def display(self, image_id: str):
+        self._run_coroutine(self._display_controller.display(image_id))
+
+    def clear(self):
+        self._run_coroutine(self._display_controller.clear())
+
+    def apply_image_transforms(self, image: Image) -> Image:
+        return self._run_coroutine(self._display_controller.apply_image_transforms(image))
@@ -1,6 +1,6 @@
 from abc import abstractmethod, ABCMeta
 from enum import unique, Enum, auto
-from threading import Timer
+from threading import Timer, RLock
 from typing import Optional
 
 from remote_eink.drivers.base import DisplayDriver, ListenableDisplayDriver
@@ -74,6 +74,16 @@ class DisplayController(metaclass=ABCMeta):
         :return: sequence of image transformers (first in sequence is applied first)
         """
 
+    @property
+    @abstractmethod
+    def lock(self) -> RLock:
+        """
+        Lock that the display controller is used under. Display controllers (and their drivers) are not thread safe, so
+        anything that uses the controller from another thread (e.g. request handlers, or the controller's own
+        background work, such as cycling images) must hold the lock whilst doing so.
+        :return: the display controller's lock
+        """
+
     @abstractmethod
     def display(self, image_id: str):
         """
@@ -157,6 +167,10 @@ class SleepyDisplayController(ListenableDisplayController):
     def event_listeners(self) -> EventListenerController["ListenableDisplayController.Event"]:
         return self._display_controller.event_listeners
 
+    @property
+    def lock(self) -> RLock:
+        return self._display_controller.lock
+
     def display(self, image_id: str):
         self._display_controller.display(image_id)
 
@@ -193,5 +207,9 @@ class SleepyDisplayController(ListenableDisplayController):
         if self.started:
             if self._sleep_timer is not None:
                 self._sleep_timer.cancel()
-            self._sleep_timer = Timer(self._sleep_after_seconds, lambda: self.driver.sleep())
+            self._sleep_timer = Timer(self._sleep_after_seconds, self._sleep)
             self._sleep_timer.start()
+
+    def _sleep(self):
+        with self.lock:
+            self.driver.sleep()
@@ -1,15 +1,20 @@
-from typing import Optional, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Event, Lock
+from typing import Optional, Sequence, List, Iterator
 
 from apscheduler.schedulers import SchedulerNotRunningError
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.schedulers.base import STATE_RUNNING
 
-from remote_eink.controllers.simple import SimpleDisplayController
+from remote_eink.controllers.simple import SimpleDisplayController, DEFAULT_MAX_RENDER_CACHE_SIZE
 from remote_eink.drivers.base import DisplayDriver
 from remote_eink.images import Image
 from remote_eink.storage.image.base import ImageStore, ListenableImageStore
 from remote_eink.transformers import ImageTransformer, DEFAULT_TRANSFORMERS
 
+DEFAULT_PRE_RENDER_COUNT = 2
+
 
 class CyclableDisplayController(SimpleDisplayController):
     """
@@ -26,6 +31,8 @@ class CyclableDisplayController(SimpleDisplayController):
         image_store: ImageStore,
         identifier: Optional[str] = None,
         image_transformers: Sequence[ImageTransformer] = DEFAULT_TRANSFORMERS,
+        max_render_cache_size: int = DEFAULT_MAX_RENDER_CACHE_SIZE,
+        pre_render_count: int = DEFAULT_PRE_RENDER_COUNT,
     ):
         """
         Constructor.
@@ -33,13 +40,24 @@ class CyclableDisplayController(SimpleDisplayController):
         :param image_store: `BaseDisplayController.__init__`
         :param identifier: `BaseDisplayController.__init__`
         :param image_transformers: `BaseDisplayController.__init__`
+        :param max_render_cache_size: `SimpleDisplayController.__init__`
+        :param pre_render_count: number of upcoming images in the queue to render in the background after each image
+                                 is displayed (0 to disable)
         """
-        super().__init__(driver, image_store, identifier, image_transformers)
+        super().__init__(driver, image_store, identifier, image_transformers, max_render_cache_size)
+        self.pre_render_count = pre_render_count
         self._image_queue = []
+        self._pre_render_executor: Optional[ThreadPoolExecutor] = None
+        self._pre_render_generation = 0
+        self._pre_render_lock = Lock()
+        self._pre_render_pauses = 0
+        self._pre_render_unpaused = Event()
+        self._pre_render_unpaused.set()
         # Note: the superclass converts the image store to a `ListenableImageStore`
         self.image_store.event_listeners.add_listener(
             lambda image: self._add_to_queue(image.identifier), ListenableImageStore.Event.ADD
         )
+        self.image_store.event_listeners.add_listener(self._on_add_images, ListenableImageStore.Event.ADD_MANY)
         for image in self.image_store.list():
             self._add_to_queue(image.identifier)
 
@@ -65,14 +83,96 @@ class CyclableDisplayController(SimpleDisplayController):
             return self.display_next_image()
 
         self.display(image_id)
+        self.pre_render_upcoming_images()
         return image
 
+    def pre_render_upcoming_images(self) -> Future:
+        """
+        Renders the next `pre_render_count` images in the queue in the background, so that displaying them only
+        requires a render cache lookup.
+
+        Any pre-rendering previously requested that has not yet completed is abandoned.
+        :return: future that completes with the IDs of the images that were pre-rendered
+        """
+        image_ids = [
+            image_id
+            for image_id in self._image_queue[: self.pre_render_count]
+            if self.current_image is None or image_id != self.current_image.identifier
+        ]
+        with self._pre_render_lock:
+            self._pre_render_generation += 1
+            generation = self._pre_render_generation
+            if self._pre_render_executor is None:
+                self._pre_render_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"pre-render-{self.identifier}"
+                )
+            return self._pre_render_executor.submit(self._pre_render, image_ids, generation)
+
+    @contextmanager
+    def pause_pre_rendering(self) -> Iterator[None]:
+        """
+        Context manager that stops background pre-rendering of images from starting on a new image whilst in context,
+        leaving the CPU free for other work (e.g. serving an API request).
+        """
+        with self._pre_render_lock:
+            self._pre_render_pauses += 1
+            self._pre_render_unpaused.clear()
+        try:
+            yield
+        finally:
+            with self._pre_render_lock:
+                self._pre_render_pauses -= 1
+                if self._pre_render_pauses == 0:
+                    self._pre_render_unpaused.set()
+
+    def close(self):
+        """
+        Closes the display controller, abandoning any pre-rendering and stopping the thread that it is done in.
+        """
+        with self._pre_render_lock:
+            self._pre_render_generation += 1
+            if self._pre_render_executor is not None:
+                self._pre_render_executor.shutdown(wait=False, cancel_futures=True)
+                self._pre_render_executor = None
+
+    def _pre_render(self, image_ids: List[str], generation: int) -> List[str]:
+        """
+        Renders the images with the given IDs (see `render`), populating the render cache.
+
+        Each image is rendered holding the display controller's lock, so the image store and image transformers are not
+        changed whilst it is rendered.
+        :param image_ids: IDs of the images to render
+        :param generation: the pre-render request that this call is servicing, used to abandon stale requests
+        :return: IDs of the images that were rendered
+        """
+        rendered = []
+        for image_id in image_ids:
+            self._pre_render_unpaused.wait()
+            with self.lock:
+                if generation != self._pre_render_generation:
+                    break
+                image = self.image_store.get(image_id)
+                if image is None:
+                    continue
+                self.render(image)
+            rendered.append(image_id)
+        return rendered
+
     def _add_to_queue(self, image_id: str):
         """
-        Adds the image with the given ID to the queue.
+        Adds the image with the given ID to the queue, unless it is already queued (e.g. if it has been replaced).
         :param image_id: ID of the image to add to the queue
         """
-        self._image_queue.append(image_id)
+        if image_id not in self._image_queue:
+            self._image_queue.append(image_id)
+
+    def _on_add_images(self, images: List[Image]):
+        """
+        Called when a batch of images is added.
+        :param images: images that were added
+        """
+        for image in images:
+            self._add_to_queue(image.identifier)
 
     def _on_remove_image(self, image_id: str):
         """
@@ -101,6 +201,8 @@ class AutoCyclingDisplayController(CyclableDisplayController):
         identifier: Optional[str] = None,
         image_transformers: Sequence[ImageTransformer] = DEFAULT_TRANSFORMERS,
         cycle_image_after_seconds: float = DEFAULT_SECONDS_BETWEEN_CYCLE,
+        max_render_cache_size: int = DEFAULT_MAX_RENDER_CACHE_SIZE,
+        pre_render_count: int = DEFAULT_PRE_RENDER_COUNT,
     ):
         """
         Constructor.
@@ -109,15 +211,17 @@ class AutoCyclingDisplayController(CyclableDisplayController):
         :param identifier: see `CyclableDisplayController.__init__`
         :param image_transformers: see `CyclableDisplayController.__init__`
         :param cycle_image_after_seconds: the number of seconds before cycling on to the next image
+        :param max_render_cache_size: see `CyclableDisplayController.__init__`
+        :param pre_render_count: see `CyclableDisplayController.__init__`
         """
-        super().__init__(driver, image_store, identifier, image_transformers)
+        super().__init__(driver, image_store, identifier, image_transformers, max_render_cache_size, pre_render_count)
         self.cycle_image_after_seconds = cycle_image_after_seconds
         self._scheduler = BackgroundScheduler()
 
     def start(self):
         if self._scheduler.state != STATE_RUNNING:
             self._scheduler.start()
-            self._scheduler.add_job(self.display_next_image, "interval", seconds=self.cycle_image_after_seconds)
+            self._scheduler.add_job(self._cycle, "interval", seconds=self.cycle_image_after_seconds)
 
     def stop(self):
         self._scheduler.remove_all_jobs()
@@ -125,3 +229,16 @@ class AutoCyclingDisplayController(CyclableDisplayController):
             self._scheduler.pause()
         except SchedulerNotRunningError:
             pass
+
+    def close(self):
+        self.stop()
+        if self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+        super().close()
+
+    def _cycle(self):
+        """
+        Displays the next image, as scheduled.
+        """
+        with self.lock:
+            self.display_next_image()
@@ -1,13 +1,19 @@
-from typing import Optional, Sequence
+import json
+from threading import RLock
+from typing import Optional, Sequence, List, Hashable
 from uuid import uuid4
 
+from remote_eink.cache import LruCache
 from remote_eink.controllers.base import ListenableDisplayController, ImageNotFoundError
-from remote_eink.drivers.base import ListenableDisplayDriver, DisplayDriver
+from remote_eink.drivers.base import ListenableDisplayDriver, DisplayDriver, FramebufferImage
 from remote_eink.events import EventListenerController
-from remote_eink.images import Image
+from remote_eink.images import Image, DataBasedImage
 from remote_eink.storage.image.base import ListenableImageStore, ImageStore
 from remote_eink.transformers import ImageTransformerSequence, ImageTransformer, DEFAULT_TRANSFORMERS
-from remote_eink.transformers.sequence import SimpleImageTransformerSequence
+from remote_eink.transformers.base import ListenableMutableImageTransformer
+from remote_eink.transformers.sequence import SimpleImageTransformerSequence, apply_image_transformers
+
+DEFAULT_MAX_RENDER_CACHE_SIZE = 16 * 1024 * 1024
 
 
 class SimpleDisplayController(ListenableDisplayController):
@@ -45,12 +51,25 @@ class SimpleDisplayController(ListenableDisplayController):
     def event_listeners(self) -> EventListenerController[ListenableDisplayController.Event]:
         return self._event_listeners
 
+    @property
+    def lock(self) -> RLock:
+        return self._lock
+
+    @property
+    def render_cache(self) -> LruCache[Hashable, Image]:
+        """
+        Cache of images that have had the image transforms applied (see `apply_image_transforms` and `render`).
+        :return: the cache
+        """
+        return self._render_cache
+
     def __init__(
         self,
         driver: DisplayDriver,
         image_store: ImageStore,
         identifier: Optional[str] = None,
         image_transformers: Sequence[ImageTransformer] = DEFAULT_TRANSFORMERS,
+        max_render_cache_size: int = DEFAULT_MAX_RENDER_CACHE_SIZE,
     ):
         """
         Constructor.
@@ -58,28 +77,40 @@ class SimpleDisplayController(ListenableDisplayController):
         :param image_store: image store
         :param identifier: driver identifier
         :param image_transformers: image display transformers
+        :param max_render_cache_size: maximum number of bytes of transformed images to cache
         """
         self._identifier = identifier if identifier is not None else str(uuid4())
         self._driver = ListenableDisplayDriver(driver)
         self._current_image = None
         self._image_store = ListenableImageStore(image_store)
         self._image_transformers = SimpleImageTransformerSequence(image_transformers)
+        self._render_cache = LruCache[Hashable, Image](max_render_cache_size, size_of=_get_render_size)
+        self._lock = RLock()
 
         self._display_requested = False
         self._event_listeners = EventListenerController[ListenableDisplayController.Event]()
         self._image_store.event_listeners.add_listener(self._on_remove_image, ListenableImageStore.Event.REMOVE)
+        self._image_store.event_listeners.add_listener(self._on_remove_images, ListenableImageStore.Event.REMOVE_MANY)
         self._driver.event_listeners.add_listener(self._on_clear, ListenableDisplayDriver.Event.CLEAR)
         self._driver.event_listeners.add_listener(self._on_display, ListenableDisplayDriver.Event.DISPLAY)
+        self._image_transformers.event_listeners.add_listener(
+            self._on_add_image_transformer, SimpleImageTransformerSequence.Event.ADD
+        )
+        self._image_transformers.event_listeners.add_listener(
+            self._on_remove_image_transformer, SimpleImageTransformerSequence.Event.REMOVE
+        )
+        for image_transformer in self._image_transformers:
+            self._listen_to_image_transformer(image_transformer)
 
     def display(self, image_id: str):
         image = self.image_store.get(image_id)
         if image is None:
             raise ImageNotFoundError(image_id)
         if image != self.current_image:
-            transformed_image = self.apply_image_transforms(image)
+            rendered_image = self.render(image)
             self._display_requested = True
             try:
-                self.driver.display(transformed_image)
+                self.driver.display(rendered_image)
             finally:
                 self._display_requested = False
             self._current_image = image
@@ -88,10 +119,103 @@ class SimpleDisplayController(ListenableDisplayController):
         self.driver.clear()
 
     def apply_image_transforms(self, image: Image) -> Image:
-        for transformer in self.image_transformers:
-            if transformer.active:
-                image = transformer.transform(image)
-        return image
+        active_transformers = [transformer for transformer in self.image_transformers if transformer.active]
+        if len(active_transformers) == 0:
+            return image
+
+        render_key = self._get_render_key(image, active_transformers)
+        transformed_image = self._render_cache.get(render_key)
+        if transformed_image is None:
+            # Transformed images may be lazy, so the result is materialised to stop it being re-rendered on every use
+            transformed_image = _materialise(apply_image_transformers(image, active_transformers))
+            self._render_cache.put(render_key, transformed_image)
+        return transformed_image
+
+    def render(self, image: Image) -> Image:
+        """
+        Renders the given image as it is given to the driver for display: image transforms are applied then, if the
+        driver declares a native format, the result is converted to a framebuffer in that format.
+
+        Renders are cached in the render cache.
+        :param image: image to render
+        :return: rendered image
+        """
+        native_format = self.driver.native_format
+        if native_format is None:
+            return self.apply_image_transforms(image)
+
+        active_transformers = [transformer for transformer in self.image_transformers if transformer.active]
+        render_key = (self._get_render_key(image, active_transformers), native_format)
+        rendered_image = self._render_cache.get(render_key)
+        if rendered_image is None:
+            transformed_image = apply_image_transformers(image, active_transformers)
+            rendered_image = FramebufferImage.from_image(transformed_image, native_format)
+            self._render_cache.put(render_key, rendered_image)
+        return rendered_image
+
+    @staticmethod
+    def _get_render_key(image: Image, active_transformers: Sequence[ImageTransformer]) -> Hashable:
+        """
+        Gets the key of the result of applying the given transformers to the given image in the render cache.
+
+        The key changes if the image data, or anything transformers may depend on, changes.
+        :param image: image to transform
+        :param active_transformers: active transformers, in the order they are applied
+        :return: render cache key
+        """
+        return (
+            image.identifier,
+            image.type,
+            image.digest,
+            _to_hashable(image.metadata),
+            tuple(
+                (transformer.identifier, _to_hashable(transformer.configuration)) for transformer in active_transformers
+            ),
+        )
+
+    def _on_add_image_transformer(self, image_transformer: ImageTransformer, position: int):
+        """
+        Handler for when an image transformer has been added.
+        :param image_transformer: image transformer that has been added
+        :param position: position the image transformer was added at
+        """
+        self._render_cache.clear()
+        self._listen_to_image_transformer(image_transformer)
+
+    def _on_remove_image_transformer(self, image_transformer: ImageTransformer, removed: bool):
+        """
+        Handler for when an image transformer has been removed.
+        :param image_transformer: image transformer that has been removed
+        :param removed: whether the image transformer was removed
+        """
+        if removed:
+            self._render_cache.clear()
+            self._listen_to_image_transformer(image_transformer, listen=False)
+
+    def _on_image_transformer_change(self, *args):
+        """
+        Handler for when an image transformer has been activated, deactivated or reconfigured.
+
+        Cached renders are keyed by transformer configuration so would no longer be used: they are cleared to free
+        space.
+        """
+        self._render_cache.clear()
+
+    def _listen_to_image_transformer(self, image_transformer: ImageTransformer, listen: bool = True):
+        """
+        Starts (or stops) listening to changes of the given image transformer, if it is listenable.
+        :param image_transformer: image transformer to listen to
+        :param listen: `False` to stop listening
+        """
+        if isinstance(image_transformer, ListenableMutableImageTransformer):
+            for event in (
+                ListenableMutableImageTransformer.Event.ACTIVATE_STATE,
+                ListenableMutableImageTransformer.Event.CONFIGURATION,
+            ):
+                if listen:
+                    image_transformer.event_listeners.add_listener(self._on_image_transformer_change, event)
+                else:
+                    image_transformer.event_listeners.remove_listener(self._on_image_transformer_change, event)
 
     def _on_remove_image(self, image_id: str):
         """
@@ -101,6 +225,14 @@ class SimpleDisplayController(ListenableDisplayController):
         if self.current_image and self.current_image.identifier == image_id:
             self.driver.clear()
 
+    def _on_remove_images(self, image_ids: List[str]):
+        """
+        Handler for when a batch of images has been removed from the image store.
+        :param image_ids: IDs of the images that have been removed
+        """
+        for image_id in image_ids:
+            self._on_remove_image(image_id)
+
     def _on_clear(self):
         """
         Handler for when the display is cleared via the driver.
@@ -121,3 +253,34 @@ class SimpleDisplayController(ListenableDisplayController):
                 self.image_store.add(image)
             self._current_image = image
         self.event_listeners.call_listeners(ListenableDisplayController.Event.DISPLAY_CHANGE)
+
+
+def _materialise(image: Image) -> DataBasedImage:
+    """
+    Gets an image that holds the data of the given image in memory.
+    :param image: image to materialise
+    :return: the given image if it already holds its data in memory, else a copy of it that does
+    """
+    if isinstance(image, DataBasedImage):
+        return image
+    return DataBasedImage(image.identifier, image.data, image.type, image.metadata)
+
+
+def _get_render_size(image: Image) -> int:
+    """
+    Gets the number of bytes a rendered image occupies in the render cache.
+    :param image: rendered image
+    :return: size in bytes
+    """
+    if isinstance(image, FramebufferImage):
+        return len(image.framebuffer.data)
+    return image.buffer().nbytes
+
+
+def _to_hashable(value: object) -> Hashable:
+    """
+    Converts the given JSON (or similar) serialisable value to a hashable form.
+    :param value: value to convert
+    :return: hashable form of the value
+    """
+    return json.dumps(value, sort_keys=True, default=repr)
@@ -0,0 +1,150 @@
+import asyncio
+from abc import ABCMeta, abstractmethod
+from concurrent.futures import Executor
+from contextlib import AbstractContextManager
+from typing import Optional
+
+from remote_eink.aio import ExecutorAdapter, EventLoopAdapter
+from remote_eink.drivers.base import DisplayDriver, NativeFormat
+from remote_eink.images import Image
+
+
+class AsyncDisplayDriver(metaclass=ABCMeta):
+    """
+    Asynchronous device display driver (see `DisplayDriver`).
+    """
+
+    @property
+    @abstractmethod
+    def sleeping(self) -> bool:
+        """
+        See `DisplayDriver.sleeping`.
+        """
+
+    @property
+    @abstractmethod
+    def image(self) -> Optional[Image]:
+        """
+        See `DisplayDriver.image`.
+        """
+
+    @property
+    def native_format(self) -> Optional[NativeFormat]:
+        """
+        See `DisplayDriver.native_format`.
+        """
+        return None
+
+    @abstractmethod
+    async def display(self, image: Optional[Image]):
+        """
+        See `DisplayDriver.display`.
+        """
+
+    @abstractmethod
+    async def sleep(self):
+        """
+        See `DisplayDriver.sleep`.
+        """
+
+    @abstractmethod
+    async def wake(self):
+        """
+        See `DisplayDriver.wake`.
+        """
+
+    async def clear(self):
+        """
+        See `DisplayDriver.clear`.
+        """
+        await self.display(None)
+
+
+class ExecutorDisplayDriver(AsyncDisplayDriver, ExecutorAdapter):
+    """
+    Asynchronous interface to a display driver, which runs the driver's blocking calls in an executor one at a time.
+    """
+
+    @property
+    def sleeping(self) -> bool:
+        return self._display_driver.sleeping
+
+    @property
+    def image(self) -> Optional[Image]:
+        return self._display_driver.image
+
+    @property
+    def native_format(self) -> Optional[NativeFormat]:
+        return self._display_driver.native_format
+
+    def __init__(
+        self,
+        display_driver: DisplayDriver,
+        executor: Optional[Executor] = None,
+        lock: Optional[asyncio.Lock] = None,
+        thread_lock: Optional[AbstractContextManager] = None,
+    ):
+        """
+        Constructor.
+        :param display_driver: display driver to run calls of
+        :param executor: see `ExecutorAdapter.__init__`
+        :param lock: see `ExecutorAdapter.__init__` (a lock for the driver is created if `None`)
+        :param thread_lock: see `ExecutorAdapter.__init__`
+        """
+        super().__init__(executor, lock if lock is not None else asyncio.Lock(), thread_lock)
+        self._display_driver = display_driver
+
+    async def display(self, image: Optional[Image]):
+        await self._run_blocking(self._display_driver.display, image)
+
+    async def sleep(self):
+        await self._run_blocking(self._display_driver.sleep)
+
+    async def wake(self):
+        await self._run_blocking(self._display_driver.wake)
+
+    async def clear(self):
+        await self._run_blocking(self._display_driver.clear)
+
+
+class EventLoopDisplayDriver(DisplayDriver, EventLoopAdapter):
+    """
+    Synchronous interface to an asynchronous display driver, which runs the driver on an event loop.
+    """
+
+    @property
+    def sleeping(self) -> bool:
+        return self._display_driver.sleeping
+
+    @property
+    def image(self) -> Optional[Image]:
+        return self._display_driver.image
+
+    @image.setter
+    def image(self, image: Optional[Image]):
+        self.display(image)
+
+    @property
+    def native_format(self) -> Optional[NativeFormat]:
+        return self._display_driver.native_format
+
+    def __init__(self, display_driver: AsyncDisplayDriver, loop: asyncio.AbstractEventLoop):
+        """
+        Constructor.
+        :param display_driver: asynchronous display driver
+        :param loop: see `EventLoopAdapter.__init__`
+        """
+        super().__init__(loop)
+        self._display_driver = display_driver
+
+    def display(self, image: Optional[Image]):
+        self._run_coroutine(self._display_driver.display(image))
+
+    def sleep(self):
+        self._run_coroutine(self._display_driver.sleep())
+
+    def wake(self):
+        self._run_coroutine(self._display_driver.wake())
+
+    def clear(self):
+        self._run_coroutine(self._display_driver.clear())
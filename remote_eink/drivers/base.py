@@ -1,9 +1,211 @@
+import hashlib
 from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass
 from enum import auto, unique, Enum
-from typing import Optional
+from io import BytesIO
+from threading import Lock
+from types import MappingProxyType
+from typing import Optional, List
+
+from PIL import Image as PilImage, ImageOps, ImageChops
 
 from remote_eink.events import EventListenerController
-from remote_eink.images import Image
+from remote_eink.images import Image, ImageType, DataBasedImage, ImageMetadata
+from remote_eink.transformers.base import RasterImage, ImageTypeToPillowFormat
+
+
+@dataclass(frozen=True)
+class NativeFormat:
+    """
+    Geometry and pixel format native to a display device.
+    """
+
+    width: int
+    height: int
+    # Pillow image mode (e.g. "1" for 1-bit pixels)
+    mode: str = "1"
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+
+@dataclass(frozen=True)
+class Framebuffer:
+    """
+    Packed pixel data in a display device's native format (in Pillow's raw layout for the format's mode).
+    """
+
+    format: NativeFormat
+    data: bytes
+
+    def to_raster(self) -> PilImage.Image:
+        """
+        Gets the framebuffer as a raster, without decoding.
+        :return: the raster
+        """
+        return PilImage.frombytes(self.format.mode, self.format.size, self.data)
+
+
+DEFAULT_DIFF_BAND_HEIGHT = 16
+DEFAULT_PARTIAL_REFRESHES_BETWEEN_FULL = 10
+DEFAULT_MAX_PARTIAL_REFRESH_AREA_FRACTION = 0.5
+
+
+@dataclass(frozen=True)
+class Rectangle:
+    """
+    Rectangular region of a display, in pixels (left and top inclusive, right and bottom exclusive).
+    """
+
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+    @property
+    def area(self) -> int:
+        return (self.right - self.left) * (self.bottom - self.top)
+
+
+def find_dirty_rectangles(
+    previous: Framebuffer, current: Framebuffer, band_height: int = DEFAULT_DIFF_BAND_HEIGHT
+) -> List[Rectangle]:
+    """
+    Finds the regions that differ between the given frames.
+
+    The frames are compared in horizontal bands; the changed area within consecutive changed bands is merged into a
+    single rectangle.
+    :param previous: previously displayed frame
+    :param current: frame to display
+    :param band_height: height of the bands, in pixels
+    :return: the regions that differ (empty if the frames are the same)
+    :raises ValueError: if the frames are in different formats
+    """
+    if previous.format != current.format:
+        raise ValueError(f"Cannot compare frames in different formats: {previous.format} != {current.format}")
+    if previous.data == current.data:
+        return []
+
+    difference = ImageChops.difference(previous.to_raster(), current.to_raster())
+    dirty_rectangles = []
+    merging: Optional[Rectangle] = None
+    for top in range(0, difference.height, band_height):
+        bottom = min(top + band_height, difference.height)
+        bounding_box = difference.crop((0, top, difference.width, bottom)).getbbox()
+        if bounding_box is None:
+            if merging is not None:
+                dirty_rectangles.append(merging)
+                merging = None
+            continue
+        left, band_top, right, band_bottom = bounding_box
+        if merging is None:
+            merging = Rectangle(left, top + band_top, right, top + band_bottom)
+        else:
+            merging = Rectangle(min(left, merging.left), merging.top, max(right, merging.right), top + band_bottom)
+    if merging is not None:
+        dirty_rectangles.append(merging)
+    return dirty_rectangles
+
+
+class RefreshPolicy:
+    """
+    Policy for choosing between partial and full display refreshes.
+
+    Partial refreshes are quicker and do not flash the screen but leave ghosting, which is cleared by periodically
+    forcing a full refresh.
+    """
+
+    @property
+    def partial_refreshes_since_full(self) -> int:
+        return self._partial_refreshes_since_full
+
+    def __init__(
+        self,
+        partial_refreshes_between_full: int = DEFAULT_PARTIAL_REFRESHES_BETWEEN_FULL,
+        max_partial_refresh_area_fraction: float = DEFAULT_MAX_PARTIAL_REFRESH_AREA_FRACTION,
+    ):
+        """
+        Constructor.
+        :param partial_refreshes_between_full: number of consecutive partial refreshes after which a full refresh is
+                                               forced
+        :param max_partial_refresh_area_fraction: fraction of the display that can change for a partial refresh to be
+                                                  used
+        """
+        self.partial_refreshes_between_full = partial_refreshes_between_full
+        self.max_partial_refresh_area_fraction = max_partial_refresh_area_fraction
+        self._partial_refreshes_since_full = 0
+
+    def use_partial_refresh(self, native_format: NativeFormat, dirty_rectangles: List[Rectangle]) -> bool:
+        """
+        Chooses whether the refresh of the given dirty rectangles should be partial, recording the choice.
+        :param native_format: format of the display
+        :param dirty_rectangles: regions of the display that have changed
+        :return: `True` if the refresh should be partial, else `False` if it should be full
+        """
+        dirty_area = sum(dirty_rectangle.area for dirty_rectangle in dirty_rectangles)
+        partial = (
+            self._partial_refreshes_since_full < self.partial_refreshes_between_full
+            and dirty_area <= native_format.width * native_format.height * self.max_partial_refresh_area_fraction
+        )
+        self._partial_refreshes_since_full = self._partial_refreshes_since_full + 1 if partial else 0
+        return partial
+
+
+class FramebufferImage(Image):
+    """
+    Image rendered to a display device's native framebuffer.
+
+    Drivers with the same native format display the framebuffer directly. The data of the image (e.g. if read through
+    the API) is the framebuffer encoded as a PNG, which is created when first required. The image's digest is of the
+    framebuffer, so comparing images does not encode them.
+    """
+
+    @staticmethod
+    def from_image(image: Image, native_format: NativeFormat, fill_color: str = "white") -> "FramebufferImage":
+        """
+        Renders the given image to a framebuffer in the given format. The image is scaled to fit the display (keeping
+        its aspect ratio) then converted to the format's mode (dithering, if applicable).
+        :param image: image to render
+        :param native_format: format to render to
+        :param fill_color: color of any area of the display not covered by the image
+        :return: rendered image
+        """
+        raster = RasterImage.from_image(image).raster
+        if raster.size != native_format.size:
+            raster = ImageOps.pad(raster.convert("RGB"), native_format.size, color=fill_color)
+        raster = raster.convert(native_format.mode)
+        return FramebufferImage(image.identifier, Framebuffer(native_format, raster.tobytes()), image.metadata)
+
+    @property
+    def framebuffer(self) -> Framebuffer:
+        return self._framebuffer
+
+    @property
+    def data(self) -> bytes:
+        with self._lock:
+            if self._data is None:
+                byte_io = BytesIO()
+                self._framebuffer.to_raster().save(byte_io, ImageTypeToPillowFormat[self.type])
+                self._data = byte_io.getvalue()
+        return self._data
+
+    def __init__(self, identifier: str, framebuffer: Framebuffer, metadata: ImageMetadata = MappingProxyType({})):
+        """
+        Constructor.
+        :param identifier: see `Image.__init__`
+        :param framebuffer: the rendered framebuffer
+        :param metadata: see `Image.__init__`
+        """
+        digest = hashlib.md5(f"{framebuffer.format!r}:".encode())
+        digest.update(framebuffer.data)
+        super().__init__(identifier, ImageType.PNG, metadata=metadata, digest=digest.hexdigest())
+        self._framebuffer = framebuffer
+        self._data: Optional[bytes] = None
+        self._lock = Lock()
+
+    def __reduce__(self):
+        return DataBasedImage, (self.identifier, self.data, self.type, self.metadata, self.digest)
 
 
 class DisplayDriver(metaclass=ABCMeta):
@@ -34,6 +236,15 @@ class DisplayDriver(metaclass=ABCMeta):
         Sets the image that the device is displaying.
         """
 
+    @property
+    def native_format(self) -> Optional[NativeFormat]:
+        """
+        Gets the geometry and pixel format native to the device, if the driver can display framebuffers in that
+        format (see `FramebufferImage`).
+        :return: native format or `None` if the driver only displays encoded images
+        """
+        return None
+
     @abstractmethod
     def sleep(self):
         """
@@ -80,20 +291,31 @@ class BaseDisplayDriver(DisplayDriver, metaclass=ABCMeta):
         if self.image != image:
             if self.sleeping:
                 self.wake()
-            if image is not None:
-                self._display(image.data)
-            else:
+            if image is None:
                 self._clear()
+                self._framebuffer = None
+            elif isinstance(image, FramebufferImage) and image.framebuffer.format == self.native_format:
+                self._refresh(image.framebuffer)
+            else:
+                if self.image is None or self.image.digest != image.digest:
+                    self._display(image.buffer())
+                self._framebuffer = None
             self._image = image
 
-    def __init__(self, sleeping: bool = False, image: Optional[Image] = None):
+    def __init__(
+        self, sleeping: bool = False, image: Optional[Image] = None, refresh_policy: Optional[RefreshPolicy] = None
+    ):
         """
         Constructor.
         :param sleeping: whether the device is currently sleeping.
         :param image: image to display initially
+        :param refresh_policy: policy for choosing between partial and full refreshes when displaying framebuffers
+                               (see `_display_partial`). If `None`, only full refreshes are used
         """
         self._sleeping = sleeping
         self._image = None
+        self._framebuffer: Optional[Framebuffer] = None
+        self.refresh_policy = refresh_policy
         self.image = image
 
     def clear(self):
@@ -109,13 +331,59 @@ class BaseDisplayDriver(DisplayDriver, metaclass=ABCMeta):
         if self.sleeping:
             self._wake()
             self._sleeping = False
+            # The device may have been reset so the next frame is fully refreshed
+            self._framebuffer = None
 
     @abstractmethod
-    def _display(self, image_data: bytes):
+    def _display(self, image_data: memoryview):
         """
         Display an image using the given image data.
-        :param image_data: data of image to display
+        :param image_data: buffer of the data of the image to display (see `Image.buffer`), which should not be used
+                           after the call returns
+        """
+
+    def _refresh(self, framebuffer: Framebuffer):
+        """
+        Refreshes the display with the given framebuffer, which is in the driver's native format. Only the regions
+        that differ from the displayed framebuffer are refreshed if the refresh policy allows; nothing is refreshed if
+        the frame is unchanged.
+        :param framebuffer: framebuffer to display
         """
+        previous_framebuffer = self._framebuffer
+        # If the refresh fails, what the display shows is unknown so the next frame is fully refreshed
+        self._framebuffer = None
+        if previous_framebuffer is None:
+            self._display_framebuffer(framebuffer)
+        else:
+            dirty_rectangles = find_dirty_rectangles(previous_framebuffer, framebuffer)
+            if len(dirty_rectangles) > 0:
+                if self.refresh_policy is not None and self.refresh_policy.use_partial_refresh(
+                    framebuffer.format, dirty_rectangles
+                ):
+                    self._display_partial(framebuffer, dirty_rectangles)
+                else:
+                    self._display_framebuffer(framebuffer)
+        self._framebuffer = framebuffer
+
+    def _display_partial(self, framebuffer: Framebuffer, dirty_rectangles: List[Rectangle]):
+        """
+        Partially refreshes the display, updating the given regions to the given framebuffer.
+
+        Only called if the driver has a `refresh_policy`. Drivers that support partial refreshes should override this:
+        by default, the whole display is refreshed.
+        :param framebuffer: framebuffer to display, which is in the driver's native format
+        :param dirty_rectangles: regions of the display that have changed since the previously displayed framebuffer
+        """
+        self._display_framebuffer(framebuffer)
+
+    def _display_framebuffer(self, framebuffer: Framebuffer):
+        """
+        Display the given framebuffer, which is in the driver's native format.
+
+        Drivers that declare a `native_format` should override this to display the framebuffer without decoding.
+        :param framebuffer: framebuffer to display
+        """
+        self._display(FramebufferImage("", framebuffer).buffer())
 
     @abstractmethod
     def _clear(self):
@@ -156,6 +424,10 @@ class ListenableDisplayDriver(DisplayDriver):
     def image(self) -> Optional[Image]:
         return self._display_driver.image
 
+    @property
+    def native_format(self) -> Optional[NativeFormat]:
+        return self._display_driver.native_format
+
     @image.setter
     def image(self, image: Optional[Image]):
         self._display_driver.display(image)
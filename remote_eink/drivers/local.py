@@ -26,8 +26,8 @@ class LocalDisplayDriver(BaseDisplayDriver):
         self._parent_connection, self._child_connection = Pipe()
         self._window_process = None
 
-    def _display(self, image_data: bytes):
-        self._parent_connection.send(image_data)
+    def _display(self, image_data: memoryview):
+        self._parent_connection.send(bytes(image_data))
 
     def _clear(self):
         self._parent_connection.send(b"")
@@ -1,10 +1,10 @@
 import logging
-from io import BytesIO
-from typing import Callable, TypeVar, ParamSpec, Optional, Type
+from typing import Callable, TypeVar, ParamSpec, Optional, Type, List
 
 from PIL import Image as PILImage
 
-from remote_eink.drivers.base import BaseDisplayDriver
+from remote_eink.drivers.base import BaseDisplayDriver, NativeFormat, Framebuffer, RefreshPolicy, Rectangle
+from remote_eink.images import ImageBufferStream
 
 logger = logging.getLogger(__name__)
 
@@ -33,20 +33,44 @@ class PaperTtyDisplayDriver(BaseDisplayDriver):
     PaperTTY-based device driver.
     """
 
-    def __init__(self, device_driver_type: Type[DeviceDisplayDriver]):
+    @property
+    def native_format(self) -> Optional[NativeFormat]:
+        return self._native_format
+
+    def __init__(
+        self,
+        device_driver_type: Type[DeviceDisplayDriver],
+        native_mode: str = "1",
+        refresh_policy: Optional[RefreshPolicy] = None,
+    ):
         """
         Constructor.
         :param device_driver_type: type of PaperTTY device display driver
+        :param native_mode: Pillow image mode that the device displays (e.g. "1" for 1-bit, "L" for 8-bit grayscale)
+        :param refresh_policy: see `BaseDisplayDriver.__init__` (only set if the device supports partial refresh)
         """
-        super().__init__()
+        super().__init__(refresh_policy=refresh_policy)
         self._device_driver_type = device_driver_type
         self._papertty: Optional[PaperTTY] = None
         # Wake will initialise PaperTTY
         self._wake()
+        self._native_format = NativeFormat(self._papertty.driver.width, self._papertty.driver.height, native_mode)
+
+    @_assert_papertty_instantiated
+    def _display(self, image_data: memoryview):
+        display_image(self._papertty.driver, PILImage.open(ImageBufferStream(image_data)))
+
+    @_assert_papertty_instantiated
+    def _display_framebuffer(self, framebuffer: Framebuffer):
+        # Already the size and mode of the display so can be drawn without PaperTTY converting it
+        self._papertty.driver.draw(0, 0, framebuffer.to_raster())
 
     @_assert_papertty_instantiated
-    def _display(self, image_data: bytes):
-        display_image(self._papertty.driver, PILImage.open(BytesIO(image_data)))
+    def _display_partial(self, framebuffer: Framebuffer, dirty_rectangles: List[Rectangle]):
+        raster = framebuffer.to_raster()
+        for rectangle in dirty_rectangles:
+            region = raster.crop((rectangle.left, rectangle.top, rectangle.right, rectangle.bottom))
+            self._papertty.driver.draw(rectangle.left, rectangle.top, region)
 
     @_assert_papertty_instantiated
     def _clear(self):
@@ -1,10 +1,14 @@
 import hashlib
+import io
+import mmap
+import os
 from abc import ABCMeta, abstractmethod
 from enum import unique, Enum
 from types import MappingProxyType
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Optional
 
 ImageDataReader = Callable[[], bytes]
+ImageBufferReader = Callable[[], memoryview]
 # XXX: ideally want to limit dict to "Self"
 ImageMetadata = dict[str, str | int | float | dict]
 
@@ -21,6 +25,29 @@ class ImageType(Enum):
     WEBP = "webp"
 
 
+# Number of bytes at the start of image data required by `get_image_type_from_header`
+IMAGE_TYPE_HEADER_SIZE = 12
+
+
+def get_image_type_from_header(header: bytes) -> Optional[ImageType]:
+    """
+    Gets the type of image from the "magic bytes" at the start of the image data.
+
+    Only the header is inspected: the remainder of the image data is not validated.
+    :param header: at least the first `IMAGE_TYPE_HEADER_SIZE` bytes of the image data
+    :return: image type or `None` if the header is not that of a known image type
+    """
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ImageType.PNG
+    if header.startswith(b"\xff\xd8\xff"):
+        return ImageType.JPG
+    if header.startswith(b"BM"):
+        return ImageType.BMP
+    if header[0:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return ImageType.WEBP
+    return None
+
+
 class Image(metaclass=ABCMeta):
     """
     Image that can be displayed on a device.
@@ -34,6 +61,27 @@ class Image(metaclass=ABCMeta):
         :return: bytes of data
         """
 
+    def buffer(self) -> memoryview:
+        """
+        Read-only buffer of the data that makes up the image.
+
+        Unlike `data`, implementations may provide the buffer without copying the data (e.g. by memory-mapping a file).
+        :return: buffer of the image data
+        """
+        return memoryview(self.data)
+
+    @property
+    def digest(self) -> str:
+        """
+        MD5 hex digest of the data that makes up the image.
+
+        Calculated (once) from the image data if not supplied when the image was created.
+        :return: digest
+        """
+        if self._digest is None:
+            self._digest = hashlib.md5(self.buffer()).hexdigest()
+        return self._digest
+
     @property
     def identifier(self) -> str:
         """
@@ -58,12 +106,20 @@ class Image(metaclass=ABCMeta):
         """
         return self._metadata
 
-    def __init__(self, identifier: str, image_type: ImageType, *, metadata: ImageMetadata = MappingProxyType({})):
+    def __init__(
+        self,
+        identifier: str,
+        image_type: ImageType,
+        *,
+        metadata: ImageMetadata = MappingProxyType({}),
+        digest: Optional[str] = None,
+    ):
         """
         Constructor.
         :param identifier: image identifier
         :param image_type: the type of the image (e.g. PNG)
         :param metadata: metadata associated to the image
+        :param digest: MD5 hex digest of the image data, if known (images are immutable so it will not change)
         """
         if not isinstance(image_type, ImageType):
             raise TypeError(f"image_type was of incorrect type: {type(image_type)}")
@@ -72,6 +128,7 @@ class Image(metaclass=ABCMeta):
         self._identifier = identifier
         self._type = image_type
         self._metadata = metadata
+        self._digest = digest
 
     def __repr__(self) -> str:
         return repr(
@@ -79,11 +136,13 @@ class Image(metaclass=ABCMeta):
                 identifier=self.identifier,
                 metadata=self.metadata,
                 image_type=self.type,
-                data_md5=hashlib.md5(self.data).hexdigest(),
+                digest=self.digest,
             )
         )
 
     def __eq__(self, other: Any) -> bool:
+        if other is self:
+            return True
         if not isinstance(other, Image):
             return False
         if other.identifier != self.identifier:
@@ -92,7 +151,7 @@ class Image(metaclass=ABCMeta):
             return False
         if other.type != self.type:
             return False
-        return other.data == self.data
+        return other.digest == self.digest
 
     def __hash__(self) -> int:
         return hash(self.identifier)
@@ -107,8 +166,16 @@ class DataBasedImage(Image):
     def data(self) -> bytes:
         return self._data
 
+    def buffer(self) -> memoryview:
+        return memoryview(self._data)
+
     def __init__(
-        self, identifier: str, data: bytes, image_type: ImageType, metadata: ImageMetadata = MappingProxyType({})
+        self,
+        identifier: str,
+        data: bytes,
+        image_type: ImageType,
+        metadata: ImageMetadata = MappingProxyType({}),
+        digest: Optional[str] = None,
     ):
         """
         Constructor.
@@ -116,8 +183,9 @@ class DataBasedImage(Image):
         :param data: image data
         :param image_type: see `Image.__init__`
         :param metadata: see `Image.__init__`
+        :param digest: see `Image.__init__`
         """
-        super().__init__(identifier, image_type, metadata=metadata)
+        super().__init__(identifier, image_type, metadata=metadata, digest=digest)
         self._data = data
 
 
@@ -130,12 +198,19 @@ class FunctionBasedImage(Image):
     def data(self) -> bytes:
         return self._data_reader()
 
+    def buffer(self) -> memoryview:
+        if self._buffer_reader is None:
+            return super().buffer()
+        return self._buffer_reader()
+
     def __init__(
         self,
         identifier: str,
         data_reader: ImageDataReader,
         image_type: ImageType,
         metadata: ImageMetadata = MappingProxyType({}),
+        buffer_reader: Optional[ImageBufferReader] = None,
+        digest: Optional[str] = None,
     ):
         """
         Constructor.
@@ -143,6 +218,131 @@ class FunctionBasedImage(Image):
         :param data_reader: (reusable) callable that can be used to read a copy of the image data
         :param image_type: see `Image.__init__`
         :param metadata: see `Image.__init__`
+        :param buffer_reader: optional (reusable) callable that can be used to get a buffer of the image data without
+                              copying it. If not given, buffers are created from a copy read with `data_reader`
+        :param digest: see `Image.__init__`
         """
-        super().__init__(identifier, image_type, metadata=metadata)
+        super().__init__(identifier, image_type, metadata=metadata, digest=digest)
         self._data_reader = data_reader
+        self._buffer_reader = buffer_reader
+
+
+class FileBasedImage(Image):
+    """
+    An image based on data stored in a file.
+    """
+
+    @property
+    def data(self) -> bytes:
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    @property
+    def path(self) -> str:
+        """
+        Location of the file containing the image data.
+        :return: path to the file
+        """
+        return self._path
+
+    @property
+    def transferable(self) -> bool:
+        """
+        Whether ownership of the file can be transferred to an image store that the image is added to.
+
+        An image store may move the file into its storage (or delete it), so the image should not be used once added.
+        :return: whether the file is transferable
+        """
+        return self._transferable
+
+    def buffer(self) -> memoryview:
+        return read_file_buffer(self.path)
+
+    def __init__(
+        self,
+        identifier: str,
+        path: str,
+        image_type: ImageType,
+        metadata: ImageMetadata = MappingProxyType({}),
+        *,
+        digest: Optional[str] = None,
+        transferable: bool = False,
+    ):
+        """
+        Constructor.
+        :param identifier: see `Image.__init__`
+        :param path: location of the file containing the image data
+        :param image_type: see `Image.__init__`
+        :param metadata: see `Image.__init__`
+        :param digest: see `Image.__init__`
+        :param transferable: see `FileBasedImage.transferable`
+        """
+        super().__init__(identifier, image_type, metadata=metadata, digest=digest)
+        self._path = path
+        self._transferable = transferable
+
+
+def read_file_buffer(path: str) -> memoryview:
+    """
+    Gets a read-only buffer of the contents of the given file, without copying the contents into memory.
+
+    The file is memory-mapped, so it should not be modified whilst the buffer is in use.
+    :param path: path to the file
+    :return: buffer of the file contents
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return memoryview(b"")
+        # The mapping remains valid after the file is closed and is unmapped once the buffer is released
+        return memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class ImageBufferStream(io.RawIOBase):
+    """
+    Read-only, seekable stream over an image buffer.
+
+    Can be used in place of `BytesIO`, which copies the buffer it is given.
+    """
+
+    def __init__(self, buffer: memoryview):
+        """
+        Constructor.
+        :param buffer: buffer to stream
+        """
+        super().__init__()
+        self._buffer = buffer.cast("B")
+        self._position = 0
+
+    def __len__(self) -> int:
+        # Total size of the stream, as used to determine content length (e.g. by `requests_toolbelt`)
+        return len(self._buffer)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:
+        size = max(0, min(len(buffer), len(self._buffer) - self._position))
+        buffer[:size] = self._buffer[self._position : self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._buffer) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position: {position}")
+        self._position = position
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
@@ -1,89 +1,636 @@
+import io
 import logging
+import os
 import traceback
-from multiprocessing import Lock
-from typing import Any, Callable
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from itertools import count
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from threading import Condition, Lock, Thread, Timer
+from time import monotonic
+from typing import Any, Callable, ContextManager, Optional, Iterable, Mapping, Hashable
 
-from multiprocessing_on_dill.connection import Connection, Pipe
+import _posixshmem
+import dill
+from multiprocessing_on_dill.connection import Connection, Client, Listener
+from multiprocessing_on_dill.reduction import ForkingPickler
+
+DEFAULT_SHARED_MEMORY_THRESHOLD = 64 * 1024
+SHARED_MEMORY_PERSISTENT_ID = "shared-memory"
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_REQUEST_TIMEOUT = 60.0
 
 logger = logging.getLogger(__name__)
 
 
-class RequestReceiver:
+class RequestTimeoutError(TimeoutError):
     """
-    Receiver used to get requests over a multiprocessor pipe.
+    Raised when a response to a request is not received in time.
     """
 
-    RUN_POISON = "+kill"
+    def __init__(self, request_id: int, timeout: float):
+        super().__init__(f"No response to request {request_id} received within {timeout}s")
+        self.request_id = request_id
+        self.timeout = timeout
+
+    def __reduce__(self):
+        return RequestTimeoutError, (self.request_id, self.timeout)
+
+
+class QueueBusyError(RuntimeError):
+    """
+    Raised when a request is rejected because the request being handled in its queue has not completed within its
+    timeout (e.g. due to a hung display driver).
+    """
+
+    def __init__(self, queue: Hashable):
+        super().__init__(f"Request in queue {queue!r} has not completed within its timeout")
+        self.queue = queue
+
+    def __reduce__(self):
+        return QueueBusyError, (self.queue,)
 
-    def __init__(self, connection: Connection):
+
+class _SharedMemoryPickler(ForkingPickler):
+    """
+    Pickler that moves `bytes` payloads at or above a threshold size into shared memory segments, pickling only the
+    segments' handles.
+    """
+
+    def __init__(self, file: io.BytesIO, threshold: int):
+        """
+        Constructor.
+        :param file: file to pickle to
+        :param threshold: size in bytes at or above which payloads are moved into shared memory
+        """
+        super().__init__(file)
+        self.threshold = threshold
+        self.segments: list[SharedMemory] = []
+        # Payloads are kept referenced so that their IDs cannot be reused by other objects whilst pickling
+        self._persistent_ids: dict[int, tuple[bytes, tuple[str, str, int]]] = {}
+
+    def persistent_id(self, obj: Any) -> Optional[tuple[str, str, int]]:
+        if type(obj) is not bytes or len(obj) < self.threshold:
+            return None
+        if id(obj) in self._persistent_ids:
+            return self._persistent_ids[id(obj)][1]
+        segment = SharedMemory(create=True, size=len(obj))
+        # Ownership passes to the receiver, so the segment is not left for this process' resource tracker to clean up
+        _untrack(segment)
+        self.segments.append(segment)
+        segment.buf[: len(obj)] = obj
+        persistent_id = (SHARED_MEMORY_PERSISTENT_ID, segment.name, len(obj))
+        self._persistent_ids[id(obj)] = (obj, persistent_id)
+        return persistent_id
+
+
+class _SharedMemoryUnpickler(dill.Unpickler):
+    """
+    Unpickler of messages pickled by `_SharedMemoryPickler`, which takes ownership of (and unlinks) the shared memory
+    segments referenced in the message.
+    """
+
+    def __init__(self, file: io.BytesIO):
+        """
+        Constructor.
+        :param file: file to unpickle from
+        """
+        super().__init__(file)
+        self._payloads: dict[str, bytes] = {}
+
+    def persistent_load(self, persistent_id: tuple[str, str, int]) -> bytes:
+        kind, name, size = persistent_id
+        if kind != SHARED_MEMORY_PERSISTENT_ID:
+            raise dill.UnpicklingError(f"Unsupported persistent ID: {kind}")
+        payload = self._payloads.get(name)
+        if payload is None:
+            segment = SharedMemory(name=name)
+            # Attaching registers the segment with the resource tracker, which is not required as it is unlinked here
+            _untrack(segment)
+            try:
+                payload = bytes(segment.buf[:size])
+            finally:
+                segment.close()
+                _unlink_untracked(segment)
+            self._payloads[name] = payload
+        return payload
+
+
+def _untrack(segment: SharedMemory):
+    """
+    Unregisters the given shared memory segment from this process' resource tracker, so that the tracker does not
+    unlink it (and warn that it was leaked) when the process exits.
+    :param segment: segment to unregister
+    """
+    resource_tracker.unregister(segment._name, "shared_memory")
+
+
+def _unlink_untracked(segment: SharedMemory):
+    """
+    Unlinks the given shared memory segment, which is not registered with the resource tracker (see `_untrack`).
+    `SharedMemory.unlink` is not used as it unregisters the segment.
+    :param segment: segment to unlink
+    """
+    _posixshmem.shm_unlink(segment._name)
+
+
+class SharedMemoryTransport:
+    """
+    Transport of messages over a multiprocessor connection, where `bytes` payloads (e.g. image data, including that
+    held in closures) at or above a threshold size are moved through shared memory segments and only the segments'
+    handles are sent over the connection.
+
+    Segments are owned by the message they are sent in: the receiving side unlinks each segment as soon as its payload
+    has been copied out, and the sending side unlinks the segments of any message it fails to send. As their lifetime
+    is managed explicitly, segments are not registered with either side's resource tracker.
+    """
+
+    def __init__(self, connection: Connection, threshold: Optional[int] = DEFAULT_SHARED_MEMORY_THRESHOLD):
         """
         Constructor.
         :param connection: multiprocessor connection
+        :param threshold: size in bytes at or above which payloads are moved through shared memory (`None` to send all
+                          payloads over the connection)
         """
         self._connection = connection
+        self._threshold = threshold
+
+    def send(self, message: Any):
+        """
+        Sends the given message.
+        :param message: message to send
+        """
+        if self._threshold is None:
+            self._connection.send(message)
+            return
+
+        buffer = io.BytesIO()
+        pickler = _SharedMemoryPickler(buffer, self._threshold)
+        sent = False
+        try:
+            pickler.dump(message)
+            self._connection.send_bytes(buffer.getbuffer())
+            sent = True
+        finally:
+            for segment in pickler.segments:
+                segment.close()
+                if not sent:
+                    _unlink_untracked(segment)
+
+    def poll(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for a message to be available to receive.
+        :param timeout: maximum number of seconds to wait (`None` to wait indefinitely)
+        :return: whether a message is available
+        """
+        return self._connection.poll(timeout)
+
+    def recv(self) -> Any:
+        """
+        Receives a message, blocking until one is available.
+        :return: the received message
+        """
+        if self._threshold is None:
+            return self._connection.recv()
+        return _SharedMemoryUnpickler(io.BytesIO(self._connection.recv_bytes())).load()
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        self._connection.close()
+
+
+@dataclass(eq=False)
+class _Request:
+    """
+    Request received by a `RequestReceiver`.
+    """
+
+    connection: SharedMemoryTransport
+    send_lock: Lock
+    request_id: int
+    queue: Optional[Hashable]
+    callable: Callable
+    args: Iterable
+    kwargs: Mapping
+    # Number of seconds the sender waits for the response (`None` if it waits indefinitely)
+    timeout: Optional[float]
+    received_at: float = field(default_factory=monotonic)
+    started: bool = False
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """
+        Time (see `monotonic`) after which the sender stops waiting for the response.
+        :return: the deadline (`None` if the sender waits indefinitely)
+        """
+        return self.received_at + self.timeout if self.timeout is not None else None
+
+    def overdue(self, now: float) -> bool:
+        """
+        Gets whether the sender has stopped waiting for the response to the request.
+        :param now: current time (see `monotonic`)
+        :return: whether the request is overdue
+        """
+        return self.timeout is not None and now >= self.deadline
+
+
+class RequestReceiver:
+    """
+    Receiver of requests from `RequestSender`s.
+
+    Each process that sends requests connects to the receiver with its own connection, which responses are sent back
+    on, tagged with the ID of the request that they are in response to.
+
+    Requests are handled concurrently on worker threads, except for requests in the same queue, which are handled one
+    at a time, in the order they were received. Requests waiting for their turn in a queue are held by the receiver
+    rather than occupying a worker, so a busy queue (e.g. the requests to a display that is refreshing) does not hold
+    up the requests in other queues.
+
+    A request that is still being handled after its sender has stopped waiting for the response (e.g. due to a hung
+    display driver) cannot be interrupted, but it stops counting towards the maximum number of workers, so that it
+    does not hold up other queues either. Whilst it is being handled, new requests in its queue are rejected with
+    `QueueBusyError`, rather than being queued behind it. Requests that are overdue by the time that it is their turn
+    are not handled.
+    """
+
+    RUN_POISON = "+kill"
+
+    @property
+    def address(self) -> str:
+        """
+        Address that senders connect to.
+        :return: the address
+        """
+        return self._listener.address
+
+    @property
+    def authkey(self) -> bytes:
+        """
+        Key that senders authenticate with when connecting.
+        :return: the key
+        """
+        return self._authkey
+
+    def __init__(
+        self,
+        request_context: Callable[[Optional[Hashable]], ContextManager] = nullcontext,
+        shared_memory_threshold: Optional[int] = DEFAULT_SHARED_MEMORY_THRESHOLD,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        """
+        Constructor.
+        :param request_context: factory of the context that each received request is handled in, given the queue that
+                                the request was sent to
+        :param shared_memory_threshold: see `SharedMemoryTransport.__init__`
+        :param max_workers: maximum number of requests that are handled at the same time (not counting overdue
+                            requests)
+        """
+        self._authkey = os.urandom(32)
+        self._listener = Listener(family="AF_UNIX", authkey=self._authkey)
+        self._request_context = request_context
+        self._shared_memory_threshold = shared_memory_threshold
+        self._stopped = False
+        self._lock = Lock()
+        # Requests that are waiting for a worker
+        self._ready: deque[_Request] = deque()
+        # Requests that are being handled, and count towards the maximum number of workers
+        self._working: set[_Request] = set()
+        self._available_workers = max_workers
+        # The request that is being handled (or is ready to be) in each queue, and the requests waiting behind it
+        self._current: dict[Hashable, _Request] = {}
+        self._queues: dict[Hashable, deque[_Request]] = {}
+        self._overdue_timer: Optional[Timer] = None
 
     def run(self):
         """
-        Runs the receiver. Will exit when `RUN_POISON` is received as a message.
+        Runs the receiver, accepting connections from senders and receiving requests on them. Will exit when
+        `RUN_POISON` is received as a message, without waiting for requests that are still being handled.
+        """
+        try:
+            while True:
+                connection = self._listener.accept()
+                if self._stopped:
+                    connection.close()
+                    return
+                Thread(
+                    target=self._receive,
+                    args=(SharedMemoryTransport(connection, self._shared_memory_threshold),),
+                    name=f"{type(self).__name__}-connection",
+                    daemon=True,
+                ).start()
+        finally:
+            self._listener.close()
+            with self._lock:
+                self._ready.clear()
+                if self._overdue_timer is not None:
+                    self._overdue_timer.cancel()
+
+    def _receive(self, connection: SharedMemoryTransport):
+        """
+        Receives requests on the given connection until the sender disconnects or the receiver is stopped.
+        :param connection: connection to a sender
+        """
+        send_lock = Lock()
+        try:
+            while not self._stopped:
+                try:
+                    received = connection.recv()
+                except EOFError:
+                    # The sender's process has exited
+                    return
+                if received == RequestReceiver.RUN_POISON:
+                    self._stop()
+                    return
+                request_id, queue, timeout, callable, args, kwargs = received
+                self._submit(_Request(connection, send_lock, request_id, queue, callable, args, kwargs, timeout))
+        finally:
+            connection.close()
+
+    def _stop(self):
+        """
+        Stops the receiver from accepting connections.
         """
-        while True:
-            received = self._connection.recv()
-            if received == RequestReceiver.RUN_POISON:
+        self._stopped = True
+        # Wakes the receiver, which is waiting to accept a connection
+        Client(self._listener.address, authkey=self._authkey).close()
+
+    def _submit(self, request: _Request):
+        """
+        Submits the given request to be handled, after the requests before it in its queue have been handled.
+        :param request: request to submit
+        """
+        with self._lock:
+            busy = False
+            if request.queue is not None:
+                current = self._current.get(request.queue)
+                if current is None:
+                    self._current[request.queue] = request
+                    self._queues[request.queue] = deque()
+                elif current.started and current.overdue(monotonic()):
+                    busy = True
+                else:
+                    self._queues[request.queue].append(request)
+                    return
+            if not busy:
+                self._ready.append(request)
+                self._dispatch()
                 return
+        logger.warning(f"Rejected request {request.request_id}: queue {request.queue!r} is busy")
+        self._respond(request, QueueBusyError(request.queue), True)
+
+    def _dispatch(self):
+        """
+        Starts workers to handle ready requests, whilst workers are available. Must be called with the lock held.
+        """
+        now = monotonic()
+        for request in [request for request in self._working if request.overdue(now)]:
+            # Cannot be interrupted, so no longer counted as a worker
+            self._working.remove(request)
+            self._available_workers += 1
+
+        while len(self._ready) > 0 and self._available_workers > 0:
+            request = self._ready.popleft()
+            request.started = True
+            self._working.add(request)
+            self._available_workers -= 1
+            Thread(target=self._work, args=(request,), name=f"{type(self).__name__}-worker", daemon=True).start()
+
+        if self._overdue_timer is not None:
+            self._overdue_timer.cancel()
+            self._overdue_timer = None
+        deadlines = [request.deadline for request in self._working if request.deadline is not None]
+        if len(self._ready) > 0 and len(deadlines) > 0:
+            # Workers are freed when the requests they are handling become overdue
+            self._overdue_timer = Timer(max(min(deadlines) - now, 0), self._on_overdue)
+            self._overdue_timer.daemon = True
+            self._overdue_timer.start()
+
+    def _on_overdue(self):
+        """
+        Called when a request that is being handled may have become overdue.
+        """
+        with self._lock:
+            self._dispatch()
 
-            callable, args, kwargs = received
-            raised = False
+    def _work(self, request: _Request):
+        """
+        Handles the given request on a worker, then readies the next request waiting in its queue, if any.
+        :param request: request to handle
+        """
+        try:
+            if request.overdue(monotonic()):
+                # The sender has stopped waiting, so the request is not handled
+                self._respond(request, RequestTimeoutError(request.request_id, request.timeout), True)
+            else:
+                self._handle(request)
+        finally:
+            with self._lock:
+                if request in self._working:
+                    self._working.remove(request)
+                    self._available_workers += 1
+                if request.queue is not None:
+                    waiting = self._queues[request.queue]
+                    if len(waiting) == 0:
+                        del self._queues[request.queue]
+                        del self._current[request.queue]
+                    else:
+                        self._current[request.queue] = waiting.popleft()
+                        self._ready.append(self._current[request.queue])
+                if not self._stopped:
+                    self._dispatch()
+
+    def _handle(self, request: _Request):
+        """
+        Handles the given request, sending back the result (or raised exception).
+        :param request: request to handle
+        """
+        raised = False
+        try:
+            with self._request_context(request.queue):
+                result = request.callable(*request.args, **request.kwargs)
+        except Exception as e:
+            result = e
+            traceback.print_exc()
+            raised = True
+        self._respond(request, result, raised)
+
+    def _respond(self, request: _Request, result: Any, raised: bool):
+        """
+        Sends the response to the given request.
+        :param request: request to respond to
+        :param result: result of the request (or raised exception)
+        :param raised: whether the result was raised
+        """
+        with request.send_lock:
             try:
-                result = callable(*args, **kwargs)
+                request.connection.send((request.request_id, result, raised))
             except Exception as e:
-                result = e
-                traceback.print_exc()
-                raised = True
-            self._connection.send((result, raised))
+                # The sender is still waiting for a response, e.g. if the result could not be pickled
+                logger.exception(f"Could not send response to request {request.request_id}")
+                try:
+                    request.connection.send((request.request_id, RuntimeError(f"Could not send response: {e}"), True))
+                except Exception:
+                    # e.g. the sender has disconnected
+                    logger.exception(f"Could not send error response to request {request.request_id}")
 
 
 class RequestSender:
     """
-    Sender of requests over a multiprocessor pipe.
+    Sender of requests to a `RequestReceiver`.
+
+    Each process that uses the sender connects to the receiver with its own connection, made when the process first
+    sends a request, so responses are only received by the process that made the request. Multiple requests can be
+    in-flight at once: whichever waiting thread is not already receiving takes the turn to receive responses, handing
+    those for other requests over to their threads.
     """
 
-    def __init__(self, connection: Connection):
+    def __init__(
+        self,
+        address: str,
+        authkey: bytes,
+        shared_memory_threshold: Optional[int] = DEFAULT_SHARED_MEMORY_THRESHOLD,
+        timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT,
+    ):
         """
         Constructor.
-        :param connection: multiprocessor connection
+        :param address: address of the receiver (see `RequestReceiver.address`)
+        :param authkey: key to authenticate with the receiver (see `RequestReceiver.authkey`)
+        :param shared_memory_threshold: see `SharedMemoryTransport.__init__`
+        :param timeout: default number of seconds to wait for a response to a request (`None` to wait indefinitely)
         """
-        self._connection = connection
-        self._lock = Lock()
+        self._address = address
+        self._authkey = authkey
+        self._shared_memory_threshold = shared_memory_threshold
+        self.timeout = timeout
+        self._reset_connection()
 
     def communicate(self, callable: Callable, *args, **kwargs) -> Any:
+        """
+        Communicates a callable via the connection, waiting for the response up to the default timeout.
+        :param callable: the callable
+        :param args: args for the callable
+        :param kwargs: kwargs for the callable
+        :return: the result received in response
+        :raises RequestTimeoutError: if the response is not received in time
+        """
+        return self.call(callable, args, kwargs)
+
+    def call(
+        self,
+        callable: Callable,
+        args: Iterable = (),
+        kwargs: Optional[Mapping] = None,
+        timeout: Optional[float] = None,
+        queue: Optional[Hashable] = None,
+    ) -> Any:
         """
         Communicates a callable via the connection.
+
+        If the response is not received in time, the callable is not called if it has not started yet, else it is not
+        interrupted and its result is discarded when it is received.
         :param callable: the callable
         :param args: args for the callable
         :param kwargs: kwargs for the callable
+        :param timeout: number of seconds to wait for the response (defaults to the sender's timeout)
+        :param queue: queue that the request is handled in (see `RequestReceiver`), or `None` to handle the request
+                      without waiting for other requests
         :return: the result received in response
+        :raises RequestTimeoutError: if the response is not received in time
+        :raises QueueBusyError: if the request in the given queue that is being handled has overrun its timeout
         """
-        with self._lock:
-            logger.debug(callable, args, kwargs)
-            self._connection.send((callable, args, kwargs))
-            result, raised = self._connection.recv()
-            if raised:
-                raise result
-            return result
+        timeout = timeout if timeout is not None else self.timeout
+        args, kwargs = tuple(args), dict(kwargs if kwargs is not None else {})
+
+        request_id = next(self._request_ids)
+        logger.debug(f"Sending request {request_id}: {callable}, {args}, {kwargs}")
+        self._send((request_id, queue, timeout, callable, args, kwargs))
+
+        result, raised = self._wait_for_response(request_id, timeout)
+        if raised:
+            raise result
+        return result
 
     def stop_receiver(self):
         """
         Stop the connected receiver.
         """
-        with self._lock:
-            self._connection.send(RequestReceiver.RUN_POISON)
+        self._send(RequestReceiver.RUN_POISON)
+
+    def _send(self, message: Any):
+        """
+        Sends the given message to the receiver, connecting to it if this process has not already.
+        :param message: message to send
+        """
+        if os.getpid() != self._pid:
+            self._reset_connection()
+        with self._send_lock:
+            if self._connection is None:
+                self._connection = SharedMemoryTransport(
+                    Client(self._address, authkey=self._authkey), self._shared_memory_threshold
+                )
+            self._connection.send(message)
+
+    def _wait_for_response(self, request_id: int, timeout: Optional[float]) -> tuple[Any, bool]:
+        """
+        Waits for the response to the given request.
+        :param request_id: ID of the request
+        :param timeout: number of seconds to wait (`None` to wait indefinitely)
+        :return: tuple of the result and whether it was raised
+        :raises RequestTimeoutError: if the response is not received in time
+        """
+        deadline = monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while request_id not in self._responses:
+                remaining = deadline - monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    self._abandoned.add(request_id)
+                    raise RequestTimeoutError(request_id, timeout)
+                if self._receiving:
+                    self._condition.wait(remaining)
+                    continue
+
+                self._receiving = True
+                self._condition.release()
+                response = None
+                try:
+                    if self._connection.poll(remaining):
+                        response = self._connection.recv()
+                finally:
+                    self._condition.acquire()
+                    self._receiving = False
+                    self._condition.notify_all()
+
+                if response is not None:
+                    response_id, result, raised = response
+                    if response_id in self._abandoned:
+                        self._abandoned.remove(response_id)
+                    else:
+                        self._responses[response_id] = (result, raised)
+            return self._responses.pop(request_id)
+
+    def _reset_connection(self):
+        """
+        Resets the connection to the receiver and the state of received responses, which belong to the process that
+        created them (i.e. not to a forked process).
+        """
+        self._pid = os.getpid()
+        self._connection: Optional[SharedMemoryTransport] = None
+        self._send_lock = Lock()
+        self._request_ids = count()
+        self._condition = Condition()
+        self._receiving = False
+        self._responses: dict[int, tuple[Any, bool]] = {}
+        self._abandoned: set[int] = set()
 
 
 class CommunicationPipe:
     """
-    Communication pipe that can be used to connect two multiprocessor processes.
-
-    The forked process is expected to be the sender, and the original process is the receiver.
+    Communication pipe between the process that creates it, which runs the receiver, and any processes (including
+    forked processes) that send requests to it.
     """
 
     @property
@@ -94,10 +641,19 @@ class CommunicationPipe:
     def receiver(self) -> RequestReceiver:
         return self._receiver
 
-    def __init__(self):
+    def __init__(
+        self,
+        request_context: Callable[[Optional[Hashable]], ContextManager] = nullcontext,
+        shared_memory_threshold: Optional[int] = DEFAULT_SHARED_MEMORY_THRESHOLD,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT,
+    ):
         """
         Constructor.
+        :param request_context: see `RequestReceiver.__init__`
+        :param shared_memory_threshold: see `SharedMemoryTransport.__init__`
+        :param max_workers: see `RequestReceiver.__init__`
+        :param timeout: see `RequestSender.__init__`
         """
-        parent_connection, child_connection = Pipe(duplex=True)
-        self._receiver = RequestReceiver(parent_connection)
-        self._sender = RequestSender(child_connection)
+        self._receiver = RequestReceiver(request_context, shared_memory_threshold, max_workers)
+        self._sender = RequestSender(self._receiver.address, self._receiver.authkey, shared_memory_threshold, timeout)
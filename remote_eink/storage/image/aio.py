@@ -0,0 +1,241 @@
+import asyncio
+from abc import ABCMeta, abstractmethod
+from concurrent.futures import Executor
+from contextlib import AbstractContextManager
+from typing import Optional, List, Iterable, Iterator, Any, Callable, TypeVar
+
+from remote_eink.aio import ExecutorAdapter, EventLoopAdapter
+from remote_eink.images import Image
+from remote_eink.storage.image.base import ImageStore, ImageIdPage
+
+T = TypeVar("T")
+
+
+class AsyncImageStore(metaclass=ABCMeta):
+    """
+    Asynchronous store of images (see `ImageStore`).
+    """
+
+    @property
+    @abstractmethod
+    def friendly_type_name(self) -> str:
+        """
+        See `ImageStore.friendly_type_name`.
+        """
+
+    @abstractmethod
+    async def count(self) -> int:
+        """
+        Gets the number of images in the store.
+        :return: number of images
+        """
+
+    @abstractmethod
+    async def contains(self, image: Image) -> bool:
+        """
+        Gets whether the given image is in the store.
+        :param image: image to check for
+        :return: whether the image is in the store
+        """
+
+    @abstractmethod
+    async def get(self, image_id: str) -> Optional[Image]:
+        """
+        See `ImageStore.get`.
+        """
+
+    @abstractmethod
+    async def list(self) -> List[Image]:
+        """
+        See `ImageStore.list`.
+        """
+
+    @abstractmethod
+    async def add(self, image: Image):
+        """
+        See `ImageStore.add`.
+        """
+
+    @abstractmethod
+    async def remove(self, image_id: str) -> bool:
+        """
+        See `ImageStore.remove`.
+        """
+
+    @abstractmethod
+    async def get_thumbnail(
+        self, image_id: str, width: Optional[int] = None, height: Optional[int] = None
+    ) -> Optional[Image]:
+        """
+        See `ImageStore.get_thumbnail`.
+        """
+
+    @abstractmethod
+    async def list_ids(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> ImageIdPage:
+        """
+        See `ImageStore.list_ids`.
+        """
+
+    @abstractmethod
+    async def add_many(self, images: Iterable[Image]):
+        """
+        See `ImageStore.add_many`.
+        """
+
+    @abstractmethod
+    async def remove_many(self, image_ids: Iterable[str]) -> List[str]:
+        """
+        See `ImageStore.remove_many`.
+        """
+
+    @abstractmethod
+    async def replace_many(self, images: Iterable[Image], remove_image_ids: Iterable[str] = ()) -> List[str]:
+        """
+        See `ImageStore.replace_many`.
+        """
+
+
+class ExecutorImageStore(AsyncImageStore, ExecutorAdapter):
+    """
+    Asynchronous interface to an image store, which runs the store's blocking calls (e.g. disk reads and thumbnail
+    generation) in an executor.
+
+    Calls that change the store are run under `mutation_lock`, so that they can be serialised with other users of the
+    store's event listeners (e.g. the display driver that a display controller clears when its image is removed).
+    Reads are not run under it, so the store must tolerate being read whilst it is changed.
+    """
+
+    @property
+    def friendly_type_name(self) -> str:
+        return self._image_store.friendly_type_name
+
+    def __init__(
+        self,
+        image_store: ImageStore,
+        executor: Optional[Executor] = None,
+        lock: Optional[asyncio.Lock] = None,
+        mutation_lock: Optional[asyncio.Lock] = None,
+        mutation_thread_lock: Optional[AbstractContextManager] = None,
+    ):
+        """
+        Constructor.
+        :param image_store: image store to run calls of
+        :param executor: see `ExecutorAdapter.__init__`
+        :param lock: see `ExecutorAdapter.__init__` (calls are run concurrently if `None`)
+        :param mutation_lock: lock to also hold whilst running calls that change the store (`lock` if `None`)
+        :param mutation_thread_lock: lock to hold in the executor's thread whilst running calls that change the store
+                                     (see `ExecutorAdapter.__init__`)
+        """
+        super().__init__(executor, lock)
+        self._image_store = image_store
+        self._mutation_lock = mutation_lock if mutation_lock is not None else lock
+        self._mutation_thread_lock = mutation_thread_lock
+
+    async def count(self) -> int:
+        return await self._run_blocking(self._image_store.__len__)
+
+    async def contains(self, image: Image) -> bool:
+        return await self._run_blocking(self._image_store.__contains__, image)
+
+    async def get(self, image_id: str) -> Optional[Image]:
+        return await self._run_blocking(self._image_store.get, image_id)
+
+    async def list(self) -> List[Image]:
+        return await self._run_blocking(self._image_store.list)
+
+    async def add(self, image: Image):
+        await self._run_mutation(self._image_store.add, image)
+
+    async def remove(self, image_id: str) -> bool:
+        return await self._run_mutation(self._image_store.remove, image_id)
+
+    async def get_thumbnail(
+        self, image_id: str, width: Optional[int] = None, height: Optional[int] = None
+    ) -> Optional[Image]:
+        return await self._run_blocking(self._image_store.get_thumbnail, image_id, width, height)
+
+    async def list_ids(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> ImageIdPage:
+        return await self._run_blocking(self._image_store.list_ids, limit, cursor)
+
+    async def add_many(self, images: Iterable[Image]):
+        await self._run_mutation(self._image_store.add_many, list(images))
+
+    async def remove_many(self, image_ids: Iterable[str]) -> List[str]:
+        return await self._run_mutation(self._image_store.remove_many, list(image_ids))
+
+    async def replace_many(self, images: Iterable[Image], remove_image_ids: Iterable[str] = ()) -> List[str]:
+        return await self._run_mutation(self._image_store.replace_many, list(images), list(remove_image_ids))
+
+    async def _run_mutation(self, callable: Callable[..., T], *args) -> T:
+        """
+        Runs the given blocking callable, which changes the store, in the executor under the mutation locks.
+        :param callable: callable to run
+        :param args: args for the callable
+        :return: result of the callable
+        """
+        locks = [self._mutation_lock] if self._mutation_lock is not None else []
+        if self._lock is not None and self._lock is not self._mutation_lock:
+            locks.append(self._lock)
+        thread_lock = self._mutation_thread_lock if self._mutation_thread_lock is not None else self._thread_lock
+        return await self._run_blocking_under(locks, thread_lock, callable, *args)
+
+
+class EventLoopImageStore(ImageStore, EventLoopAdapter):
+    """
+    Synchronous interface to an asynchronous image store, which runs the store on an event loop.
+    """
+
+    @property
+    def friendly_type_name(self) -> str:
+        return self._image_store.friendly_type_name
+
+    def __init__(self, image_store: AsyncImageStore, loop: asyncio.AbstractEventLoop):
+        """
+        Constructor.
+        :param image_store: asynchronous image store
+        :param loop: see `EventLoopAdapter.__init__`
+        """
+        super().__init__(loop)
+        self._image_store = image_store
+
+    def __len__(self) -> int:
+        return self._run_coroutine(self._image_store.count())
+
+    def __iter__(self) -> Iterator[Image]:
+        for image_id in self.list_ids().image_ids:
+            image = self.get(image_id)
+            # Image may have been removed during iteration
+            if image is not None:
+                yield image
+
+    def __contains__(self, x: Any) -> bool:
+        return isinstance(x, Image) and self._run_coroutine(self._image_store.contains(x))
+
+    def get(self, image_id: str) -> Optional[Image]:
+        return self._run_coroutine(self._image_store.get(image_id))
+
+    def list(self) -> List[Image]:
+        return self._run_coroutine(self._image_store.list())
+
+    def add(self, image: Image):
+        self._run_coroutine(self._image_store.add(image))
+
+    def remove(self, image_id: str) -> bool:
+        return self._run_coroutine(self._image_store.remove(image_id))
+
+    def get_thumbnail(
+        self, image_id: str, width: Optional[int] = None, height: Optional[int] = None
+    ) -> Optional[Image]:
+        return self._run_coroutine(self._image_store.get_thumbnail(image_id, width, height))
+
+    def list_ids(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> ImageIdPage:
+        return self._run_coroutine(self._image_store.list_ids(limit, cursor))
+
+    def add_many(self, images: Iterable[Image]):
+        self._run_coroutine(self._image_store.add_many(list(images)))
+
+    def remove_many(self, image_ids: Iterable[str]) -> List[str]:
+        return self._run_coroutine(self._image_store.remove_many(list(image_ids)))
+
+    def replace_many(self, images: Iterable[Image], remove_image_ids: Iterable[str] = ()) -> List[str]:
+        return self._run_coroutine(self._image_store.replace_many(list(images), list(remove_image_ids)))
@@ -1,11 +1,19 @@
+import hashlib
+import os
+import tempfile
 from abc import abstractmethod, ABCMeta
+from dataclasses import dataclass
 from enum import Enum, auto, unique
-from typing import Optional, Iterable, List, Collection, Iterator, Any
+from typing import Optional, Iterable, List, Collection, Iterator, Any, BinaryIO, Tuple
 
 from remote_eink.events import EventListenerController
-from remote_eink.images import Image, ImageDataReader, FunctionBasedImage
+from remote_eink.images import Image, ImageDataReader, FunctionBasedImage, ImageBufferReader
+from remote_eink.storage.image.thumbnail import create_thumbnail, validate_thumbnail_size
 from remote_eink.storage.manifest.base import Manifest, ManifestRecord
 
+SPOOL_FILE_PREFIX = ".spool-"
+_SPOOL_CHUNK_SIZE = 64 * 1024
+
 
 class ImageAlreadyExistsError(ValueError):
     """
@@ -16,6 +24,27 @@ class ImageAlreadyExistsError(ValueError):
         super().__init__(f"Image with the same ID already exists: {image_id}")
 
 
+class ImageDataNotFoundError(LookupError):
+    """
+    Raised when the data of an image in a store cannot be found at its storage location.
+    """
+
+    def __init__(self, storage_location: str):
+        super().__init__(f"Image data not found at storage location: {storage_location}")
+        self.storage_location = storage_location
+
+
+@dataclass
+class ImageIdPage:
+    """
+    Page of image IDs, ordered by ID.
+    """
+
+    image_ids: List[str]
+    # Cursor to get the next page with, or `None` if this is the last page
+    next_cursor: Optional[str] = None
+
+
 class ImageStore(Collection[Image], metaclass=ABCMeta):
     """
     Store of images.
@@ -29,6 +58,15 @@ class ImageStore(Collection[Image], metaclass=ABCMeta):
         :return: name of this image store type
         """
 
+    @property
+    def spool_directory(self) -> Optional[str]:
+        """
+        Directory into which image data can be spooled (see `spool`), such that it can be added to the store as a
+        transferable `FileBasedImage` without being copied.
+        :return: spool directory or `None` if the store does not benefit from spooled data
+        """
+        return None
+
     @abstractmethod
     def get(self, image_id: str) -> Optional[Image]:
         """
@@ -59,6 +97,77 @@ class ImageStore(Collection[Image], metaclass=ABCMeta):
         :return: `True` if an image was matched and removed, else `False`
         """
 
+    def get_thumbnail(
+        self, image_id: str, width: Optional[int] = None, height: Optional[int] = None
+    ) -> Optional[Image]:
+        """
+        Gets a thumbnail of the image with the given ID (see `create_thumbnail`).
+
+        Stores should override if able to keep thumbnails, rather than creating them on every call.
+        :param image_id: ID of the image to get thumbnail of
+        :param width: maximum width of the thumbnail, or `None` for it to be determined by the height
+        :param height: maximum height of the thumbnail, or `None` for it to be determined by the width
+        :return: the thumbnail else `None` if image with the given ID is not in the store
+        :raises ValueError: if neither or a non-positive width or height is given
+        """
+        validate_thumbnail_size(width, height)
+        image = self.get(image_id)
+        if image is None:
+            return None
+        return create_thumbnail(image, width, height)
+
+    def list_ids(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> ImageIdPage:
+        """
+        Gets a page of the IDs of the images in the store, ordered by ID.
+
+        Stores should override if able to get a page without retrieving every image.
+        :param limit: maximum number of IDs in the page (all remaining IDs if `None`)
+        :param cursor: cursor of the page to get (see `ImageIdPage.next_cursor`), or `None` to get the first page
+        :return: page of image IDs
+        """
+        image_ids = sorted(image.identifier for image in self.list() if cursor is None or image.identifier > cursor)
+        return _to_page(image_ids[: limit + 1] if limit is not None else image_ids, limit)
+
+    def add_many(self, images: Iterable[Image]):
+        """
+        Adds the given images to the image store.
+
+        Stores should override if able to add images more efficiently as a batch.
+        :param images: images to add
+        :raises ImageAlreadyExistsError: if an image with the same ID as one of the images already exists (in the store
+                                         or in the batch)
+        """
+        for image in images:
+            self.add(image)
+
+    def remove_many(self, image_ids: Iterable[str]) -> List[str]:
+        """
+        Removes the images with the given IDs from the collection.
+
+        Stores should override if able to remove images more efficiently as a batch.
+        :param image_ids: IDs of images to remove
+        :return: IDs of the images that were matched and removed
+        """
+        return [image_id for image_id in image_ids if self.remove(image_id)]
+
+    def replace_many(self, images: Iterable[Image], remove_image_ids: Iterable[str] = ()) -> List[str]:
+        """
+        Adds the given images, replacing any stored images with the same IDs, and removes the images with the given IDs.
+
+        Stores should override if able to apply the changes together, such that they are applied all or not at all.
+        :param images: images to add
+        :param remove_image_ids: IDs of images to remove
+        :return: IDs of the images in `remove_image_ids` that were matched and removed (replaced images are not included,
+                 unless their IDs are in `remove_image_ids`)
+        :raises ImageAlreadyExistsError: if more than one of the images has the same ID
+        """
+        images = list(images)
+        remove_image_ids = list(remove_image_ids)
+        _check_unique_ids(images)
+        removed = self.remove_many(list(dict.fromkeys([*remove_image_ids, *(image.identifier for image in images)])))
+        self.add_many(images)
+        return _filter_removed(removed, remove_image_ids)
+
 
 class BaseImageStore(ImageStore):
     """
@@ -97,6 +206,79 @@ class BaseImageStore(ImageStore):
         :return: `True` if image was deleted else `False`
         """
 
+    def _add_many(self, images: List[Image]):
+        """
+        Saves the given images, which are known not to be stored.
+
+        Subclasses should override if able to save images more efficiently as a batch.
+        :param images: images to save
+        """
+        for image in images:
+            self._add(image)
+
+    def _remove_many(self, image_ids: List[str]) -> List[str]:
+        """
+        Deletes the images with the given IDs.
+
+        Subclasses should override if able to delete images more efficiently as a batch.
+        :param image_ids: IDs of the images to delete
+        :return: IDs of the images that were deleted
+        """
+        return [image_id for image_id in image_ids if self._remove(image_id)]
+
+    def _replace_many(self, images: List[Image], remove_image_ids: List[str]) -> List[str]:
+        """
+        Saves the given images, deleting any stored images with the same IDs, and deletes the images with the given IDs.
+
+        Subclasses should override if able to apply the changes together.
+        :param images: images to save, which have unique IDs
+        :param remove_image_ids: IDs of the images to delete
+        :return: IDs of the images in `remove_image_ids` that were deleted
+        """
+        removed = self._remove_many(list(dict.fromkeys([*remove_image_ids, *(image.identifier for image in images)])))
+        self._add_many(images)
+        return _filter_removed(removed, remove_image_ids)
+
+    def _list_ids(self, limit: Optional[int], after: Optional[str]) -> List[str]:
+        """
+        Lists the IDs of stored images, ordered by ID.
+
+        Subclasses should override if able to list IDs without retrieving every image.
+        :param limit: maximum number of IDs to list (no limit if `None`)
+        :param after: only list IDs ordered after this ID (from the start if `None`)
+        :return: image IDs
+        """
+        image_ids = sorted(image_id for image_id in self._iter_ids() if after is None or image_id > after)
+        return image_ids[:limit] if limit is not None else image_ids
+
+    def _count(self) -> int:
+        """
+        Counts the stored images.
+
+        Subclasses should override if able to count without retrieving every image.
+        :return: number of stored images
+        """
+        return len(self._list())
+
+    def _has(self, image_id: str) -> bool:
+        """
+        Whether an image with the given ID is stored.
+
+        Subclasses should override if able to check without retrieving the image.
+        :param image_id: ID of the image
+        :return: `True` if the image is stored else `False`
+        """
+        return self._get(image_id) is not None
+
+    def _iter_ids(self) -> Iterator[str]:
+        """
+        Iterates over the IDs of the stored images, in the same order as `_list`.
+
+        Subclasses should override if able to get IDs without retrieving every image.
+        :return: iterator of image IDs
+        """
+        return (image.identifier for image in self._list())
+
     def __init__(self, images: Iterable[Image] = ()):
         """
         Constructor.
@@ -107,13 +289,19 @@ class BaseImageStore(ImageStore):
             self.add(image)
 
     def __len__(self) -> int:
-        return len(self.list())
+        return self._count()
 
     def __iter__(self) -> Iterator[Image]:
-        return iter(self.list())
+        for image_id in self._iter_ids():
+            image = self._get(image_id)
+            # Image may have been removed during iteration
+            if image is not None:
+                yield image
 
     def __contains__(self, x: Any) -> bool:
-        return x in self.list()
+        if not isinstance(x, Image) or not self._has(x.identifier):
+            return False
+        return self._get(x.identifier) == x
 
     def get(self, image_id: str) -> Optional[Image]:
         return self._get(image_id)
@@ -128,6 +316,28 @@ class BaseImageStore(ImageStore):
         removed = self._remove(image_id)
         return removed
 
+    def list_ids(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> ImageIdPage:
+        # The cursor is the last ID in the previous page. One more ID than the limit is listed to find if there are more
+        return _to_page(self._list_ids(limit + 1 if limit is not None else None, cursor), limit)
+
+    def add_many(self, images: Iterable[Image]):
+        images = list(images)
+        # Checked up front so that none of the images are added if any cannot be
+        image_ids = set()
+        for image in images:
+            if image.identifier in image_ids or self._has(image.identifier):
+                raise ImageAlreadyExistsError(image.identifier)
+            image_ids.add(image.identifier)
+        self._add_many(images)
+
+    def remove_many(self, image_ids: Iterable[str]) -> List[str]:
+        return self._remove_many(list(image_ids))
+
+    def replace_many(self, images: Iterable[Image], remove_image_ids: Iterable[str] = ()) -> List[str]:
+        images = list(images)
+        _check_unique_ids(images)
+        return self._replace_many(images, list(remove_image_ids))
+
 
 class ManifestBasedImageStore(BaseImageStore, metaclass=ABCMeta):
     """
@@ -140,16 +350,31 @@ class ManifestBasedImageStore(BaseImageStore, metaclass=ABCMeta):
     def _get_image_reader(self, storage_location: str) -> ImageDataReader:
         """
         Gets reader for the given storage location.
+
+        Called for every image listed, so should not access storage until the reader is called. The reader should raise
+        `ImageDataNotFoundError` if there is no data at the storage location.
         :param storage_location: storage location
         :return: image reader for the storage location
         """
 
+    def _get_image_buffer_reader(self, storage_location: str) -> Optional[ImageBufferReader]:
+        """
+        Gets reader of buffers (see `Image.buffer`) for the given storage location.
+
+        As with `_get_image_reader`, storage should not be accessed until the reader is called.
+        :param storage_location: storage location
+        :return: buffer reader for the storage location or `None` if buffers should be created from copies of the data
+        """
+        return None
+
     @abstractmethod
-    def _add_to_storage_location(self, image: Image, suffix: str = "") -> str:
+    def _add_to_storage_location(self, image: Image) -> str:
         """
         Adds the given image to a storage location determined by this store.
+
+        The store may return a storage location that is already referenced by other images (e.g. if the store is
+        content-addressed and the images have identical data).
         :param image: image to store
-        :param suffix: suffix to add to the file name (e.g. f"/this/image-{suffix}.jpg")
         :return: location where image has been stored
         """
 
@@ -157,6 +382,8 @@ class ManifestBasedImageStore(BaseImageStore, metaclass=ABCMeta):
     def _remove_from_storage_location(self, storage_location: str):
         """
         Removes the image at the given storage location.
+
+        Only called once no images reference the storage location.
         :param storage_location: location of image to remove
         """
 
@@ -178,20 +405,73 @@ class ManifestBasedImageStore(BaseImageStore, metaclass=ABCMeta):
     def _list(self) -> List[Image]:
         return [self._get_image(manifest_record) for manifest_record in self._manifest.list()]
 
+    def _count(self) -> int:
+        return self._manifest.count()
+
+    def _list_ids(self, limit: Optional[int], after: Optional[str]) -> List[str]:
+        return self._manifest.list_ids(limit, after)
+
+    def _has(self, image_id: str) -> bool:
+        return self._manifest.get_by_image_id(image_id) is not None
+
+    def _iter_ids(self) -> Iterator[str]:
+        return self._manifest.iter_ids()
+
     def _add(self, image: Image):
         if self._manifest.get_by_image_id(image.identifier) is not None:
             raise ImageAlreadyExistsError(image.identifier)
         storage_location = self._add_to_storage_location(image)
-        self._manifest.add(image.identifier, image.type, image.metadata, storage_location)
+        self._manifest.add(image.identifier, image.type, image.metadata, storage_location, image.digest)
 
     def _remove(self, image_id: str) -> bool:
         manifest_record = self._manifest.get_by_image_id(image_id)
         if not manifest_record:
             return False
         self._manifest.remove(image_id)
-        self._remove_from_storage_location(manifest_record.storage_location)
+        if self._manifest.get_reference_count(manifest_record.storage_location) == 0:
+            self._remove_from_storage_location(manifest_record.storage_location)
         return True
 
+    def _add_many(self, images: List[Image]):
+        self._replace_many(images, [])
+
+    def _remove_many(self, image_ids: List[str]) -> List[str]:
+        return self._replace_many([], image_ids)
+
+    def _replace_many(self, images: List[Image], remove_image_ids: List[str]) -> List[str]:
+        removed = []
+        removed_storage_locations = set()
+        added_storage_locations = set()
+        try:
+            with self._manifest.transaction():
+                for image_id in dict.fromkeys([*remove_image_ids, *(image.identifier for image in images)]):
+                    manifest_record = self._manifest.get_by_image_id(image_id)
+                    if manifest_record is not None:
+                        self._manifest.remove(image_id)
+                        removed.append(image_id)
+                        removed_storage_locations.add(manifest_record.storage_location)
+                for image in images:
+                    storage_location = self._add_to_storage_location(image)
+                    added_storage_locations.add(storage_location)
+                    self._manifest.add(image.identifier, image.type, image.metadata, storage_location, image.digest)
+        except BaseException:
+            # Data written for records that have been rolled back is not referenced (nor is the data of records that
+            # were removed, if the manifest cannot roll back)
+            self._remove_unreferenced(added_storage_locations | removed_storage_locations)
+            raise
+        # Data is only removed once the removal of the records has been committed
+        self._remove_unreferenced(removed_storage_locations)
+        return _filter_removed(removed, remove_image_ids)
+
+    def _remove_unreferenced(self, storage_locations: Iterable[str]):
+        """
+        Removes the data at the given storage locations that are not referenced by any image.
+        :param storage_locations: storage locations to check
+        """
+        for storage_location in storage_locations:
+            if self._manifest.get_reference_count(storage_location) == 0:
+                self._remove_from_storage_location(storage_location)
+
     def _get_image(self, manifest_record: ManifestRecord) -> Image:
         """
         Gets the image in the store associated to the given manifest record.
@@ -199,8 +479,14 @@ class ManifestBasedImageStore(BaseImageStore, metaclass=ABCMeta):
         :return: the image
         """
         image_reader = self._get_image_reader(manifest_record.storage_location)
+        buffer_reader = self._get_image_buffer_reader(manifest_record.storage_location)
         return FunctionBasedImage(
-            manifest_record.identifier, image_reader, manifest_record.image_type, manifest_record.metadata
+            manifest_record.identifier,
+            image_reader,
+            manifest_record.image_type,
+            manifest_record.metadata,
+            buffer_reader=buffer_reader,
+            digest=manifest_record.digest,
         )
 
 
@@ -217,6 +503,12 @@ class ListenableImageStore(ImageStore):
     class Event(Enum):
         ADD = auto()
         REMOVE = auto()
+        ADD_MANY = auto()
+        REMOVE_MANY = auto()
+
+    @property
+    def spool_directory(self) -> Optional[str]:
+        return self._image_store.spool_directory
 
     def __len__(self) -> int:
         return self._image_store.__len__()
@@ -249,3 +541,91 @@ class ListenableImageStore(ImageStore):
         removed = self._image_store.remove(image_id)
         self.event_listeners.call_listeners(ListenableImageStore.Event.REMOVE, [image_id])
         return removed
+
+    def get_thumbnail(
+        self, image_id: str, width: Optional[int] = None, height: Optional[int] = None
+    ) -> Optional[Image]:
+        return self._image_store.get_thumbnail(image_id, width, height)
+
+    def list_ids(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> ImageIdPage:
+        return self._image_store.list_ids(limit, cursor)
+
+    def add_many(self, images: Iterable[Image]):
+        images = list(images)
+        self._image_store.add_many(images)
+        self.event_listeners.call_listeners(ListenableImageStore.Event.ADD_MANY, [images])
+
+    def remove_many(self, image_ids: Iterable[str]) -> List[str]:
+        removed = self._image_store.remove_many(image_ids)
+        self.event_listeners.call_listeners(ListenableImageStore.Event.REMOVE_MANY, [removed])
+        return removed
+
+    def replace_many(self, images: Iterable[Image], remove_image_ids: Iterable[str] = ()) -> List[str]:
+        images = list(images)
+        removed = self._image_store.replace_many(images, remove_image_ids)
+        # Replaced images are announced as added, rather than as removed and then added
+        self.event_listeners.call_listeners(ListenableImageStore.Event.REMOVE_MANY, [removed])
+        self.event_listeners.call_listeners(ListenableImageStore.Event.ADD_MANY, [images])
+        return removed
+
+
+def _check_unique_ids(images: List[Image]):
+    """
+    Checks that the given images have unique IDs.
+    :param images: images to check
+    :raises ImageAlreadyExistsError: if more than one of the images has the same ID
+    """
+    image_ids = set()
+    for image in images:
+        if image.identifier in image_ids:
+            raise ImageAlreadyExistsError(image.identifier)
+        image_ids.add(image.identifier)
+
+
+def _filter_removed(removed: Iterable[str], remove_image_ids: Iterable[str]) -> List[str]:
+    """
+    Filters the IDs of removed images to those that were requested to be removed (rather than replaced).
+    :param removed: IDs of removed images
+    :param remove_image_ids: IDs of images requested to be removed
+    :return: IDs of the removed images that were requested to be removed
+    """
+    remove_image_ids = set(remove_image_ids)
+    return [image_id for image_id in removed if image_id in remove_image_ids]
+
+
+def _to_page(image_ids: List[str], limit: Optional[int]) -> ImageIdPage:
+    """
+    Creates a page from the given image IDs.
+    :param image_ids: ordered image IDs from the start of the page, including the first ID of the next page if there is
+                      one
+    :param limit: maximum number of IDs in the page (all IDs if `None`)
+    :return: the page
+    """
+    if limit is not None and limit < 1:
+        raise ValueError(f"Page limit must be positive: {limit}")
+    if limit is None or len(image_ids) <= limit:
+        return ImageIdPage(image_ids)
+    return ImageIdPage(image_ids[:limit], image_ids[limit - 1])
+
+
+def spool(stream: BinaryIO, directory: str, header: bytes = b"") -> Tuple[str, str]:
+    """
+    Spools the contents of the given stream into a new file in the given directory, calculating the MD5 digest of the
+    contents as they are copied.
+    :param stream: stream to spool
+    :param directory: directory to spool into (see `ImageStore.spool_directory`)
+    :param header: bytes already read from the start of the stream
+    :return: tuple where the first element is the path of the spooled file and the second is its MD5 hex digest
+    """
+    md5 = hashlib.md5(header)
+    file_descriptor, path = tempfile.mkstemp(prefix=SPOOL_FILE_PREFIX, dir=directory)
+    try:
+        with os.fdopen(file_descriptor, "wb") as file:
+            file.write(header)
+            for chunk in iter(lambda: stream.read(_SPOOL_CHUNK_SIZE), b""):
+                md5.update(chunk)
+                file.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, md5.hexdigest()
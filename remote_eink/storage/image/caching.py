@@ -0,0 +1,158 @@
+from typing import Optional, List, Iterator, Iterable, Tuple
+
+from remote_eink.cache import LruCache
+from remote_eink.images import Image
+from remote_eink.storage.image.base import ImageStore, ListenableImageStore, ImageIdPage
+
+DEFAULT_MAX_CACHE_SIZE = 32 * 1024 * 1024
+
+
+class CachingImageStore(ImageStore):
+    """
+    Image store that keeps the data of recently read images in memory, in front of an underlying image store.
+
+    Data is cached by image ID and digest, so an image that has been replaced is never read from the cache, even via an
+    image that was got before the replacement. Cached data is freed when images are removed via this store, or via the
+    underlying store if it is a `ListenableImageStore`.
+    """
+
+    @property
+    def friendly_type_name(self) -> str:
+        return f"Caching{self._image_store.friendly_type_name}"
+
+    @property
+    def spool_directory(self) -> Optional[str]:
+        return self._image_store.spool_directory
+
+    @property
+    def cache(self) -> LruCache[Tuple[str, str], bytes]:
+        """
+        Cache of image data, keyed by image ID and digest.
+        :return: the cache
+        """
+        return self._cache
+
+    def __init__(self, image_store: ImageStore, max_cache_size: int = DEFAULT_MAX_CACHE_SIZE):
+        """
+        Constructor.
+        :param image_store: underlying image store to cache the data of
+        :param max_cache_size: maximum number of bytes of image data to cache
+        """
+        self._image_store = image_store
+        self._cache = LruCache[Tuple[str, str], bytes](max_cache_size)
+        if isinstance(image_store, ListenableImageStore):
+            image_store.event_listeners.add_listener(
+                lambda image: self.invalidate(image.identifier), ListenableImageStore.Event.ADD
+            )
+            image_store.event_listeners.add_listener(self.invalidate, ListenableImageStore.Event.REMOVE)
+            image_store.event_listeners.add_listener(
+                lambda images: self.invalidate(*(image.identifier for image in images)),
+                ListenableImageStore.Event.ADD_MANY,
+            )
+            image_store.event_listeners.add_listener(
+                lambda image_ids: self.invalidate(*image_ids), ListenableImageStore.Event.REMOVE_MANY
+            )
+
+    def __len__(self) -> int:
+        return self._image_store.__len__()
+
+    def __iter__(self) -> Iterator[Image]:
+        return (self._wrap(image) for image in self._image_store)
+
+    def __contains__(self, x: object) -> bool:
+        return self._image_store.__contains__(x)
+
+    def get(self, image_id: str) -> Optional[Image]:
+        image = self._image_store.get(image_id)
+        return self._wrap(image) if image is not None else None
+
+    def list(self) -> List[Image]:
+        return [self._wrap(image) for image in self._image_store.list()]
+
+    def get_thumbnail(
+        self, image_id: str, width: Optional[int] = None, height: Optional[int] = None
+    ) -> Optional[Image]:
+        return self._image_store.get_thumbnail(image_id, width, height)
+
+    def list_ids(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> ImageIdPage:
+        return self._image_store.list_ids(limit, cursor)
+
+    def add(self, image: Image):
+        self.invalidate(image.identifier)
+        self._image_store.add(image)
+
+    def remove(self, image_id: str) -> bool:
+        self.invalidate(image_id)
+        return self._image_store.remove(image_id)
+
+    def add_many(self, images: Iterable[Image]):
+        images = list(images)
+        self.invalidate(*(image.identifier for image in images))
+        self._image_store.add_many(images)
+
+    def remove_many(self, image_ids: Iterable[str]) -> List[str]:
+        image_ids = list(image_ids)
+        self.invalidate(*image_ids)
+        return self._image_store.remove_many(image_ids)
+
+    def replace_many(self, images: Iterable[Image], remove_image_ids: Iterable[str] = ()) -> List[str]:
+        images = list(images)
+        remove_image_ids = list(remove_image_ids)
+        self.invalidate(*remove_image_ids, *(image.identifier for image in images))
+        return self._image_store.replace_many(images, remove_image_ids)
+
+    def invalidate(self, *image_ids: str):
+        """
+        Removes the cached data of the images with the given IDs.
+        :param image_ids: IDs of the images
+        """
+        image_ids = set(image_ids)
+        for key in self._cache.keys():
+            if key[0] in image_ids:
+                self._cache.remove(key)
+
+    def _wrap(self, image: Image) -> Image:
+        """
+        Wraps the given image from the underlying store such that its data is read via the cache.
+        :param image: image to wrap
+        :return: wrapped image
+        """
+        return _CachedImage(image, self._cache)
+
+
+class _CachedImage(Image):
+    """
+    Image with data read via a cache.
+    """
+
+    @property
+    def data(self) -> bytes:
+        key = (self.identifier, self.digest)
+        data = self._cache.get(key)
+        if data is None:
+            data = self._image.data
+            self._cache.put(key, data)
+        return data
+
+    @property
+    def digest(self) -> str:
+        # Stores may know the digest without reading the data
+        return self._image.digest
+
+    def __init__(self, image: Image, cache: LruCache[Tuple[str, str], bytes]):
+        """
+        Constructor.
+        :param image: image to read data of via the cache
+        :param cache: cache of image data, keyed by image ID and digest
+        """
+        super().__init__(image.identifier, image.type, metadata=image.metadata)
+        self._image = image
+        self._cache = cache
+
+    def __reduce__(self):
+        # The cache belongs to this process, so the image is transferred to other processes without it
+        return _get_image, (self._image,)
+
+
+def _get_image(image: Image) -> Image:
+    return image
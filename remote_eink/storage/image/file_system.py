@@ -1,33 +1,110 @@
+import errno
 import hashlib
+import logging
 import os
-from typing import Iterable, Optional
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Type, Dict, List
 
-from remote_eink.images import Image, ImageDataReader
-from remote_eink.storage.image.base import ManifestBasedImageStore
-from remote_eink.storage.manifest.base import Manifest
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.base import STATE_RUNNING
+
+from remote_eink.images import (
+    Image,
+    ImageDataReader,
+    ImageType,
+    ImageBufferReader,
+    FileBasedImage,
+    read_file_buffer,
+)
+from remote_eink.storage.image.base import ManifestBasedImageStore, SPOOL_FILE_PREFIX, ImageDataNotFoundError
+from remote_eink.storage.image.thumbnail import create_thumbnail, validate_thumbnail_size
+from remote_eink.storage.manifest.base import Manifest, ManifestRecord
+from remote_eink.storage.manifest.sqlite import SqliteManifest, migrate_from_tiny_db
 from remote_eink.storage.manifest.tiny_db import TinyDbManifest
 
+MANIFEST_FILE_NAMES: Dict[Type[Manifest], str] = {
+    TinyDbManifest: "manifest.json",
+    SqliteManifest: "manifest.sqlite",
+}
+DEFAULT_SECONDS_BETWEEN_CONSISTENCY_CHECK = 60 * 60
+THUMBNAIL_DIRECTORY_NAME = "thumbnails"
+
+_logger = logging.getLogger(__name__)
+
 
 class FileSystemImageStore(ManifestBasedImageStore):
     """
     File system based image store.
+
+    Files are content-addressed: images with identical data (and type) share a single file, which is removed once no
+    images reference it.
+
+    Thumbnails are kept in a subdirectory once created, until the file they were created from is removed.
     """
 
     @property
     def friendly_type_name(self) -> str:
         return "FileSystem"
 
-    def __init__(self, root_directory: str, images: Iterable[Image] = (), manifest: Optional[Manifest] = None):
+    @property
+    def spool_directory(self) -> str:
+        # Spooling into the root directory allows spooled files to be atomically moved into place
+        return self._root_directory
+
+    def __init__(
+        self,
+        root_directory: str,
+        images: Iterable[Image] = (),
+        manifest: Optional[Manifest] = None,
+        manifest_type: Type[Manifest] = TinyDbManifest,
+        check_consistency_every_seconds: Optional[float] = None,
+    ):
+        """
+        Constructor.
+        :param root_directory: directory to store images in
+        :param images: images to initially add to the store
+        :param manifest: manifest to use, instead of one of the given type in the root directory
+        :param manifest_type: type of manifest to create in the root directory if a manifest is not given (see
+                              `MANIFEST_FILE_NAMES`). An existing TinyDB manifest is migrated to a new SQLite manifest
+        :param check_consistency_every_seconds: number of seconds between background consistency checks (see
+                                                `start_consistency_checks`), or `None` to not check in the background
+        """
         self._root_directory = root_directory
+        self._thumbnail_directory = os.path.join(root_directory, THUMBNAIL_DIRECTORY_NAME)
         if not os.path.exists(self._root_directory):
             os.makedirs(root_directory)
 
         # self._cache = {}
-        manifest = (
-            manifest if manifest is not None else TinyDbManifest(os.path.join(self._root_directory, "manifest.json"))
-        )
+        if manifest is None:
+            manifest = manifest_type(os.path.join(self._root_directory, MANIFEST_FILE_NAMES[manifest_type]))
+            tiny_db_location = os.path.join(self._root_directory, MANIFEST_FILE_NAMES[TinyDbManifest])
+            if isinstance(manifest, SqliteManifest) and os.path.exists(tiny_db_location):
+                migrate_from_tiny_db(tiny_db_location, manifest)
         super().__init__(images, manifest)
 
+        self.consistency_checker: Optional[ConsistencyChecker] = None
+        if check_consistency_every_seconds is not None:
+            self.start_consistency_checks(check_consistency_every_seconds)
+
+    def start_consistency_checks(self, check_every_seconds: float = DEFAULT_SECONDS_BETWEEN_CONSISTENCY_CHECK):
+        """
+        Starts checking the consistency of the store in a background thread (see `ConsistencyChecker`), which runs until
+        the store is closed.
+        :param check_every_seconds: number of seconds between checks (ignored if already checking)
+        """
+        if self.consistency_checker is None:
+            self.consistency_checker = ConsistencyChecker(self, check_every_seconds)
+        self.consistency_checker.start()
+
+    def close(self):
+        """
+        Stops the store's background work (i.e. consistency checks).
+        """
+        if self.consistency_checker is not None:
+            self.consistency_checker.stop()
+
     # # FIXME: putting it in a "cache" is really just a hack to keep the reference alive when held only through a proxy
     # def get(self, image_id: str) -> Optional[Image]:
     #     image = super().get(image_id)
@@ -50,39 +127,307 @@ class FileSystemImageStore(ManifestBasedImageStore):
     #             images[i] = cache_copy
     #     return images
 
+    def get_thumbnail(
+        self, image_id: str, width: Optional[int] = None, height: Optional[int] = None
+    ) -> Optional[Image]:
+        validate_thumbnail_size(width, height)
+        manifest_record = self._manifest.get_by_image_id(image_id)
+        if manifest_record is None:
+            return None
+
+        path = os.path.join(
+            self._thumbnail_directory, _get_thumbnail_file_name(manifest_record.storage_location, width, height)
+        )
+        if not os.path.exists(path):
+            image = self._get_image(manifest_record)
+            thumbnail = create_thumbnail(image, width, height)
+            if thumbnail is image:
+                return image
+            os.makedirs(self._thumbnail_directory, exist_ok=True)
+            self._write(path, thumbnail)
+        return FileBasedImage(manifest_record.identifier, path, manifest_record.image_type, manifest_record.metadata)
+
     def _get_image_reader(self, storage_location: str) -> ImageDataReader:
         path = os.path.join(self._root_directory, storage_location)
-        if not os.path.exists(path):
-            raise AssertionError(f"Expected image to exist at location: {path}")
 
         # Not using lambda as observing file not closed warnings
         def reader() -> bytes:
-            with open(path, "rb") as file:
-                return file.read()
+            try:
+                with open(path, "rb") as file:
+                    return file.read()
+            except FileNotFoundError as e:
+                raise ImageDataNotFoundError(storage_location) from e
 
         return reader
 
-    def _add_to_storage_location(self, image: Image, suffix: str = "") -> str:
-        md5 = hashlib.md5(image.data).hexdigest()
-        storage_location = f"{md5}{suffix}.{image.type.value}"
+    def _get_image_buffer_reader(self, storage_location: str) -> ImageBufferReader:
+        path = os.path.join(self._root_directory, storage_location)
 
-        if self._manifest.get_by_storage_location(storage_location) is not None:
-            # Name collision - add suffix
-            dash_index = suffix.rfind("-")
-            if dash_index == "-1" or not suffix[dash_index:].isdigit():
-                suffix = f"{suffix}-1"
-            else:
-                suffix = f"{suffix}{suffix[0:dash_index]}{int(suffix[dash_index:]) + 1}"
-            return self._add_to_storage_location(image, suffix)
+        # Files are content-addressed so are never modified in place, making it safe to map them
+        def buffer_reader() -> memoryview:
+            try:
+                return read_file_buffer(path)
+            except FileNotFoundError as e:
+                raise ImageDataNotFoundError(storage_location) from e
 
-        path = os.path.join(self._root_directory, storage_location)
-        if os.path.exists(path):
-            raise AssertionError(f"File already exists: {path}")
-        with open(path, "wb") as file:
-            file.write(image.data)
+        return buffer_reader
+
+    def _add_to_storage_location(self, image: Image) -> str:
+        storage_location = self._get_content_address(image.digest, image.type)
+
+        transfer = isinstance(image, FileBasedImage) and image.transferable
+        if self._manifest.get_by_storage_location(storage_location) is None:
+            # Any file that already exists at the location is not referenced (e.g. left over from an interrupted write)
+            path = os.path.join(self._root_directory, storage_location)
+            if transfer:
+                try:
+                    os.replace(image.path, path)
+                    return storage_location
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+            self._write(path, image)
+        if transfer:
+            os.remove(image.path)
         return storage_location
 
     def _remove_from_storage_location(self, storage_location: str):
         path = os.path.join(self._root_directory, storage_location)
         assert os.path.exists(path)
         os.remove(path)
+        if os.path.exists(self._thumbnail_directory):
+            thumbnail_file_name_prefix = _get_thumbnail_file_name(storage_location)
+            for entry in os.scandir(self._thumbnail_directory):
+                if entry.name.startswith(thumbnail_file_name_prefix):
+                    os.remove(entry.path)
+
+    def check_consistency(self) -> "ConsistencyReport":
+        """
+        Checks that the manifest and the files in the root directory agree.
+
+        Made with a single listing of the root directory, rather than checking each file in turn. Images that are being
+        added or removed whilst the check runs may be reported as mismatches.
+        :return: report of mismatches
+        """
+        file_names = {
+            entry.name
+            for entry in os.scandir(self._root_directory)
+            if entry.is_file() and not entry.name.startswith(SPOOL_FILE_PREFIX) and not _is_manifest_file(entry.name)
+        }
+        manifest_records = self._manifest.list()
+        return ConsistencyReport(
+            missing=[
+                manifest_record
+                for manifest_record in manifest_records
+                if manifest_record.storage_location not in file_names
+            ],
+            unreferenced=sorted(
+                file_names - {manifest_record.storage_location for manifest_record in manifest_records}
+            ),
+        )
+
+    def deduplicate(self) -> "DeduplicationReport":
+        """
+        Ensures that images with identical content share a single file.
+
+        Stores written before files were content-addressed may hold several copies of the same content (e.g.
+        `{md5}.png` and `{md5}-1.png`). Digests missing from the manifest are also recorded. Images whose data is
+        missing (see `check_consistency`) are skipped and reported.
+        :return: report of the deduplication
+        """
+        report = DeduplicationReport(missing=self.check_consistency().missing)
+        missing_identifiers = {manifest_record.identifier for manifest_record in report.missing}
+        for manifest_record in self._manifest.list():
+            if manifest_record.identifier in missing_identifiers:
+                continue
+            path = os.path.join(self._root_directory, manifest_record.storage_location)
+            try:
+                md5 = _calculate_file_md5(path)
+            except FileNotFoundError:
+                # Removed since the consistency check
+                report.missing.append(manifest_record)
+                continue
+            storage_location = self._get_content_address(md5, manifest_record.image_type)
+            relocate = storage_location != manifest_record.storage_location
+            if not relocate and manifest_record.digest == md5:
+                continue
+
+            if relocate and self._manifest.get_reference_count(storage_location) == 0:
+                target_path = os.path.join(self._root_directory, storage_location)
+                if self._manifest.get_reference_count(manifest_record.storage_location) == 1:
+                    os.replace(path, target_path)
+                else:
+                    shutil.copyfile(path, target_path)
+
+            self._manifest.relocate(manifest_record.identifier, storage_location, md5)
+            if (
+                relocate
+                and self._manifest.get_reference_count(manifest_record.storage_location) == 0
+                and os.path.exists(path)
+            ):
+                os.remove(path)
+                report.removed += 1
+
+        for manifest_record in report.missing:
+            _logger.warning(
+                f"Data for image {manifest_record.identifier} not found at {manifest_record.storage_location}: skipped "
+                f"deduplicating"
+            )
+        return report
+
+    def _write(self, path: str, image: Image):
+        """
+        Atomically writes the data of the given image to the given path.
+        :param path: path to write to
+        :param image: image to write
+        """
+        file_descriptor, temp_path = tempfile.mkstemp(prefix=SPOOL_FILE_PREFIX, dir=self._root_directory)
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                if isinstance(image, FileBasedImage):
+                    with open(image.path, "rb") as source_file:
+                        shutil.copyfileobj(source_file, file)
+                else:
+                    file.write(image.buffer())
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    @staticmethod
+    def _get_content_address(md5: str, image_type: ImageType) -> str:
+        """
+        Gets the storage location of content with the given digest and type.
+        :param md5: MD5 hex digest of the content
+        :param image_type: type of image the content represents
+        :return: storage location
+        """
+        return f"{md5}.{image_type.value}"
+
+
+@dataclass
+class ConsistencyReport:
+    """
+    Report of mismatches between a file system image store's manifest and its files.
+    """
+
+    missing: List[ManifestRecord] = field(default_factory=list)
+    unreferenced: List[str] = field(default_factory=list)
+
+    @property
+    def consistent(self) -> bool:
+        """
+        Whether no mismatches were found.
+        :return: `True` if consistent else `False`
+        """
+        return len(self.missing) == 0 and len(self.unreferenced) == 0
+
+
+@dataclass
+class DeduplicationReport:
+    """
+    Report of deduplicating a file system image store's files.
+    """
+
+    removed: int = 0
+    missing: List[ManifestRecord] = field(default_factory=list)
+
+
+class ConsistencyChecker:
+    """
+    Periodically checks the consistency of a file system image store in the background (see
+    `FileSystemImageStore.check_consistency`), logging mismatches.
+
+    Allows image data to be read without first checking it exists, whilst still detecting a store that has become
+    inconsistent (e.g. due to files being removed outside of the store).
+    """
+
+    @property
+    def last_report(self) -> Optional[ConsistencyReport]:
+        return self._last_report
+
+    def __init__(
+        self, image_store: FileSystemImageStore, check_every_seconds: float = DEFAULT_SECONDS_BETWEEN_CONSISTENCY_CHECK
+    ):
+        """
+        Constructor.
+        :param image_store: image store to check
+        :param check_every_seconds: number of seconds between checks
+        """
+        self.image_store = image_store
+        self.check_every_seconds = check_every_seconds
+        self._last_report: Optional[ConsistencyReport] = None
+        self._scheduler = BackgroundScheduler()
+
+    def start(self):
+        """
+        Starts checking in the background.
+        """
+        if self._scheduler.state == STATE_RUNNING:
+            return
+        self._scheduler.start()
+        self._scheduler.add_job(self.check, "interval", seconds=self.check_every_seconds)
+
+    def stop(self):
+        """
+        Stops checking in the background, stopping the background thread.
+        """
+        if self._scheduler.state != STATE_RUNNING:
+            return
+        self._scheduler.remove_all_jobs()
+        self._scheduler.shutdown(wait=False)
+
+    def check(self) -> ConsistencyReport:
+        """
+        Checks the consistency of the image store now.
+        :return: report of the check
+        """
+        report = self.image_store.check_consistency()
+        for manifest_record in report.missing:
+            _logger.warning(
+                f"Data for image {manifest_record.identifier} not found at: {manifest_record.storage_location}"
+            )
+        for file_name in report.unreferenced:
+            _logger.warning(f"File not referenced by image store manifest: {file_name}")
+        self._last_report = report
+        return report
+
+
+def _is_manifest_file(file_name: str) -> bool:
+    """
+    Whether the file with the given name in a store's root directory belongs to a manifest.
+    :param file_name: name of the file
+    :return: `True` if the file belongs to a manifest
+    """
+    # SQLite keeps journals alongside the database, e.g. `manifest.sqlite-wal`
+    return any(file_name.startswith(manifest_file_name) for manifest_file_name in MANIFEST_FILE_NAMES.values())
+
+
+def _get_thumbnail_file_name(storage_location: str, width: Optional[int] = None, height: Optional[int] = None) -> str:
+    """
+    Gets the name of the file in the thumbnail directory that holds the given thumbnail of the file at the given
+    storage location.
+    :param storage_location: storage location of the file that the thumbnail is of
+    :param width: see `FileSystemImageStore.get_thumbnail`
+    :param height: see `FileSystemImageStore.get_thumbnail`
+    :return: thumbnail file name, or the prefix of all the thumbnail file names of the file if the size is not given
+    """
+    file_name_prefix = f"{storage_location}-"
+    if width is None and height is None:
+        return file_name_prefix
+    return f"{file_name_prefix}{width or ''}x{height or ''}"
+
+
+def _calculate_file_md5(path: str, chunk_size: int = 64 * 1024) -> str:
+    """
+    Calculates the MD5 digest of the file at the given path, without reading the whole file into memory.
+    :param path: path to file
+    :param chunk_size: number of bytes to read at a time
+    :return: MD5 hex digest
+    """
+    md5 = hashlib.md5()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
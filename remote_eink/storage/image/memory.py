@@ -1,4 +1,5 @@
-from typing import Iterable, Dict, Optional, List
+from bisect import bisect_right, insort, bisect_left
+from typing import Iterable, Dict, Optional, List, Iterator
 
 from remote_eink.images import Image
 from remote_eink.storage.image.base import BaseImageStore, ImageAlreadyExistsError
@@ -15,24 +16,42 @@ class InMemoryImageStore(BaseImageStore):
 
     def __init__(self, images: Iterable[Image] = ()):
         self._images: Dict[str, Image] = {}
+        self._sorted_image_ids: List[str] = []
         super().__init__(images)
 
     def _get(self, image_id: str) -> Optional[Image]:
         return self._images.get(image_id)
 
     def _list(self) -> List[Image]:
-        return sorted(list(self._images.values()), key=lambda image: image.identifier)
+        # Copied, and images looked up leniently, as images may be removed by another thread whilst listing
+        images = (self._images.get(image_id) for image_id in list(self._sorted_image_ids))
+        return [image for image in images if image is not None]
+
+    def _list_ids(self, limit: Optional[int], after: Optional[str]) -> List[str]:
+        start = bisect_right(self._sorted_image_ids, after) if after is not None else 0
+        return self._sorted_image_ids[start : start + limit if limit is not None else None]
+
+    def _count(self) -> int:
+        return len(self._images)
+
+    def _has(self, image_id: str) -> bool:
+        return image_id in self._images
+
+    def _iter_ids(self) -> Iterator[str]:
+        return iter(list(self._sorted_image_ids))
 
     def _add(self, image: Image):
         assert isinstance(image, Image)
         if self.get(image.identifier) is not None:
             raise ImageAlreadyExistsError(image.identifier)
         self._images[image.identifier] = image
+        insort(self._sorted_image_ids, image.identifier)
 
     def _remove(self, image_id: str) -> bool:
         assert isinstance(image_id, str)
         try:
             del self._images[image_id]
-            return True
         except KeyError:
             return False
+        del self._sorted_image_ids[bisect_left(self._sorted_image_ids, image_id)]
+        return True
@@ -0,0 +1,66 @@
+from io import BytesIO
+from typing import Optional, Tuple
+
+from PIL import Image as PilImage
+
+from remote_eink.images import Image, DataBasedImage, ImageBufferStream
+from remote_eink.transformers.base import ImageTypeToPillowFormat
+
+
+# Reduce by integer factors (cheaply) to within this factor of the thumbnail size before resampling
+_REDUCING_GAP = 2.0
+
+
+def create_thumbnail(image: Image, width: Optional[int] = None, height: Optional[int] = None) -> Image:
+    """
+    Creates a thumbnail of the given image that fits within the given size, keeping the image's aspect ratio.
+
+    JPEGs are decoded at a reduced scale and other images are reduced before resampling, so creating a small thumbnail
+    of a large image does not require the full image to be resampled.
+    :param image: image to create thumbnail of
+    :param width: maximum width of the thumbnail, or `None` for it to be determined by the height
+    :param height: maximum height of the thumbnail, or `None` for it to be determined by the width
+    :return: thumbnail, with the same identifier, type and metadata as the image. The image itself if it already fits
+    :raises ValueError: if neither or a non-positive width or height is given
+    """
+    validate_thumbnail_size(width, height)
+    raster = PilImage.open(ImageBufferStream(image.buffer()))
+    size = _get_thumbnail_size(raster.size, width, height)
+    if raster.width <= size[0] and raster.height <= size[1]:
+        return image
+
+    raster.draft(raster.mode, size)
+    raster = raster.resize(size, reducing_gap=_REDUCING_GAP)
+    byte_io = BytesIO()
+    raster.save(byte_io, ImageTypeToPillowFormat[image.type])
+    return DataBasedImage(image.identifier, byte_io.getvalue(), image.type, image.metadata)
+
+
+def validate_thumbnail_size(width: Optional[int], height: Optional[int]):
+    """
+    Validates the given thumbnail size (see `create_thumbnail`).
+    :param width: maximum width of the thumbnail
+    :param height: maximum height of the thumbnail
+    :raises ValueError: if neither or a non-positive width or height is given
+    """
+    if width is None and height is None:
+        raise ValueError("Thumbnail width or height must be given")
+    for dimension in (width, height):
+        if dimension is not None and dimension < 1:
+            raise ValueError(f"Thumbnail dimensions must be positive: {dimension}")
+
+
+def _get_thumbnail_size(image_size: Tuple[int, int], width: Optional[int], height: Optional[int]) -> Tuple[int, int]:
+    """
+    Gets the size of a thumbnail of an image of the given size.
+    :param image_size: width, height tuple of the image
+    :param width: see `create_thumbnail`
+    :param height: see `create_thumbnail`
+    :return: width, height tuple
+    """
+    image_width, image_height = image_size
+    scale = min(
+        width / image_width if width is not None else float("inf"),
+        height / image_height if height is not None else float("inf"),
+    )
+    return max(1, round(image_width * scale)), max(1, round(image_height * scale))
@@ -1,6 +1,7 @@
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Iterator
 
 from remote_eink.images import ImageType, ImageMetadata
 
@@ -24,6 +25,7 @@ class ManifestRecord:
     image_type: ImageType
     metadata: ImageMetadata
     storage_location: str
+    digest: Optional[str] = None
 
     def __hash__(self) -> int:
         return hash(self.identifier) + hash(self.storage_location)
@@ -45,11 +47,21 @@ class Manifest(metaclass=ABCMeta):
     @abstractmethod
     def get_by_storage_location(self, storage_location: str) -> Optional[ManifestRecord]:
         """
-        Gets manifest record for the image at the given storage location.
+        Gets manifest record for an image at the given storage location.
+
+        Images with the same content may share a storage location, in which case any one of their records is returned.
         :param storage_location: location image is stored
         :return: manifest record of the image or `None` if no record exists
         """
 
+    @abstractmethod
+    def list_by_storage_location(self, storage_location: str) -> List[ManifestRecord]:
+        """
+        Lists the manifest records of all images at the given storage location.
+        :param storage_location: location images are stored
+        :return: manifest records referencing the storage location
+        """
+
     @abstractmethod
     def list(self) -> List[ManifestRecord]:
         """
@@ -57,15 +69,49 @@ class Manifest(metaclass=ABCMeta):
         :return: all records
         """
 
+    def count(self) -> int:
+        """
+        Gets the number of records in the manifest.
+        :return: number of records
+        """
+        return len(self.list())
+
+    def iter_ids(self) -> Iterator[str]:
+        """
+        Iterates over the IDs of the images in the manifest, in the same order as `list`.
+        :return: iterator of image IDs
+        """
+        return (manifest_record.identifier for manifest_record in self.list())
+
+    def list_ids(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[str]:
+        """
+        Lists the IDs of the images in the manifest, ordered by ID.
+
+        Implementations should override so that the cost of a page does not depend on the size of the manifest.
+        :param limit: maximum number of IDs to list (no limit if `None`)
+        :param after: only list IDs ordered after this ID (from the start if `None`)
+        :return: image IDs
+        """
+        image_ids = sorted(image_id for image_id in self.iter_ids() if after is None or image_id > after)
+        return image_ids[:limit] if limit is not None else image_ids
+
     # TODO: image_type is piece of image_metadata?
     @abstractmethod
-    def add(self, image_id: str, image_type: ImageType, image_metadata: ImageMetadata, storage_location: str):
+    def add(
+        self,
+        image_id: str,
+        image_type: ImageType,
+        image_metadata: ImageMetadata,
+        storage_location: str,
+        digest: Optional[str] = None,
+    ):
         """
         Adds manifest for the image with the given ID, given type that is stored in the given location.
         :param image_id: ID of the image
         :param image_type: type of the image
         :param image_metadata: metadata associated to the image
         :param storage_location: where the image is stored
+        :param digest: MD5 hex digest of the image data (see `Image.digest`)
         """
 
     @abstractmethod
@@ -75,3 +121,40 @@ class Manifest(metaclass=ABCMeta):
         :param image_id: ID of the image
         :return: `True` if an image is removed else `False`
         """
+
+    @abstractmethod
+    def relocate(self, image_id: str, storage_location: str, digest: Optional[str] = None) -> bool:
+        """
+        Changes where the image with the given ID is stored, updating its record in place (the record is never absent).
+        :param image_id: ID of the image
+        :param storage_location: where the image is now stored
+        :param digest: MD5 hex digest of the image data (see `Image.digest`)
+        :return: `True` if the image's record is changed else `False` (if there is no record for the image)
+        """
+
+    def get_reference_count(self, storage_location: str) -> int:
+        """
+        Gets the number of images that reference the given storage location.
+        :param storage_location: storage location
+        :return: number of references to the storage location
+        """
+        return len(self.list_by_storage_location(storage_location))
+
+    def list_by_digest(self, digest: str) -> List[ManifestRecord]:
+        """
+        Lists the manifest records of all images with the given digest.
+        :param digest: MD5 hex digest of image data (see `Image.digest`)
+        :return: manifest records with the digest
+        """
+        return [manifest_record for manifest_record in self.list() if manifest_record.digest == digest]
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Context in which changes to the manifest are batched, being applied together when the context exits or not at
+        all if it exits with an exception.
+
+        Implementations that cannot batch changes apply them as they are made. Transactions may be nested, in which case
+        changes are applied when the outermost transaction exits.
+        """
+        yield
@@ -1,4 +1,7 @@
-from typing import Dict, Optional, List
+from bisect import bisect_right, insort, bisect_left
+from collections import defaultdict
+from dataclasses import replace
+from typing import Dict, Optional, List, Iterator
 
 from remote_eink.images import ImageType, ImageMetadata
 from remote_eink.storage.manifest.base import Manifest, ManifestRecord, ManifestAlreadyExistsError
@@ -7,6 +10,8 @@ from remote_eink.storage.manifest.base import Manifest, ManifestRecord, Manifest
 class InMemoryManifest(Manifest):
     """
     In memory manifest implementation.
+
+    Records are indexed by storage location and digest, as well as by image ID.
     """
 
     def __init__(self):
@@ -14,33 +19,90 @@ class InMemoryManifest(Manifest):
         Constructor.
         """
         self._manifest_records: Dict[str, ManifestRecord] = {}
+        self._manifest_records_by_storage_location: Dict[str, Dict[str, ManifestRecord]] = defaultdict(dict)
+        self._manifest_records_by_digest: Dict[str, Dict[str, ManifestRecord]] = defaultdict(dict)
+        self._sorted_image_ids: List[str] = []
 
     def get_by_image_id(self, image_id: str) -> Optional[ManifestRecord]:
         return self._manifest_records.get(image_id)
 
     def get_by_storage_location(self, storage_location: str) -> Optional[ManifestRecord]:
-        # Not optimising here unless actually required
-        try:
-            return next(
-                filter(
-                    lambda manifest_record: manifest_record.storage_location == storage_location,
-                    self._manifest_records.values(),
-                )
-            )
-        except StopIteration:
-            return None
+        manifest_records = self._manifest_records_by_storage_location.get(storage_location)
+        return next(iter(manifest_records.values())) if manifest_records else None
+
+    def list_by_storage_location(self, storage_location: str) -> List[ManifestRecord]:
+        return list(self._manifest_records_by_storage_location.get(storage_location, {}).values())
+
+    def get_reference_count(self, storage_location: str) -> int:
+        return len(self._manifest_records_by_storage_location.get(storage_location, {}))
+
+    def list_by_digest(self, digest: str) -> List[ManifestRecord]:
+        return list(self._manifest_records_by_digest.get(digest, {}).values())
 
     def list(self) -> List[ManifestRecord]:
         return list(self._manifest_records.values())
 
-    def add(self, image_id: str, image_type: ImageType, image_metadata: ImageMetadata, storage_location: str):
+    def count(self) -> int:
+        return len(self._manifest_records)
+
+    def iter_ids(self) -> Iterator[str]:
+        # Copy so that the manifest can be changed during iteration
+        return iter(list(self._manifest_records.keys()))
+
+    def list_ids(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[str]:
+        start = bisect_right(self._sorted_image_ids, after) if after is not None else 0
+        return self._sorted_image_ids[start : start + limit if limit is not None else None]
+
+    def add(
+        self,
+        image_id: str,
+        image_type: ImageType,
+        image_metadata: ImageMetadata,
+        storage_location: str,
+        digest: Optional[str] = None,
+    ):
         if image_id in self._manifest_records:
             raise ManifestAlreadyExistsError(image_id)
-        self._manifest_records[image_id] = ManifestRecord(image_id, image_type, image_metadata, storage_location)
+        manifest_record = ManifestRecord(image_id, image_type, image_metadata, storage_location, digest)
+        self._manifest_records[image_id] = manifest_record
+        insort(self._sorted_image_ids, image_id)
+        self._manifest_records_by_storage_location[storage_location][image_id] = manifest_record
+        if digest is not None:
+            self._manifest_records_by_digest[digest][image_id] = manifest_record
 
     def remove(self, image_id: str) -> bool:
-        try:
-            del self._manifest_records[image_id]
-            return True
-        except KeyError:
+        manifest_record = self._manifest_records.pop(image_id, None)
+        if manifest_record is None:
             return False
+        del self._sorted_image_ids[bisect_left(self._sorted_image_ids, image_id)]
+        _remove_from_index(self._manifest_records_by_storage_location, manifest_record.storage_location, image_id)
+        if manifest_record.digest is not None:
+            _remove_from_index(self._manifest_records_by_digest, manifest_record.digest, image_id)
+        return True
+
+    def relocate(self, image_id: str, storage_location: str, digest: Optional[str] = None) -> bool:
+        manifest_record = self._manifest_records.get(image_id)
+        if manifest_record is None:
+            return False
+        relocated_record = replace(manifest_record, storage_location=storage_location, digest=digest)
+        _remove_from_index(self._manifest_records_by_storage_location, manifest_record.storage_location, image_id)
+        if manifest_record.digest is not None:
+            _remove_from_index(self._manifest_records_by_digest, manifest_record.digest, image_id)
+        self._manifest_records[image_id] = relocated_record
+        self._manifest_records_by_storage_location[storage_location][image_id] = relocated_record
+        if digest is not None:
+            self._manifest_records_by_digest[digest][image_id] = relocated_record
+        return True
+
+
+def _remove_from_index(index: Dict[str, Dict[str, ManifestRecord]], key: str, image_id: str):
+    """
+    Removes the record of the image with the given ID from the given index, dropping the key once it has no records.
+    :param index: index to remove from
+    :param key: key the record is indexed under
+    :param image_id: ID of the image the record is for
+    """
+    manifest_records = index[key]
+    del manifest_records[image_id]
+    if len(manifest_records) == 0:
+        del index[key]
@@ -0,0 +1,202 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from threading import RLock
+from typing import Optional, List, Iterator, Tuple
+
+from remote_eink.images import ImageType, ImageMetadata
+from remote_eink.storage.manifest.base import Manifest, ManifestRecord, ManifestAlreadyExistsError
+from remote_eink.storage.manifest.tiny_db import TinyDbManifest
+
+MIGRATED_FILE_SUFFIX = ".migrated"
+
+_ManifestRow = Tuple[str, str, str, str, Optional[str]]
+
+
+class SqliteManifest(Manifest):
+    """
+    SQLite backed manifest implementation.
+
+    Records are indexed by image ID, storage location and digest. The database is written in WAL mode, so an
+    interrupted write does not corrupt the manifest.
+    """
+
+    @property
+    def database_location(self) -> str:
+        return self._database_location
+
+    def __init__(self, database_location: str):
+        """
+        Constructor.
+        :param database_location: location of database on disk
+        """
+        self._database_location = database_location
+        self._lock = RLock()
+        self._transaction_depth = 0
+        # Transactions are managed explicitly (see `transaction`)
+        self._connection = sqlite3.connect(database_location, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS manifest ("
+            "id TEXT PRIMARY KEY, "
+            "image_type TEXT NOT NULL, "
+            "metadata TEXT NOT NULL, "
+            "storage_location TEXT NOT NULL, "
+            "digest TEXT)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS manifest_storage_location ON manifest (storage_location)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS manifest_digest ON manifest (digest)")
+
+    def get_by_image_id(self, image_id: str) -> Optional[ManifestRecord]:
+        rows = self._query("SELECT * FROM manifest WHERE id = ?", (image_id,))
+        return SqliteManifest._to_manifest_record(rows[0]) if len(rows) > 0 else None
+
+    def get_by_storage_location(self, storage_location: str) -> Optional[ManifestRecord]:
+        rows = self._query("SELECT * FROM manifest WHERE storage_location = ? LIMIT 1", (storage_location,))
+        return SqliteManifest._to_manifest_record(rows[0]) if len(rows) > 0 else None
+
+    def list_by_storage_location(self, storage_location: str) -> List[ManifestRecord]:
+        rows = self._query("SELECT * FROM manifest WHERE storage_location = ?", (storage_location,))
+        return [SqliteManifest._to_manifest_record(row) for row in rows]
+
+    def get_reference_count(self, storage_location: str) -> int:
+        return self._query("SELECT COUNT(*) FROM manifest WHERE storage_location = ?", (storage_location,))[0][0]
+
+    def list_by_digest(self, digest: str) -> List[ManifestRecord]:
+        rows = self._query("SELECT * FROM manifest WHERE digest = ?", (digest,))
+        return [SqliteManifest._to_manifest_record(row) for row in rows]
+
+    def list(self) -> List[ManifestRecord]:
+        return [SqliteManifest._to_manifest_record(row) for row in self._query("SELECT * FROM manifest ORDER BY rowid")]
+
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM manifest")[0][0]
+
+    def iter_ids(self) -> Iterator[str]:
+        return (row[0] for row in self._query("SELECT id FROM manifest ORDER BY rowid"))
+
+    def list_ids(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[str]:
+        # Negative limit is no limit in SQLite
+        limit = limit if limit is not None else -1
+        if after is None:
+            rows = self._query("SELECT id FROM manifest ORDER BY id LIMIT ?", (limit,))
+        else:
+            rows = self._query("SELECT id FROM manifest WHERE id > ? ORDER BY id LIMIT ?", (after, limit))
+        return [row[0] for row in rows]
+
+    def add(
+        self,
+        image_id: str,
+        image_type: ImageType,
+        image_metadata: ImageMetadata,
+        storage_location: str,
+        digest: Optional[str] = None,
+    ):
+        assert storage_location is not None
+        try:
+            self._execute(
+                "INSERT INTO manifest VALUES (?, ?, ?, ?, ?)",
+                (image_id, image_type.name, json.dumps(image_metadata), storage_location, digest),
+            )
+        except sqlite3.IntegrityError as e:
+            raise ManifestAlreadyExistsError(image_id) from e
+
+    def remove(self, image_id: str) -> bool:
+        return self._execute("DELETE FROM manifest WHERE id = ?", (image_id,)) > 0
+
+    def relocate(self, image_id: str, storage_location: str, digest: Optional[str] = None) -> bool:
+        assert storage_location is not None
+        return (
+            self._execute(
+                "UPDATE manifest SET storage_location = ?, digest = ? WHERE id = ?",
+                (storage_location, digest, image_id),
+            )
+            > 0
+        )
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            if self._transaction_depth == 0:
+                self._connection.execute("BEGIN IMMEDIATE")
+            self._transaction_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    self._connection.execute("ROLLBACK")
+                raise
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._connection.execute("COMMIT")
+
+    def close(self):
+        """
+        Closes the connection to the database.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def _query(self, sql: str, parameters: tuple = ()) -> List[tuple]:
+        """
+        Queries the database.
+        :param sql: SQL query
+        :param parameters: parameters to bind to the query
+        :return: rows returned by the query
+        """
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def _execute(self, sql: str, parameters: tuple = ()) -> int:
+        """
+        Executes the given SQL statement against the database.
+        :param sql: SQL statement
+        :param parameters: parameters to bind to the statement
+        :return: number of rows changed by the statement
+        """
+        with self._lock:
+            return self._connection.execute(sql, parameters).rowcount
+
+    @staticmethod
+    def _to_manifest_record(row: _ManifestRow) -> ManifestRecord:
+        """
+        Converts the given database row to a manifest record.
+        :param row: database row
+        :return: manifest record
+        """
+        image_id, image_type, metadata, storage_location, digest = row
+        return ManifestRecord(image_id, ImageType[image_type], json.loads(metadata), storage_location, digest)
+
+
+def migrate_from_tiny_db(tiny_db_location: str, manifest: SqliteManifest) -> int:
+    """
+    Migrates the records in the TinyDB manifest at the given location into the given SQLite manifest.
+
+    Once migrated, the TinyDB manifest is renamed with the `MIGRATED_FILE_SUFFIX` suffix. Migration can be safely
+    repeated if it is interrupted.
+    :param tiny_db_location: location of the TinyDB manifest on disk
+    :param manifest: manifest to migrate records into
+    :return: number of records migrated
+    """
+    tiny_db_manifest = TinyDbManifest(tiny_db_location)
+    migrated = 0
+    try:
+        with manifest.transaction():
+            for manifest_record in tiny_db_manifest.list():
+                # Records will already exist if a previous migration was interrupted before the rename
+                if manifest.get_by_image_id(manifest_record.identifier) is None:
+                    manifest.add(
+                        manifest_record.identifier,
+                        manifest_record.image_type,
+                        manifest_record.metadata,
+                        manifest_record.storage_location,
+                        manifest_record.digest,
+                    )
+                    migrated += 1
+    finally:
+        tiny_db_manifest.close()
+    os.replace(tiny_db_location, f"{tiny_db_location}{MIGRATED_FILE_SUFFIX}")
+    return migrated
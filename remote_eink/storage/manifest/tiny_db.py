@@ -1,8 +1,17 @@
-from typing import Optional, List
+import json
+import os
+import shutil
+import tempfile
+from bisect import bisect_right, insort, bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import replace
+from threading import RLock
+from typing import Optional, List, Dict, Tuple, Iterator
 
 from marshmallow import post_load, fields, Schema
 from marshmallow_enum import EnumField
-from tinydb import Query, TinyDB
+from tinydb import TinyDB
 
 from remote_eink.images import ImageType, ImageMetadata
 from remote_eink.storage.manifest.base import Manifest, ManifestRecord, ManifestAlreadyExistsError
@@ -17,6 +26,8 @@ class _ManifestRecordSchema(Schema):
     image_type = EnumField(ImageType)
     metadata = fields.Dict()
     storage_location = fields.Str()
+    # Not present in manifests written before digests were recorded
+    digest = fields.Str(allow_none=True, load_default=None)
 
     @post_load
     def make_manifest_record(self, data, **kwargs):
@@ -26,6 +37,12 @@ class _ManifestRecordSchema(Schema):
 class TinyDbManifest(Manifest):
     """
     TinyDB backed manifest implementation.
+
+    The database is kept open, with its records indexed in memory. Writes go through to the database file, and the
+    index is reloaded if the file is changed by another writer.
+
+    TinyDB rewrites the whole database file on every write, so writes made in a transaction are only applied to the
+    index until the transaction ends, at which point the database file is rewritten once.
     """
 
     _MANIFEST_RECORD_SCHEMA = _ManifestRecordSchema()
@@ -40,46 +57,250 @@ class TinyDbManifest(Manifest):
         :param database_location: location of database on disk
         """
         self._database_location = database_location
+        self._database: Optional[TinyDB] = None
+        self._database_signature: Optional[Tuple[int, int, int]] = None
+        self._lock = RLock()
+        self._records: Dict[str, ManifestRecord] = {}
+        self._document_ids: Dict[str, int] = {}
+        self._records_by_storage_location: Dict[str, Dict[str, ManifestRecord]] = defaultdict(dict)
+        self._records_by_digest: Dict[str, Dict[str, ManifestRecord]] = defaultdict(dict)
+        self._sorted_image_ids: List[str] = []
+        self._transaction_depth = 0
+        self._transaction_changed = False
 
     def get_by_image_id(self, image_id: str) -> Optional[ManifestRecord]:
-        with self._get_database_connection() as database:
-            record = database.search(Query().id == image_id)
-            if len(record) == 0:
-                return None
-            assert len(record) == 1
-            return TinyDbManifest._MANIFEST_RECORD_SCHEMA.load(record[0])
+        with self._lock:
+            self._refresh()
+            return self._records.get(image_id)
 
     def get_by_storage_location(self, storage_location: str) -> Optional[ManifestRecord]:
-        with self._get_database_connection() as database:
-            record = database.search(Query().storage_location == storage_location)
-            if len(record) == 0:
-                return None
-            assert len(record) == 1
-            return TinyDbManifest._MANIFEST_RECORD_SCHEMA.load(record[0])
+        with self._lock:
+            self._refresh()
+            records = self._records_by_storage_location.get(storage_location)
+            return next(iter(records.values())) if records else None
+
+    def list_by_storage_location(self, storage_location: str) -> List[ManifestRecord]:
+        with self._lock:
+            self._refresh()
+            return list(self._records_by_storage_location.get(storage_location, {}).values())
+
+    def get_reference_count(self, storage_location: str) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._records_by_storage_location.get(storage_location, {}))
+
+    def list_by_digest(self, digest: str) -> List[ManifestRecord]:
+        with self._lock:
+            self._refresh()
+            return list(self._records_by_digest.get(digest, {}).values())
 
     def list(self) -> List[ManifestRecord]:
-        with self._get_database_connection() as database:
-            records = database.all()
-            return TinyDbManifest._MANIFEST_RECORD_SCHEMA.load(records, many=True)
+        with self._lock:
+            self._refresh()
+            return list(self._records.values())
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._records)
+
+    def iter_ids(self) -> Iterator[str]:
+        with self._lock:
+            self._refresh()
+            return iter(list(self._records.keys()))
+
+    def list_ids(self, limit: Optional[int] = None, after: Optional[str] = None) -> List[str]:
+        with self._lock:
+            self._refresh()
+            start = bisect_right(self._sorted_image_ids, after) if after is not None else 0
+            return self._sorted_image_ids[start : start + limit if limit is not None else None]
 
-    def add(self, image_id: str, image_type: ImageType, image_metadata: ImageMetadata, storage_location: str):
-        if self.get_by_image_id(image_id):
-            raise ManifestAlreadyExistsError(image_id)
+    def add(
+        self,
+        image_id: str,
+        image_type: ImageType,
+        image_metadata: ImageMetadata,
+        storage_location: str,
+        digest: Optional[str] = None,
+    ):
         assert storage_location is not None
-        manifest_record = ManifestRecord(image_id, image_type, image_metadata, storage_location)
-        manifest_record_as_json = TinyDbManifest._MANIFEST_RECORD_SCHEMA.dump(manifest_record)
-        with self._get_database_connection() as database:
-            database.insert(manifest_record_as_json)
+        with self._lock:
+            self._refresh()
+            if image_id in self._records:
+                raise ManifestAlreadyExistsError(image_id)
+            manifest_record = ManifestRecord(image_id, image_type, image_metadata, storage_location, digest)
+            if self._transaction_depth > 0:
+                # Written when the transaction ends
+                document_id = None
+                self._transaction_changed = True
+            else:
+                manifest_record_as_json = TinyDbManifest._MANIFEST_RECORD_SCHEMA.dump(manifest_record)
+                document_id = self._database.insert(manifest_record_as_json)
+                self._database_signature = self._get_database_signature()
+            self._index(manifest_record, document_id)
+            insort(self._sorted_image_ids, image_id)
 
     def remove(self, image_id: str) -> bool:
-        with self._get_database_connection() as database:
-            deleted = database.remove(Query().id == image_id)
-            return len(deleted) > 0
+        with self._lock:
+            self._refresh()
+            manifest_record = self._records.get(image_id)
+            if manifest_record is None:
+                return False
+            if self._transaction_depth > 0:
+                self._transaction_changed = True
+            else:
+                self._database.remove(doc_ids=[self._document_ids[image_id]])
+                self._database_signature = self._get_database_signature()
+            self._unindex(manifest_record)
+            del self._sorted_image_ids[bisect_left(self._sorted_image_ids, image_id)]
+            return True
+
+    def relocate(self, image_id: str, storage_location: str, digest: Optional[str] = None) -> bool:
+        assert storage_location is not None
+        with self._lock:
+            self._refresh()
+            manifest_record = self._records.get(image_id)
+            if manifest_record is None:
+                return False
+            relocated_record = replace(manifest_record, storage_location=storage_location, digest=digest)
+            document_id = self._document_ids[image_id]
+            if self._transaction_depth > 0:
+                self._transaction_changed = True
+            else:
+                manifest_record_as_json = TinyDbManifest._MANIFEST_RECORD_SCHEMA.dump(relocated_record)
+                self._database.update(manifest_record_as_json, doc_ids=[document_id])
+                self._database_signature = self._get_database_signature()
+            self._unindex(manifest_record)
+            self._index(relocated_record, document_id)
+            return True
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            self._refresh()
+            self._transaction_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._transaction_depth -= 1
+                if self._transaction_depth == 0:
+                    # Changes have only been applied to the index, which will be reloaded when next used
+                    self._transaction_changed = False
+                    self.close()
+                raise
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0 and self._transaction_changed:
+                self._transaction_changed = False
+                self._write_all()
+
+    def close(self):
+        """
+        Closes the underlying database (it will be reopened if the manifest is used again).
+        """
+        with self._lock:
+            if self._database is not None:
+                self._database.close()
+                self._database = None
+                self._database_signature = None
+
+    def _refresh(self):
+        """
+        (Re)opens the database and loads the index if the database file has changed since it was last read.
+
+        The index is not reloaded during a transaction, as it holds the transaction's changes.
+        """
+        if self._transaction_depth > 0:
+            return
+        signature = self._get_database_signature()
+        if self._database is not None and signature == self._database_signature:
+            return
+        # Reopen in case the file has been replaced
+        self.close()
+        self._database = TinyDB(self._database_location)
+        self._database_signature = self._get_database_signature()
+
+        self._records.clear()
+        self._document_ids.clear()
+        self._records_by_storage_location.clear()
+        self._records_by_digest.clear()
+        for document in self._database.all():
+            self._index(TinyDbManifest._MANIFEST_RECORD_SCHEMA.load(document), document.doc_id)
+        self._sorted_image_ids = sorted(self._records.keys())
+
+    def _write_all(self):
+        """
+        Replaces the contents of the database with the records in the index.
+
+        The database is written to a temporary file that then replaces the database file, so readers (and the database
+        file, if the write is interrupted) see either the old records or the new records, never a mixture.
+        """
+        manifest_records = list(self._records.values())
+        document_ids = range(1, len(manifest_records) + 1)
+        table = {
+            str(document_id): TinyDbManifest._MANIFEST_RECORD_SCHEMA.dump(manifest_record)
+            for manifest_record, document_id in zip(manifest_records, document_ids)
+        }
+        directory, file_name = os.path.split(os.path.abspath(self._database_location))
+        file_descriptor, temp_location = tempfile.mkstemp(prefix=f"{file_name}.", suffix=".tmp", dir=directory)
+        try:
+            if os.path.exists(self._database_location):
+                shutil.copymode(self._database_location, temp_location)
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump({TinyDB.default_table_name: table}, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_location, self._database_location)
+        except BaseException:
+            if os.path.exists(temp_location):
+                os.remove(temp_location)
+            raise
+        # The open database refers to the replaced file
+        self.close()
+        self._database = TinyDB(self._database_location)
+        self._database_signature = self._get_database_signature()
+        self._document_ids = {
+            manifest_record.identifier: document_id
+            for manifest_record, document_id in zip(manifest_records, document_ids)
+        }
+
+    def _get_database_signature(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Gets signature of the database file, which changes when the file is modified.
+        :return: signature or `None` if the database file does not exist
+        """
+        try:
+            stat = os.stat(self._database_location)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _index(self, manifest_record: ManifestRecord, document_id: Optional[int]):
+        """
+        Adds the given record to the in-memory index.
+        :param manifest_record: record to index
+        :param document_id: ID of the database document holding the record (`None` if not yet written)
+        """
+        self._records[manifest_record.identifier] = manifest_record
+        self._document_ids[manifest_record.identifier] = document_id
+        self._records_by_storage_location[manifest_record.storage_location][
+            manifest_record.identifier
+        ] = manifest_record
+        if manifest_record.digest is not None:
+            self._records_by_digest[manifest_record.digest][manifest_record.identifier] = manifest_record
 
-    def _get_database_connection(self) -> TinyDB:
+    def _unindex(self, manifest_record: ManifestRecord):
         """
-        Gets a connection to the TinyDB database.
-        :return: open database connection (it is expected that the caller will close it after use)
+        Removes the given record from the in-memory index.
+        :param manifest_record: record to remove
         """
-        # We could do some caching here if instantiating the database every time it's used proves to be expensive
-        return TinyDB(self._database_location)
+        del self._records[manifest_record.identifier]
+        del self._document_ids[manifest_record.identifier]
+        for index, key in (
+            (self._records_by_storage_location, manifest_record.storage_location),
+            (self._records_by_digest, manifest_record.digest),
+        ):
+            if key is not None:
+                records = index[key]
+                del records[manifest_record.identifier]
+                if len(records) == 0:
+                    del index[key]
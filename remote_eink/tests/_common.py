@@ -1,6 +1,10 @@
+import asyncio
 import random
 from abc import ABCMeta
-from typing import Optional, Dict, Callable, Any
+from contextlib import contextmanager
+from threading import Thread
+from typing import Optional, Dict, Callable, Any, Iterator
+from unittest.mock import patch
 from uuid import uuid4
 
 from flask_testing import TestCase
@@ -9,7 +13,7 @@ from multiprocessing_on_dill.context import Process
 
 from remote_eink.api.display._common import CONTENT_TYPE_HEADER, ImageTypeToMimeTypes
 from remote_eink.app import create_app, destroy_app, get_app_data
-from remote_eink.app_data import AppData
+from remote_eink.app_data import AppData, DispatchMode
 from remote_eink.controllers.base import DisplayController
 from remote_eink.controllers.simple import SimpleDisplayController
 from remote_eink.images import ImageType, Image, FunctionBasedImage
@@ -73,8 +77,13 @@ def set_content_type_header(image: Image, headers: Optional[Dict] = None):
 class AppTestBase(TestCase, metaclass=ABCMeta):
     """
     Base class for tests against the Flask app.
+
+    Requests are dispatched over the communication pipe, as they are by a multi-process server. Subclasses test direct
+    dispatch by setting `dispatch_mode` to `DispatchMode.DIRECT`.
     """
 
+    dispatch_mode = DispatchMode.PIPE
+
     @property
     def display_controller(self) -> DisplayController:
         return self._display_controllers[0]
@@ -97,9 +106,20 @@ class AppTestBase(TestCase, metaclass=ABCMeta):
     # Required to satisfy the super class' interface
     def create_app(self):
         self._display_controllers = []
-        self._app = create_app(self._display_controllers)
+        self._app = create_app(self._display_controllers, self.dispatch_mode)
         return self._app
 
+    @contextmanager
+    def assert_round_trips(self, expected: int) -> Iterator[None]:
+        """
+        Asserts that the expected number of requests are made to the target process in the context.
+        :param expected: expected number of requests
+        """
+        app_data = self.app_data
+        with patch.object(app_data, "dispatch", wraps=app_data.dispatch) as dispatch:
+            yield
+        self.assertEqual(expected, dispatch.call_count)
+
     def create_display_controller(self, **kwargs):
         display_controller = create_dummy_display_controller(**kwargs)
         get_app_data(self._app).add_display_controller(display_controller)
@@ -132,3 +152,20 @@ def run_in_different_process(callable: Callable, *args, **kwargs) -> Any:
     if process.exitcode != 0:
         raise RuntimeError(f"Process exited with non-zero error code {process.exitcode}: {callable}, {args}, {kwargs}")
     return value
+
+
+@contextmanager
+def event_loop_in_thread() -> Iterator[asyncio.AbstractEventLoop]:
+    """
+    Runs an event loop in another thread for the duration of the context.
+    :return: the running event loop
+    """
+    loop = asyncio.new_event_loop()
+    thread = Thread(target=loop.run_forever)
+    thread.start()
+    try:
+        yield loop
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -0,0 +1,132 @@
+import json
+import tempfile
+import unittest
+from http import HTTPStatus
+from io import BytesIO
+
+from remote_eink.app_data import DispatchMode
+from remote_eink.api.display._common import ImageTypeToMimeTypes
+from remote_eink.images import Image
+from remote_eink.storage.image.file_system import FileSystemImageStore
+from remote_eink.tests._common import create_image
+from remote_eink.tests.api.display.image._common import BaseTestDisplayImage
+from remote_eink.transformers.rotate import ROTATION_METADATA_KEY
+
+
+def create_batch_upload_content(*images: Image, remove: tuple[str, ...] = ()) -> dict:
+    return {
+        "metadata": (
+            BytesIO(str.encode(json.dumps({image.identifier: image.metadata for image in images}))),
+            None,
+            "application/json",
+        ),
+        "data": [(BytesIO(image.data), image.identifier, ImageTypeToMimeTypes[image.type][0]) for image in images],
+        "remove": list(remove),
+    }
+
+
+class TestDisplayImageBatch(BaseTestDisplayImage):
+    """
+    Tests for the `/display/{displayId}/image/batch` endpoint.
+    """
+
+    def test_post(self):
+        images = [create_image(metadata={ROTATION_METADATA_KEY: 90}), create_image()]
+        result = self.client.post(
+            f"/display/{self.display_controller.identifier}/image/batch",
+            data=create_batch_upload_content(*images),
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(HTTPStatus.OK, result.status_code, result.data)
+        self.assertCountEqual([{"id": image.identifier} for image in images], result.json["added"])
+        for image in images:
+            self.assertEqual(image, self.display_controller.image_store.get(image.identifier))
+
+    def test_post_with_remove(self):
+        display_controller = self.create_display_controller(number_of_images=2)
+        existing_images = display_controller.image_store.list()
+        image = create_image()
+        remove = (existing_images[0].identifier, "does-not-exist")
+        result = self.client.post(
+            f"/display/{display_controller.identifier}/image/batch",
+            data=create_batch_upload_content(image, remove=remove),
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(HTTPStatus.OK, result.status_code, result.data)
+        self.assertEqual([{"id": existing_images[0].identifier}], result.json["removed"])
+        self.assertCountEqual(
+            [image, *existing_images[1:]],
+            display_controller.image_store.list(),
+        )
+
+    def test_post_replaces_existing(self):
+        display_controller = self.create_display_controller(number_of_images=1)
+        existing_image = display_controller.image_store.list()[0]
+        image = create_image(metadata={ROTATION_METADATA_KEY: 180})
+        image._identifier = existing_image.identifier
+        result = self.client.post(
+            f"/display/{display_controller.identifier}/image/batch",
+            data=create_batch_upload_content(image),
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(HTTPStatus.OK, result.status_code, result.data)
+        self.assertEqual(image, display_controller.image_store.get(existing_image.identifier))
+
+    def test_post_replaces_displayed_without_clearing(self):
+        display_controller = self.create_display_controller(number_of_images=1)
+        existing_image = display_controller.image_store.list()[0]
+        display_controller.display(existing_image.identifier)
+        image = create_image()
+        image._identifier = existing_image.identifier
+        result = self.client.post(
+            f"/display/{display_controller.identifier}/image/batch",
+            data=create_batch_upload_content(image),
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(HTTPStatus.OK, result.status_code, result.data)
+        self.assertEqual([], result.json["removed"])
+        self.assertIsNotNone(display_controller.current_image)
+
+    def test_post_to_file_system_store(self):
+        with tempfile.TemporaryDirectory() as temp_directory:
+            display_controller = self.create_display_controller(image_store=FileSystemImageStore(temp_directory))
+            images = [create_image(), create_image()]
+            result = self.client.post(
+                f"/display/{display_controller.identifier}/image/batch",
+                data=create_batch_upload_content(*images),
+                content_type="multipart/form-data",
+            )
+            self.assertEqual(HTTPStatus.OK, result.status_code, result.data)
+            self.assertCountEqual(images, display_controller.image_store.list())
+
+    def test_post_invalid_image(self):
+        image = create_image()
+        content = create_batch_upload_content(image)
+        content["data"].append((BytesIO(b"invalid"), "invalid", ImageTypeToMimeTypes[image.type][0]))
+        result = self.client.post(
+            f"/display/{self.display_controller.identifier}/image/batch",
+            data=content,
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, result.status_code)
+        self.assertIsNone(self.display_controller.image_store.get(image.identifier))
+
+    def test_post_when_display_does_not_exist(self):
+        result = self.client.post(
+            f"/display/does-not-exist/image/batch",
+            data=create_batch_upload_content(create_image()),
+            content_type="multipart/form-data",
+        )
+        self.assertEqual(HTTPStatus.NOT_FOUND, result.status_code)
+
+
+class TestDisplayImageBatchDirect(TestDisplayImageBatch):
+    """
+    Tests for the `/display/{displayId}/image/batch` endpoint, with requests dispatched directly.
+    """
+
+    dispatch_mode = DispatchMode.DIRECT
+
+
+if __name__ == "__main__":
+    unittest.main()
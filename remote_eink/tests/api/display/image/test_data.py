@@ -2,7 +2,13 @@ from http import HTTPStatus
 from io import BytesIO
 from uuid import uuid4
 
+from PIL import Image as PilImage
+
+from unittest.mock import patch
+
+from remote_eink.app_data import DispatchMode
 from remote_eink.api.display._common import ImageTypeToMimeTypes
+from remote_eink.api.display.image import data
 from remote_eink.images import ImageType, FunctionBasedImage, DataBasedImage
 from remote_eink.tests._common import create_image
 from remote_eink.tests.api.display.image._common import BaseTestDisplayImage, create_image_upload_content
@@ -30,6 +36,67 @@ class TestDisplayImageData(BaseTestDisplayImage):
         result = self.client.get(f"/display/{controller.identifier}/image/does-not-exist/data")
         self.assertEqual(HTTPStatus.NOT_FOUND, result.status_code)
 
+    def test_get_etag(self):
+        self.display_controller.image_store.add(WHITE_IMAGE)
+        result = self.client.get(f"/display/{self.display_controller.identifier}/image/{WHITE_IMAGE.identifier}/data")
+        self.assertEqual((WHITE_IMAGE.digest, False), result.get_etag())
+        self.assertEqual("bytes", result.headers["Accept-Ranges"])
+        self.assertEqual(len(WHITE_IMAGE.data), result.content_length)
+
+    def test_get_when_not_modified(self):
+        self.display_controller.image_store.add(WHITE_IMAGE)
+        with patch.object(DataBasedImage, "buffer") as buffer:
+            result = self.client.get(
+                f"/display/{self.display_controller.identifier}/image/{WHITE_IMAGE.identifier}/data",
+                headers={"If-None-Match": f'"{WHITE_IMAGE.digest}"'},
+            )
+        self.assertEqual(HTTPStatus.NOT_MODIFIED, result.status_code)
+        self.assertEqual((WHITE_IMAGE.digest, False), result.get_etag())
+        buffer.assert_not_called()
+
+    def test_get_when_modified(self):
+        self.display_controller.image_store.add(WHITE_IMAGE)
+        result = self.client.get(
+            f"/display/{self.display_controller.identifier}/image/{WHITE_IMAGE.identifier}/data",
+            headers={"If-None-Match": f'"{BLACK_IMAGE.digest}"'},
+        )
+        self.assertEqual(HTTPStatus.OK, result.status_code)
+        self.assertEqual(WHITE_IMAGE.data, result.data)
+
+    def test_get_range(self):
+        self.display_controller.image_store.add(WHITE_IMAGE)
+        result = self.client.get(
+            f"/display/{self.display_controller.identifier}/image/{WHITE_IMAGE.identifier}/data",
+            headers={"Range": "bytes=10-19"},
+        )
+        self.assertEqual(HTTPStatus.PARTIAL_CONTENT, result.status_code)
+        self.assertEqual(WHITE_IMAGE.data[10:20], result.data)
+        self.assertEqual(f"bytes 10-19/{len(WHITE_IMAGE.data)}", result.headers["Content-Range"])
+
+    def test_get_range_not_satisfiable(self):
+        self.display_controller.image_store.add(WHITE_IMAGE)
+        result = self.client.get(
+            f"/display/{self.display_controller.identifier}/image/{WHITE_IMAGE.identifier}/data",
+            headers={"Range": f"bytes={len(WHITE_IMAGE.data)}-"},
+        )
+        self.assertEqual(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, result.status_code)
+
+    def test_get_thumbnail(self):
+        self.display_controller.image_store.add(WHITE_IMAGE)
+        result = self.client.get(
+            f"/display/{self.display_controller.identifier}/image/{WHITE_IMAGE.identifier}/data?width=10"
+        )
+        self.assertEqual(HTTPStatus.OK, result.status_code)
+        self.assertIn(result.mimetype, ImageTypeToMimeTypes[WHITE_IMAGE.type])
+        self.assertEqual((10, 20), PilImage.open(BytesIO(result.data)).size)
+
+    def test_get_thumbnail_with_invalid_size(self):
+        self.display_controller.image_store.add(WHITE_IMAGE)
+        result = self.client.get(
+            f"/display/{self.display_controller.identifier}/image/{WHITE_IMAGE.identifier}/data?height=0"
+        )
+        self.assertEqual(HTTPStatus.BAD_REQUEST, result.status_code)
+
     def test_put(self):
         image = DataBasedImage(str(uuid4()), WHITE_IMAGE.data, WHITE_IMAGE.type)
         self.display_controller.image_store.add(image)
@@ -45,6 +112,31 @@ class TestDisplayImageData(BaseTestDisplayImage):
             self.display_controller.image_store.get(image.identifier),
         )
 
+    def test_put_streamed(self):
+        image = DataBasedImage(str(uuid4()), WHITE_IMAGE.data, WHITE_IMAGE.type)
+        self.display_controller.image_store.add(image)
+
+        with patch.object(data, "put_image", wraps=data.put_image) as put_image:
+            result = self.client.put(
+                f"/display/{self.display_controller.identifier}/image/{image.identifier}/data",
+                data=BytesIO(BLACK_IMAGE.data),
+                content_type=ImageTypeToMimeTypes[BLACK_IMAGE.type][0],
+            )
+        self.assertEqual(HTTPStatus.OK, result.status_code)
+        self.assertNotIsInstance(put_image.call_args.kwargs["data"], BytesIO)
+
+    def test_put_with_mismatched_content_type(self):
+        image = DataBasedImage(str(uuid4()), WHITE_IMAGE.data, WHITE_IMAGE.type)
+        self.display_controller.image_store.add(image)
+
+        result = self.client.put(
+            f"/display/{self.display_controller.identifier}/image/{image.identifier}/data",
+            data=BytesIO(BLACK_IMAGE.data),
+            content_type=ImageTypeToMimeTypes[ImageType.JPG][0],
+        )
+        self.assertEqual(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, result.status_code)
+        self.assertEqual(image, self.display_controller.image_store.get(image.identifier))
+
     def test_put_when_image_not_exist(self):
         result = self.client.put(
             f"/display/{self.display_controller.identifier}/image/does-not-exist/data",
@@ -52,3 +144,11 @@ class TestDisplayImageData(BaseTestDisplayImage):
             content_type=ImageTypeToMimeTypes[BLACK_IMAGE.type][0],
         )
         self.assertEqual(HTTPStatus.NOT_FOUND, result.status_code)
+
+
+class TestDisplayImageDataDirect(TestDisplayImageData):
+    """
+    Tests for the `/display/{displayId}/image/data` endpoint, with requests dispatched directly.
+    """
+
+    dispatch_mode = DispatchMode.DIRECT
@@ -1,4 +1,6 @@
 import json
+import os
+import tempfile
 from http import HTTPStatus
 from io import BytesIO
 
@@ -6,8 +8,11 @@ from requests_toolbelt import MultipartDecoder
 from requests_toolbelt.multipart import decoder
 from requests_toolbelt.multipart.decoder import BodyPart
 
+from remote_eink.app_data import DispatchMode
 from remote_eink.api.display._common import ImageTypeToMimeTypes
 from remote_eink.images import FunctionBasedImage, ImageType
+from remote_eink.storage.image.base import SPOOL_FILE_PREFIX
+from remote_eink.storage.image.file_system import FileSystemImageStore
 from remote_eink.tests._common import create_image, set_content_type_header
 from remote_eink.tests.api.display.image._common import BaseTestDisplayImage, create_image_upload_content
 from remote_eink.transformers.rotate import ROTATION_METADATA_KEY
@@ -28,6 +33,24 @@ class TestDisplayImage(BaseTestDisplayImage):
                     ({"id": image.identifier} for image in controller.image_store.list()), result.json
                 )
 
+    def test_list_paged(self):
+        controller = self.create_display_controller(number_of_images=5)
+        image_ids = []
+        query_string = dict(limit=2)
+        while True:
+            result = self.client.get(f"/display/{controller.identifier}/image", query_string=query_string)
+            self.assertEqual(HTTPStatus.OK, result.status_code)
+            self.assertLessEqual(len(result.json), 2)
+            image_ids.extend(image["id"] for image in result.json)
+            if "Next-Cursor" not in result.headers:
+                break
+            query_string["cursor"] = result.headers["Next-Cursor"]
+        self.assertEqual(sorted(image.identifier for image in controller.image_store.list()), image_ids)
+
+    def test_list_with_invalid_limit(self):
+        result = self.client.get(f"/display/{self.display_controller.identifier}/image", query_string=dict(limit=0))
+        self.assertEqual(HTTPStatus.BAD_REQUEST, result.status_code)
+
     def test_list_when_display_does_not_exist(self):
         result = self.client.get(f"/display/does-not-exist/image")
         self.assertEqual(HTTPStatus.NOT_FOUND, result.status_code)
@@ -94,6 +117,18 @@ class TestDisplayImage(BaseTestDisplayImage):
         self.assertEqual(HTTPStatus.CREATED, result.status_code)
         self.assertEqual(self.image, self.display_controller.image_store.get(self.image.identifier))
 
+    def test_put_to_file_system_store(self):
+        with tempfile.TemporaryDirectory() as temp_directory:
+            display_controller = self.create_display_controller(image_store=FileSystemImageStore(temp_directory))
+            result = self.client.put(
+                f"/display/{display_controller.identifier}/image/{self.image.identifier}",
+                data=create_image_upload_content(self.image),
+                content_type="multipart/form-data",
+            )
+            self.assertEqual(HTTPStatus.CREATED, result.status_code)
+            self.assertEqual(self.image, display_controller.image_store.get(self.image.identifier))
+            self.assertFalse(any(file_name.startswith(SPOOL_FILE_PREFIX) for file_name in os.listdir(temp_directory)))
+
     def test_put_with_duplicate_id(self):
         image_1 = create_image()
         self.client.put(
@@ -140,3 +175,11 @@ class TestDisplayImage(BaseTestDisplayImage):
     def test_delete_image_display_does_not_exist(self):
         result = self.client.delete(f"/display/does-not-exist/image/does-not-exist")
         self.assertEqual(HTTPStatus.NOT_FOUND, result.status_code)
+
+
+class TestDisplayImageDirect(TestDisplayImage):
+    """
+    Tests for the `/display/{displayId}/image` endpoint, with requests dispatched directly.
+    """
+
+    dispatch_mode = DispatchMode.DIRECT
@@ -2,6 +2,7 @@ import json
 from http import HTTPStatus
 from io import BytesIO
 
+from remote_eink.app_data import DispatchMode
 from remote_eink.images import ImageType
 from remote_eink.tests._common import create_image
 from remote_eink.tests.api.display.image._common import BaseTestDisplayImage
@@ -22,6 +23,14 @@ class TestDisplayImageMetadata(BaseTestDisplayImage):
                 self.assertEqual(HTTPStatus.OK, result.status_code)
                 self.assertEqual(display_controller.image_store.get(image.identifier).metadata, result.json)
 
+    def test_get_in_single_round_trip(self):
+        display_controller = self.create_display_controller()
+        image = create_image(metadata={"a": 1})
+        display_controller.image_store.add(image)
+        with self.assert_round_trips(1):
+            result = self.client.get(f"/display/{display_controller.identifier}/image/{image.identifier}/metadata")
+        self.assertEqual({"a": 1}, result.json)
+
     def test_get_when_does_not_exist(self):
         controller = self.create_display_controller()
         result = self.client.get(f"/display/{controller.identifier}/image/does-not-exist/metadata")
@@ -45,3 +54,11 @@ class TestDisplayImageMetadata(BaseTestDisplayImage):
             content_type="application/json",
         )
         self.assertEqual(HTTPStatus.NOT_FOUND, result.status_code)
+
+
+class TestDisplayImageMetadataDirect(TestDisplayImageMetadata):
+    """
+    Tests for the `/display/{displayId}/image/metadata` endpoint, with requests dispatched directly.
+    """
+
+    dispatch_mode = DispatchMode.DIRECT
@@ -1,6 +1,7 @@
 import unittest
 from http import HTTPStatus
 
+from remote_eink.app_data import DispatchMode
 from remote_eink.tests._common import AppTestBase
 from remote_eink.tests.storage._common import WHITE_IMAGE
 
@@ -18,7 +19,8 @@ class TestDisplayCurrentImage(AppTestBase):
     def test_get_when_set(self):
         self.display_controller.image_store.add(WHITE_IMAGE)
         self.display_controller.display(WHITE_IMAGE.identifier)
-        result = self.client.get(f"/display/{self.display_controller.identifier}/current-image")
+        with self.assert_round_trips(1):
+            result = self.client.get(f"/display/{self.display_controller.identifier}/current-image")
         self.assertEqual(HTTPStatus.OK, result.status_code)
         self.assertEqual(WHITE_IMAGE.identifier, result.json["id"])
 
@@ -50,5 +52,13 @@ class TestDisplayCurrentImage(AppTestBase):
         self.assertEqual(HTTPStatus.BAD_REQUEST, result.status_code)
 
 
+class TestDisplayCurrentImageDirect(TestDisplayCurrentImage):
+    """
+    Tests for the `/display/{displayId}/current-image` endpoint, with requests dispatched directly.
+    """
+
+    dispatch_mode = DispatchMode.DIRECT
+
+
 if __name__ == "__main__":
     unittest.main()
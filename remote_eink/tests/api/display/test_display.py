@@ -1,6 +1,8 @@
 import unittest
 from http import HTTPStatus
+from unittest.mock import patch
 
+from remote_eink.app_data import DispatchMode
 from remote_eink.tests._common import AppTestBase
 
 
@@ -33,6 +35,13 @@ class TestDisplayApi(AppTestBase):
             (image["id"] for image in result.json["images"]),
         )
 
+    def test_get_in_single_round_trip(self):
+        display_controller = self.create_display_controller(number_of_images=10)
+        with self.assert_round_trips(1):
+            result = self.client.get(f"/display/{display_controller.identifier}")
+        self.assertEqual(HTTPStatus.OK, result.status_code)
+        self.assertEqual(10, len(result.json["images"]))
+
     def test_get_not_exist(self):
         result = self.client.get(f"/display/does-not-exist")
         self.assertEqual(HTTPStatus.NOT_FOUND, result.status_code)
@@ -44,6 +53,41 @@ class TestDisplayApi(AppTestBase):
         self.assertEqual([], result.json["images"])
         self.assertIsNone(result.json["currentImage"])
 
+    def test_dispatched_over_pipe(self):
+        sender = self.app_data.communication_pipe.sender
+        with patch.object(sender, "call", wraps=sender.call) as call:
+            result = self.client.get(f"/display/{self.display_controller.identifier}")
+        self.assertEqual(HTTPStatus.OK, result.status_code)
+        self.assertEqual(1, call.call_count)
+
+    def test_get_when_display_busy(self):
+        # Requests are served in this thread if dispatched directly, which would be able to take the (reentrant) lock
+        self.app_data.dispatch_mode = DispatchMode.PIPE
+        self.app_data.communication_pipe.sender.timeout = 0.1
+        with self.app_data.get_display_controller_lock(self.display_controller.identifier):
+            result = self.client.get(f"/display/{self.display_controller.identifier}")
+            self.assertEqual(HTTPStatus.GATEWAY_TIMEOUT, result.status_code)
+            result = self.client.get(f"/display/{self.display_controller.identifier}")
+            self.assertEqual(HTTPStatus.SERVICE_UNAVAILABLE, result.status_code)
+            other_display_controller = self.create_display_controller()
+            result = self.client.get(f"/display/{other_display_controller.identifier}")
+            self.assertEqual(HTTPStatus.OK, result.status_code)
+
+
+class TestDisplayApiDirect(TestDisplayApi):
+    """
+    Tests for the `/display` endpoint, with requests dispatched directly.
+    """
+
+    dispatch_mode = DispatchMode.DIRECT
+
+    def test_dispatched_over_pipe(self):
+        sender = self.app_data.communication_pipe.sender
+        with patch.object(sender, "call", wraps=sender.call) as call:
+            result = self.client.get(f"/display/{self.display_controller.identifier}")
+        self.assertEqual(HTTPStatus.OK, result.status_code)
+        self.assertEqual(0, call.call_count)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from http import HTTPStatus
 
+from remote_eink.api.display._common import RemoteThreadDisplayController
+from remote_eink.app_data import DispatchMode
 from remote_eink.tests._common import AppTestBase
 from remote_eink.transformers.base import ImageTransformer
 from remote_eink.transformers.simple import SimpleImageTransformer
@@ -36,6 +38,13 @@ class TestImageTransformer(AppTestBase):
             ({"id": transformer.identifier} for transformer in self.display_controller.image_transformers), result.json
         )
 
+    def test_remote_display_controller_image_transformers_not_live(self):
+        with self.app.app_context():
+            image_transformers = RemoteThreadDisplayController(self.display_controller.identifier).image_transformers
+            self.assertIsNot(self.display_controller.image_transformers, image_transformers)
+            self.assertEqual(len(self.image_transformers), len(image_transformers))
+            self.assertEqual(self.image_transformer.identifier, image_transformers[0].identifier)
+
     def test_list_when_display_does_not_exist(self):
         result = self.client.get(f"/display/does-not-exist/image")
         self.assertEqual(HTTPStatus.NOT_FOUND, result.status_code)
@@ -52,6 +61,16 @@ class TestImageTransformer(AppTestBase):
             self.assertEqual(position, result.json["position"])
             self.assertEqual(image_transformer.configuration, result.json["configuration"])
 
+    def test_list_and_get_in_single_round_trip(self):
+        with self.assert_round_trips(1):
+            result = self.client.get(f"/display/{self.display_controller.identifier}/image-transformer")
+        self.assertEqual(len(self.image_transformers), len(result.json))
+        with self.assert_round_trips(1):
+            result = self.client.get(
+                f"/display/{self.display_controller.identifier}/image-transformer/{self.image_transformer.identifier}"
+            )
+        self.assertEqual(self.image_transformer.identifier, result.json["id"])
+
     def test_get_when_display_does_not_exist(self):
         result = self.client.get(f"/display/does-not-exist/image-transformer/1")
         self.assertEqual(HTTPStatus.NOT_FOUND, result.status_code)
@@ -144,3 +163,11 @@ class TestImageTransformer(AppTestBase):
             json={"position": -1},
         )
         self.assertEqual(HTTPStatus.BAD_REQUEST, result.status_code)
+
+
+class TestImageTransformerDirect(TestImageTransformer):
+    """
+    Tests for the `/display/{displayId}/image-transformer` endpoint, with requests dispatched directly.
+    """
+
+    dispatch_mode = DispatchMode.DIRECT
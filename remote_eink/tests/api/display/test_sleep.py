@@ -1,5 +1,6 @@
 from http import HTTPStatus
 
+from remote_eink.app_data import DispatchMode
 from remote_eink.tests._common import AppTestBase
 
 
@@ -41,3 +42,11 @@ class TestDisplaySleep(AppTestBase):
         result = self.client.put(f"/display/{self.display_controller.identifier}/sleep", json=False)
         self.assertEqual(HTTPStatus.OK, result.status_code)
         self.assertFalse(self.display_controller.driver.sleeping)
+
+
+class TestDisplaySleepDirect(TestDisplaySleep):
+    """
+    Tests for the `/display/{displayId}/sleep` endpoint, with requests dispatched directly.
+    """
+
+    dispatch_mode = DispatchMode.DIRECT
@@ -0,0 +1,57 @@
+"""
+Benchmarks serving API requests with calls to the display controllers dispatched directly and over the communication
+pipe.
+
+Run with: `python -m remote_eink.tests.benchmarks.dispatch`
+"""
+from timeit import timeit
+from typing import Callable
+
+from remote_eink.app import create_app, destroy_app
+from remote_eink.app_data import DispatchMode
+from remote_eink.images import DataBasedImage, ImageType
+from remote_eink.tests._common import create_dummy_display_controller
+from remote_eink.tests.benchmarks.rotate import create_panel_image
+
+REPEATS = 200
+NUMBER_OF_IMAGES = 50
+
+
+def benchmark(name: str, to_benchmark: Callable[[], object]):
+    """
+    Benchmarks the given callable and prints the mean time taken.
+    :param name: name of the benchmark
+    :param to_benchmark: callable to benchmark
+    """
+    seconds = timeit(to_benchmark, number=REPEATS) / REPEATS
+    print(f"{name:<50} {seconds * 1000:8.2f}ms")
+
+
+def main():
+    panel_image = create_panel_image()
+    small_image = DataBasedImage("small", b"\x89PNG\r\n\x1a\n" + bytes(1024), ImageType.PNG)
+
+    for dispatch_mode in (DispatchMode.PIPE, DispatchMode.DIRECT):
+        display_controller = create_dummy_display_controller(number_of_images=NUMBER_OF_IMAGES)
+        display_controller.image_store.add(panel_image)
+        display_controller.image_store.add(small_image)
+        app = create_app((display_controller,), dispatch_mode)
+        client = app.test_client()
+        display_url = f"/display/{display_controller.identifier}"
+
+        print(f"Dispatched {dispatch_mode.name.lower()}:")
+        try:
+            benchmark("list displays", lambda: client.get("/display"))
+            benchmark(f"get display ({NUMBER_OF_IMAGES} images)", lambda: client.get(display_url))
+            benchmark("get image metadata", lambda: client.get(f"{display_url}/image/small/metadata"))
+            benchmark("get image data (small)", lambda: client.get(f"{display_url}/image/small/data"))
+            benchmark(
+                f"get image data ({len(panel_image.data) // 1024}KiB)",
+                lambda: client.get(f"{display_url}/image/{panel_image.identifier}/data"),
+            )
+        finally:
+            destroy_app(app)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmarks rotating full-panel PNGs with the rotate image transformers.
+
+Run with: `python -m remote_eink.tests.benchmarks.rotate`
+"""
+import random
+from io import BytesIO
+from timeit import timeit
+from typing import Callable
+
+from PIL import Image as PilImage
+
+from remote_eink.images import DataBasedImage, ImageType, Image
+from remote_eink.transformers import RotateImageTransformer, ImageRotationAwareRotateImageTransformer
+from remote_eink.transformers.rotate import ROTATION_METADATA_KEY
+
+PANEL_SIZE = (1200, 1600)
+REPEATS = 10
+
+
+def create_panel_image(rotation: float = 0) -> Image:
+    """
+    Creates a PNG image the size of a (large) e-ink panel.
+    :param rotation: image specific rotation
+    :return: created image
+    """
+    random.seed(0)
+    raster = PilImage.new("L", PANEL_SIZE, "white")
+    raster.putdata([random.choice((0, 255)) for _ in range(PANEL_SIZE[0] * PANEL_SIZE[1])])
+    byte_io = BytesIO()
+    raster.save(byte_io, "PNG")
+    return DataBasedImage("panel", byte_io.getvalue(), ImageType.PNG, {ROTATION_METADATA_KEY: rotation})
+
+
+def benchmark(name: str, to_benchmark: Callable[[], object]):
+    """
+    Benchmarks the given callable and prints the mean time taken.
+    :param name: name of the benchmark
+    :param to_benchmark: callable to benchmark
+    """
+    seconds = timeit(to_benchmark, number=REPEATS) / REPEATS
+    print(f"{name:<50} {seconds * 1000:8.1f}ms")
+
+
+def main():
+    image = create_panel_image()
+    raster = PilImage.open(BytesIO(image.data))
+    raster.load()
+
+    print("Rotate decoded raster:")
+    benchmark("resample (89 degrees)", lambda: raster.rotate(89, expand=True))
+    benchmark("resample (90 degrees, not expanded)", lambda: raster.rotate(90, expand=False))
+    benchmark("transpose (90 degrees)", lambda: raster.rotate(90, expand=True))
+
+    print("Rotate PNG (including decode and encode):")
+    for angle in (89, 90):
+        transformer = RotateImageTransformer(angle=angle)
+        benchmark(f"{angle} degrees", lambda: transformer.transform(image).data)
+
+    print("Rotate PNG with display and image rotation (including decode and encode):")
+    rotated_image = create_panel_image(rotation=90)
+    display_transformer = RotateImageTransformer(angle=90)
+    image_transformer = ImageRotationAwareRotateImageTransformer(angle=0)
+
+    def rotate_separately() -> bytes:
+        display_rotated = DataBasedImage(
+            rotated_image.identifier,
+            display_transformer.transform(rotated_image).data,
+            rotated_image.type,
+            rotated_image.metadata,
+        )
+        return image_transformer.transform(display_rotated).data
+
+    benchmark("separate (90 + 90 degrees)", rotate_separately)
+    folded_transformer = ImageRotationAwareRotateImageTransformer(angle=90)
+    benchmark("folded (180 degrees)", lambda: folded_transformer.transform(rotated_image).data)
+
+
+if __name__ == "__main__":
+    main()
@@ -70,6 +70,12 @@ class AbstractTest:
             self.display_controller.display(WHITE_IMAGE.identifier)
             self.assertFalse(display_listener.called)
 
+        def test_current_image_removed_in_batch(self):
+            self.display_controller.image_store.add_many([WHITE_IMAGE, BLACK_IMAGE])
+            self.display_controller.display(WHITE_IMAGE.identifier)
+            self.display_controller.image_store.remove_many([WHITE_IMAGE.identifier])
+            self.assertNotEqual(WHITE_IMAGE, self.display_controller.current_image)
+
         def test_display_applies_transforms(self):
             display_semaphore = Semaphore(0)
             displayed_image = None
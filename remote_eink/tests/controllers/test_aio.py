@@ -0,0 +1,143 @@
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from remote_eink.controllers.aio import ExecutorDisplayController, EventLoopDisplayController
+from remote_eink.controllers.base import ImageNotFoundError
+from remote_eink.controllers.simple import SimpleDisplayController
+from remote_eink.drivers.base import DisplayDriver
+from remote_eink.storage.image.base import ListenableImageStore
+from remote_eink.storage.image.memory import InMemoryImageStore
+from remote_eink.tests._common import event_loop_in_thread
+from remote_eink.tests.drivers._common import SlowDisplayDriver
+from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+
+_REFRESH_SECONDS = 0.2
+
+
+def _create_display_controller(driver: Optional[DisplayDriver] = None) -> SimpleDisplayController:
+    driver = driver if driver is not None else SlowDisplayDriver(refresh_seconds=_REFRESH_SECONDS)
+    return SimpleDisplayController(driver, InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]))
+
+
+class TestExecutorDisplayController(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests `ExecutorDisplayController`.
+    """
+
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    async def test_display(self):
+        display_controller = ExecutorDisplayController(_create_display_controller(), self.executor)
+        await display_controller.display(WHITE_IMAGE.identifier)
+        self.assertEqual(WHITE_IMAGE, display_controller.current_image)
+        self.assertIsNotNone(display_controller.driver.image)
+        await display_controller.clear()
+        self.assertIsNone(display_controller.driver.image)
+
+    async def test_display_non_existent(self):
+        display_controller = ExecutorDisplayController(_create_display_controller(), self.executor)
+        with self.assertRaises(ImageNotFoundError):
+            await display_controller.display("does-not-exist")
+
+    async def test_display_together(self):
+        display_controllers = [ExecutorDisplayController(_create_display_controller(), self.executor) for _ in range(8)]
+        started_at = time.monotonic()
+        await asyncio.gather(*(controller.display(WHITE_IMAGE.identifier) for controller in display_controllers))
+        # 8 displays refreshed with 4 threads
+        self.assertLess(time.monotonic() - started_at, 4 * _REFRESH_SECONDS)
+        for display_controller in display_controllers:
+            self.assertEqual(WHITE_IMAGE, display_controller.current_image)
+
+    async def test_display_on_same_display_one_at_a_time(self):
+        driver = SlowDisplayDriver(refresh_seconds=_REFRESH_SECONDS)
+        display_controller = ExecutorDisplayController(_create_display_controller(driver), self.executor)
+        await asyncio.gather(
+            display_controller.display(WHITE_IMAGE.identifier),
+            display_controller.display(BLACK_IMAGE.identifier),
+            display_controller.driver.clear(),
+        )
+        self.assertEqual(1, driver.max_concurrent_refreshes)
+
+    async def test_image_store_changes_one_at_a_time_with_display(self):
+        driver = SlowDisplayDriver(refresh_seconds=_REFRESH_SECONDS)
+        synchronous_display_controller = _create_display_controller(driver)
+        synchronous_display_controller.image_store.event_listeners.add_listener(
+            lambda image_id: synchronous_display_controller.display(BLACK_IMAGE.identifier),
+            ListenableImageStore.Event.REMOVE,
+        )
+        display_controller = ExecutorDisplayController(synchronous_display_controller, self.executor)
+        await asyncio.gather(
+            display_controller.display(WHITE_IMAGE.identifier),
+            display_controller.image_store.remove(WHITE_IMAGE.identifier),
+        )
+        self.assertEqual(1, driver.max_concurrent_refreshes)
+
+    async def test_display_one_at_a_time_with_display_controller_lock_holders(self):
+        driver = SlowDisplayDriver(refresh_seconds=_REFRESH_SECONDS)
+        synchronous_display_controller = _create_display_controller(driver)
+        display_controller = ExecutorDisplayController(synchronous_display_controller, self.executor)
+
+        def display_holding_lock():
+            with synchronous_display_controller.lock:
+                synchronous_display_controller.display(BLACK_IMAGE.identifier)
+
+        await asyncio.gather(
+            display_controller.display(WHITE_IMAGE.identifier),
+            asyncio.get_running_loop().run_in_executor(self.executor, display_holding_lock),
+        )
+        self.assertEqual(1, driver.max_concurrent_refreshes)
+
+    async def test_display_one_at_a_time_when_cancelled(self):
+        driver = SlowDisplayDriver(refresh_seconds=_REFRESH_SECONDS)
+        display_controller = ExecutorDisplayController(_create_display_controller(driver), self.executor)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(display_controller.display(WHITE_IMAGE.identifier), timeout=_REFRESH_SECONDS / 4)
+        await asyncio.gather(
+            display_controller.display(BLACK_IMAGE.identifier),
+            display_controller.image_store.remove(WHITE_IMAGE.identifier),
+        )
+        self.assertEqual(1, driver.max_concurrent_refreshes)
+        self.assertEqual(BLACK_IMAGE, display_controller.current_image)
+
+    async def test_image_store_read_during_display(self):
+        display_controller = ExecutorDisplayController(_create_display_controller(), self.executor)
+        display = asyncio.ensure_future(display_controller.display(WHITE_IMAGE.identifier))
+        await asyncio.sleep(_REFRESH_SECONDS / 4)
+        self.assertEqual(2, await display_controller.image_store.count())
+        self.assertFalse(display.done())
+        await display
+
+    async def test_apply_image_transforms(self):
+        display_controller = ExecutorDisplayController(_create_display_controller(), self.executor)
+        image = await display_controller.apply_image_transforms(WHITE_IMAGE)
+        self.assertEqual(WHITE_IMAGE.identifier, image.identifier)
+
+
+class TestEventLoopDisplayController(unittest.TestCase):
+    """
+    Tests `EventLoopDisplayController`, adapting a display controller to and from an asynchronous display controller.
+    """
+
+    def test_display(self):
+        with event_loop_in_thread() as loop:
+            display_controller = EventLoopDisplayController(
+                ExecutorDisplayController(_create_display_controller()), loop
+            )
+            self.assertEqual(2, len(display_controller.image_store))
+            display_controller.display(BLACK_IMAGE.identifier)
+            self.assertEqual(BLACK_IMAGE, display_controller.current_image)
+            display_controller.driver.sleep()
+            self.assertTrue(display_controller.driver.sleeping)
+            display_controller.clear()
+            self.assertIsNone(display_controller.driver.image)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
+from concurrent.futures import TimeoutError
 from threading import Semaphore
 from time import sleep
 from typing import Optional
+from unittest.mock import MagicMock
 
 from remote_eink.controllers.cycling import CyclableDisplayController, AutoCyclingDisplayController
 from remote_eink.drivers.base import ListenableDisplayDriver
@@ -11,6 +13,7 @@ from remote_eink.storage.image.memory import InMemoryImageStore
 from remote_eink.tests.controllers._common import AbstractTest
 from remote_eink.tests.drivers._common import DummyBaseDisplayDriver
 from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+from remote_eink.transformers.simple import SimpleImageTransformer
 
 
 class TestCyclableDisplayController(AbstractTest.TestDisplayController[CyclableDisplayController]):
@@ -71,6 +74,60 @@ class TestCyclableDisplayController(AbstractTest.TestDisplayController[CyclableD
         display_controller.display_next_image()
         self.assertEqual(BLACK_IMAGE, display_controller.current_image)
 
+    def test_display_next_image_when_images_added_in_batch(self):
+        display_controller = self.create_display_controller(InMemoryImageStore())
+        display_controller.image_store.add_many([WHITE_IMAGE, BLACK_IMAGE])
+        self.assertEqual(WHITE_IMAGE, display_controller.display_next_image())
+        self.assertEqual(BLACK_IMAGE, display_controller.display_next_image())
+
+    def test_display_next_image_when_image_replaced_in_batch(self):
+        display_controller = self.create_display_controller(InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]))
+        display_controller.image_store.replace_many([WHITE_IMAGE])
+        # The replaced image is not queued again
+        displayed = [display_controller.display_next_image() for _ in range(3)]
+        self.assertCountEqual([WHITE_IMAGE, BLACK_IMAGE], displayed[:2])
+        self.assertEqual(displayed[0], displayed[2])
+
+    def test_upcoming_images_pre_rendered(self):
+        transform = MagicMock(side_effect=lambda image: image)
+        display_controller = CyclableDisplayController(
+            DummyBaseDisplayDriver(),
+            InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]),
+            image_transformers=(SimpleImageTransformer(transform),),
+            pre_render_count=1,
+        )
+        first_image = display_controller.display_next_image()
+        pre_rendered = display_controller.pre_render_upcoming_images().result(timeout=10)
+        self.assertEqual(1, len(pre_rendered))
+        self.assertNotEqual(first_image.identifier, pre_rendered[0])
+        self.assertEqual(pre_rendered[0], display_controller.display_next_image().identifier)
+        display_controller.pre_render_upcoming_images().result(timeout=10)
+        self.assertCountEqual([WHITE_IMAGE, BLACK_IMAGE], [call.args[0] for call in transform.call_args_list])
+
+    def test_pre_rendering_paused(self):
+        display_controller = self.create_display_controller(InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]))
+        with display_controller.pause_pre_rendering():
+            future = display_controller.pre_render_upcoming_images()
+            self.assertRaises(TimeoutError, future.result, timeout=0.1)
+        self.assertEqual(2, len(future.result(timeout=10)))
+
+    def test_pre_rendering_holds_lock(self):
+        display_controller = self.create_display_controller(InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]))
+        with display_controller.lock:
+            future = display_controller.pre_render_upcoming_images()
+            self.assertRaises(TimeoutError, future.result, timeout=0.1)
+        self.assertEqual(2, len(future.result(timeout=10)))
+
+    def test_close(self):
+        display_controller = self.create_display_controller(InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]))
+        with display_controller.pause_pre_rendering():
+            future = display_controller.pre_render_upcoming_images()
+            pre_render_thread = next(iter(display_controller._pre_render_executor._threads))
+            display_controller.close()
+        self.assertEqual([], future.result(timeout=10))
+        pre_render_thread.join(timeout=10)
+        self.assertFalse(pre_render_thread.is_alive())
+
 
 class TestAutoCyclingDisplayController(AbstractTest.TestDisplayController[AutoCyclingDisplayController]):
     """
@@ -136,6 +193,23 @@ class TestAutoCyclingDisplayController(AbstractTest.TestDisplayController[AutoCy
         sleep(display_controller.cycle_image_after_seconds * 25)
         self.assertEqual(end_changes, changes)
 
+    def test_close(self):
+        display_controller = self.create_display_controller(InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]))
+        display_controller.start()
+        display_controller.close()
+        self.assertFalse(display_controller._scheduler.running)
+
+    def test_cycles_holding_lock(self):
+        display_controller = self.create_display_controller(InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]))
+        changes = Semaphore(0)
+        display_controller.driver.event_listeners.add_listener(
+            lambda image: changes.release(), ListenableDisplayDriver.Event.DISPLAY
+        )
+        with display_controller.lock:
+            display_controller.start()
+            self.assertFalse(changes.acquire(timeout=display_controller.cycle_image_after_seconds * 25))
+        self.assertTrue(changes.acquire(timeout=10))
+
 
 # TODO: test `SleepyDisplayController`
 
@@ -1,11 +1,21 @@
 import unittest
 from typing import Optional
+from unittest.mock import MagicMock
 
 from remote_eink.controllers.simple import SimpleDisplayController
+from remote_eink.images import DataBasedImage, FunctionBasedImage
 from remote_eink.storage.image.base import ImageStore
 from remote_eink.storage.image.memory import InMemoryImageStore
 from remote_eink.tests.controllers._common import AbstractTest
-from remote_eink.tests.drivers._common import DummyBaseDisplayDriver
+from remote_eink.drivers.base import FramebufferImage
+from remote_eink.tests.drivers._common import (
+    DummyBaseDisplayDriver,
+    DummyFramebufferDisplayDriver,
+    EXAMPLE_NATIVE_FORMAT,
+)
+from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+from remote_eink.transformers.base import ListenableMutableImageTransformer
+from remote_eink.transformers.simple import SimpleImageTransformer
 
 
 class TestSimpleDisplayController(AbstractTest.TestDisplayController[SimpleDisplayController]):
@@ -20,6 +30,83 @@ class TestSimpleDisplayController(AbstractTest.TestDisplayController[SimpleDispl
             DummyBaseDisplayDriver(), image_store if image_store is not None else InMemoryImageStore()
         )
 
+    def test_image_transforms_cached(self):
+        transform = MagicMock(return_value=BLACK_IMAGE)
+        self.display_controller.image_transformers.add(SimpleImageTransformer(transform))
+        for _ in range(2):
+            self.assertEqual(BLACK_IMAGE, self.display_controller.apply_image_transforms(WHITE_IMAGE))
+        self.assertEqual(1, transform.call_count)
+
+    def test_image_transforms_cached_materialised(self):
+        read_data = MagicMock(return_value=BLACK_IMAGE.data)
+        lazy_image = FunctionBasedImage(BLACK_IMAGE.identifier, read_data, BLACK_IMAGE.type)
+        self.display_controller.image_transformers.add(SimpleImageTransformer(lambda _: lazy_image))
+        for _ in range(2):
+            self.assertEqual(BLACK_IMAGE.data, self.display_controller.apply_image_transforms(WHITE_IMAGE).data)
+        self.assertEqual(1, read_data.call_count)
+
+    def test_image_transforms_cached_by_image_content(self):
+        transform = MagicMock(side_effect=lambda image: image)
+        self.display_controller.image_transformers.add(SimpleImageTransformer(transform))
+        self.display_controller.apply_image_transforms(WHITE_IMAGE)
+        changed_image = DataBasedImage(WHITE_IMAGE.identifier, BLACK_IMAGE.data, BLACK_IMAGE.type)
+        self.assertEqual(changed_image, self.display_controller.apply_image_transforms(changed_image))
+        self.assertEqual(2, transform.call_count)
+
+    def test_image_transforms_cached_by_configuration(self):
+        transform = MagicMock(return_value=BLACK_IMAGE)
+        transformer = SimpleImageTransformer(transform, configuration={"value": 1})
+        self.display_controller.image_transformers.add(transformer)
+        self.display_controller.apply_image_transforms(WHITE_IMAGE)
+        transformer.modify_configuration({"value": 2})
+        self.display_controller.apply_image_transforms(WHITE_IMAGE)
+        transformer.active = False
+        self.assertEqual(WHITE_IMAGE, self.display_controller.apply_image_transforms(WHITE_IMAGE))
+        self.assertEqual(2, transform.call_count)
+
+    def test_render_cache_cleared_on_image_transformer_change(self):
+        transformer = ListenableMutableImageTransformer(SimpleImageTransformer(lambda _: BLACK_IMAGE))
+        self.display_controller.image_transformers.add(transformer)
+        self.display_controller.apply_image_transforms(WHITE_IMAGE)
+        self.assertEqual(1, len(self.display_controller.render_cache))
+        transformer.modify_configuration({"value": 2})
+        self.assertEqual(0, len(self.display_controller.render_cache))
+
+        self.display_controller.apply_image_transforms(WHITE_IMAGE)
+        self.display_controller.image_transformers.remove(transformer)
+        self.assertEqual(0, len(self.display_controller.render_cache))
+        # No longer listened to
+        self.display_controller.image_transformers.add(SimpleImageTransformer(lambda _: BLACK_IMAGE))
+        self.display_controller.apply_image_transforms(WHITE_IMAGE)
+        transformer.active = False
+        self.assertEqual(1, len(self.display_controller.render_cache))
+
+    def test_display_with_native_format(self):
+        transform = MagicMock(side_effect=lambda image: image)
+        driver = DummyFramebufferDisplayDriver()
+        display_controller = SimpleDisplayController(
+            driver,
+            InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]),
+            image_transformers=[SimpleImageTransformer(transform)],
+        )
+        for image in (WHITE_IMAGE, BLACK_IMAGE, WHITE_IMAGE):
+            display_controller.display(image.identifier)
+        self.assertEqual(WHITE_IMAGE, display_controller.current_image)
+        self.assertEqual(3, len(driver.displayed_framebuffers))
+        self.assertEqual(driver.displayed_framebuffers[0], driver.displayed_framebuffers[2])
+        self.assertEqual(EXAMPLE_NATIVE_FORMAT, driver.displayed_framebuffers[0].format)
+        self.assertEqual(2, transform.call_count)
+
+    def test_render_without_native_format(self):
+        self.display_controller.image_transformers.add(SimpleImageTransformer(lambda image: BLACK_IMAGE))
+        self.assertEqual(BLACK_IMAGE, self.display_controller.render(WHITE_IMAGE))
+
+    def test_render_with_native_format(self):
+        display_controller = SimpleDisplayController(DummyFramebufferDisplayDriver(), InMemoryImageStore())
+        rendered_image = display_controller.render(WHITE_IMAGE)
+        self.assertIsInstance(rendered_image, FramebufferImage)
+        self.assertIs(rendered_image, display_controller.render(WHITE_IMAGE))
+
 
 # TODO: test `SleepyDisplayController`
 
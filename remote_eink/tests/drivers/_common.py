@@ -1,4 +1,12 @@
-from remote_eink.drivers.base import BaseDisplayDriver
+import time
+from threading import Lock
+from typing import Optional, List, Tuple, Iterable
+
+from PIL import Image as PilImage
+
+from remote_eink.drivers.base import BaseDisplayDriver, NativeFormat, Framebuffer, Rectangle
+
+EXAMPLE_NATIVE_FORMAT = NativeFormat(80, 48, "1")
 
 
 class DummyBaseDisplayDriver(BaseDisplayDriver):
@@ -6,7 +14,7 @@ class DummyBaseDisplayDriver(BaseDisplayDriver):
     Dummy display driver.
     """
 
-    def _display(self, image_data: bytes):
+    def _display(self, image_data: memoryview):
         pass
 
     def _clear(self):
@@ -17,3 +25,61 @@ class DummyBaseDisplayDriver(BaseDisplayDriver):
 
     def _wake(self):
         pass
+
+
+class SlowDisplayDriver(DummyBaseDisplayDriver):
+    """
+    Dummy display driver that takes time to refresh, recording the most refreshes that were in progress at once.
+    """
+
+    def __init__(self, *args, refresh_seconds: float = 0.2, **kwargs):
+        self.refresh_seconds = refresh_seconds
+        self.max_concurrent_refreshes = 0
+        self._concurrent_refreshes = 0
+        self._refreshes_lock = Lock()
+        super().__init__(*args, **kwargs)
+
+    def _display(self, image_data: memoryview):
+        with self._refreshes_lock:
+            self._concurrent_refreshes += 1
+            self.max_concurrent_refreshes = max(self.max_concurrent_refreshes, self._concurrent_refreshes)
+        time.sleep(self.refresh_seconds)
+        with self._refreshes_lock:
+            self._concurrent_refreshes -= 1
+
+
+class DummyFramebufferDisplayDriver(DummyBaseDisplayDriver):
+    """
+    Dummy display driver that displays framebuffers in a native format.
+    """
+
+    @property
+    def native_format(self) -> Optional[NativeFormat]:
+        return EXAMPLE_NATIVE_FORMAT
+
+    def __init__(self, *args, **kwargs):
+        self.displayed_data: List[bytes] = []
+        self.displayed_framebuffers: List[Framebuffer] = []
+        self.displayed_partials: List[Tuple[Framebuffer, List[Rectangle]]] = []
+        super().__init__(*args, **kwargs)
+
+    def _display(self, image_data: memoryview):
+        self.displayed_data.append(bytes(image_data))
+
+    def _display_framebuffer(self, framebuffer: Framebuffer):
+        self.displayed_framebuffers.append(framebuffer)
+
+    def _display_partial(self, framebuffer: Framebuffer, dirty_rectangles: List[Rectangle]):
+        self.displayed_partials.append((framebuffer, dirty_rectangles))
+
+
+def create_framebuffer(black_pixels: Iterable[Tuple[int, int]] = ()) -> Framebuffer:
+    """
+    Creates a white framebuffer in `EXAMPLE_NATIVE_FORMAT`.
+    :param black_pixels: (x, y) coordinates of pixels to make black
+    :return: created framebuffer
+    """
+    raster = PilImage.new(EXAMPLE_NATIVE_FORMAT.mode, EXAMPLE_NATIVE_FORMAT.size, 1)
+    for black_pixel in black_pixels:
+        raster.putpixel(black_pixel, 0)
+    return Framebuffer(EXAMPLE_NATIVE_FORMAT, raster.tobytes())
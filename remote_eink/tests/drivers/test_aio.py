@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+from threading import Lock
+
+from remote_eink.drivers.aio import ExecutorDisplayDriver, EventLoopDisplayDriver
+from remote_eink.tests._common import event_loop_in_thread
+from remote_eink.tests.drivers._common import DummyBaseDisplayDriver, SlowDisplayDriver
+from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+
+
+class TestExecutorDisplayDriver(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests `ExecutorDisplayDriver`.
+    """
+
+    async def test_display(self):
+        driver = ExecutorDisplayDriver(DummyBaseDisplayDriver())
+        await driver.display(WHITE_IMAGE)
+        self.assertEqual(WHITE_IMAGE, driver.image)
+        await driver.clear()
+        self.assertIsNone(driver.image)
+
+    async def test_sleep_and_wake(self):
+        driver = ExecutorDisplayDriver(DummyBaseDisplayDriver())
+        await driver.sleep()
+        self.assertTrue(driver.sleeping)
+        await driver.wake()
+        self.assertFalse(driver.sleeping)
+
+    async def test_display_one_at_a_time(self):
+        display_driver = SlowDisplayDriver(refresh_seconds=0.05)
+        driver = ExecutorDisplayDriver(display_driver)
+        await asyncio.gather(*(driver.display(image) for image in (WHITE_IMAGE, BLACK_IMAGE, WHITE_IMAGE)))
+        self.assertEqual(1, display_driver.max_concurrent_refreshes)
+
+    async def test_display_one_at_a_time_when_cancelled(self):
+        display_driver = SlowDisplayDriver(refresh_seconds=0.2)
+        driver = ExecutorDisplayDriver(display_driver)
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(driver.display(WHITE_IMAGE), timeout=0.05)
+        await driver.display(BLACK_IMAGE)
+        self.assertEqual(1, display_driver.max_concurrent_refreshes)
+        self.assertEqual(BLACK_IMAGE, driver.image)
+
+    async def test_display_holds_thread_lock(self):
+        display_driver = SlowDisplayDriver(refresh_seconds=0.05)
+        thread_lock = Lock()
+        driver = ExecutorDisplayDriver(display_driver, thread_lock=thread_lock)
+        display = asyncio.ensure_future(driver.display(WHITE_IMAGE))
+        await asyncio.sleep(0.01)
+        self.assertTrue(thread_lock.locked())
+        await display
+        self.assertFalse(thread_lock.locked())
+
+
+class TestEventLoopDisplayDriver(unittest.TestCase):
+    """
+    Tests `EventLoopDisplayDriver`.
+    """
+
+    def test_display(self):
+        with event_loop_in_thread() as loop:
+            driver = EventLoopDisplayDriver(ExecutorDisplayDriver(DummyBaseDisplayDriver()), loop)
+            driver.image = WHITE_IMAGE
+            self.assertEqual(WHITE_IMAGE, driver.image)
+            driver.sleep()
+            self.assertTrue(driver.sleeping)
+            driver.clear()
+            self.assertIsNone(driver.image)
+            self.assertFalse(driver.sleeping)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,30 @@
 import unittest
 from abc import abstractmethod
 from typing import Generic, TypeVar
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from remote_eink.drivers.base import DisplayDriver, BaseDisplayDriver, ListenableDisplayDriver
-from remote_eink.tests.drivers._common import DummyBaseDisplayDriver
+import pickle
+from io import BytesIO
+
+from PIL import Image as PilImage
+
+from remote_eink.drivers.base import (
+    DisplayDriver,
+    BaseDisplayDriver,
+    ListenableDisplayDriver,
+    FramebufferImage,
+    NativeFormat,
+    Rectangle,
+    RefreshPolicy,
+    find_dirty_rectangles,
+)
+from remote_eink.images import DataBasedImage
+from remote_eink.tests.drivers._common import (
+    DummyBaseDisplayDriver,
+    DummyFramebufferDisplayDriver,
+    EXAMPLE_NATIVE_FORMAT,
+    create_framebuffer,
+)
 from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
 
 DisplayDriverType = TypeVar("DisplayDriverType", bound=DisplayDriver)
@@ -79,6 +99,170 @@ class TestBaseDisplayDriver(AbstractTest.TestDisplayDriver[BaseDisplayDriverType
         display_driver = DummyBaseDisplayDriver(image=WHITE_IMAGE)
         self.assertEqual(WHITE_IMAGE, display_driver.image)
 
+    def test_display_identical_image(self):
+        self.display_driver.display(WHITE_IMAGE)
+        identical_image = DataBasedImage("other", WHITE_IMAGE.data, WHITE_IMAGE.type)
+        with patch.object(self.display_driver, "_display") as display:
+            self.display_driver.display(identical_image)
+        self.assertEqual(0, display.call_count)
+        self.assertEqual(identical_image, self.display_driver.image)
+
+
+class TestFramebufferDisplayDriver(AbstractTest.TestDisplayDriver[DummyFramebufferDisplayDriver], unittest.TestCase):
+    """
+    Tests for `BaseDisplayDriver` with a native format.
+    """
+
+    def create_display_driver(self) -> DummyFramebufferDisplayDriver:
+        return DummyFramebufferDisplayDriver()
+
+    def test_display_framebuffer_image(self):
+        image = FramebufferImage.from_image(WHITE_IMAGE, EXAMPLE_NATIVE_FORMAT)
+        self.display_driver.display(image)
+        self.assertEqual([image.framebuffer], self.display_driver.displayed_framebuffers)
+        self.assertEqual([], self.display_driver.displayed_data)
+
+    def test_display_identical_frame(self):
+        self.display_driver.display(FramebufferImage("1", create_framebuffer()))
+        self.display_driver.display(FramebufferImage("2", create_framebuffer()))
+        self.assertEqual(1, len(self.display_driver.displayed_framebuffers))
+        self.assertEqual("2", self.display_driver.image.identifier)
+
+    def test_framebuffer_image_digest_not_encoded(self):
+        image = FramebufferImage("1", create_framebuffer())
+        self.assertEqual(FramebufferImage("1", create_framebuffer()), image)
+        self.assertNotEqual(FramebufferImage("1", create_framebuffer([(1, 1)])), image)
+        self.assertIsNone(image._data)
+        self.assertEqual(image, pickle.loads(pickle.dumps(image)))
+
+    def test_display_changed_frame_without_refresh_policy(self):
+        self.display_driver.display(FramebufferImage("1", create_framebuffer()))
+        self.display_driver.display(FramebufferImage("2", create_framebuffer([(1, 1)])))
+        self.assertEqual(2, len(self.display_driver.displayed_framebuffers))
+        self.assertEqual([], self.display_driver.displayed_partials)
+
+    def test_display_changed_frame_with_refresh_policy(self):
+        display_driver = DummyFramebufferDisplayDriver(refresh_policy=RefreshPolicy(partial_refreshes_between_full=1))
+        frames = [create_framebuffer(), create_framebuffer([(1, 1)]), create_framebuffer([(2, 2)])]
+        for i, frame in enumerate(frames):
+            display_driver.display(FramebufferImage(str(i), frame))
+        self.assertEqual([frames[0], frames[2]], display_driver.displayed_framebuffers)
+        self.assertEqual([(frames[1], [Rectangle(1, 1, 2, 2)])], display_driver.displayed_partials)
+
+    def test_display_after_wake_is_full(self):
+        display_driver = DummyFramebufferDisplayDriver(refresh_policy=RefreshPolicy())
+        display_driver.display(FramebufferImage("1", create_framebuffer()))
+        display_driver.sleep()
+        display_driver.display(FramebufferImage("2", create_framebuffer([(1, 1)])))
+        self.assertEqual(2, len(display_driver.displayed_framebuffers))
+        self.assertEqual([], display_driver.displayed_partials)
+
+    def test_display_after_failed_refresh_is_full(self):
+        display_driver = DummyFramebufferDisplayDriver(refresh_policy=RefreshPolicy())
+        display_driver.display(FramebufferImage("1", create_framebuffer()))
+        with patch.object(display_driver, "_display_partial", side_effect=IOError()):
+            self.assertRaises(IOError, display_driver.display, FramebufferImage("2", create_framebuffer([(1, 1)])))
+        display_driver.display(FramebufferImage("3", create_framebuffer([(1, 1)])))
+        self.assertEqual(2, len(display_driver.displayed_framebuffers))
+        self.assertEqual([], display_driver.displayed_partials)
+
+    def test_display_partial_defaults_to_full_refresh(self):
+        display_driver = DummyFramebufferDisplayDriver(refresh_policy=RefreshPolicy())
+        display_driver.display(FramebufferImage("1", create_framebuffer()))
+        frame = create_framebuffer([(1, 1)])
+        BaseDisplayDriver._display_partial(display_driver, frame, [Rectangle(1, 1, 2, 2)])
+        self.assertEqual(frame, display_driver.displayed_framebuffers[-1])
+
+    def test_display_framebuffer_image_in_other_format(self):
+        image = FramebufferImage.from_image(WHITE_IMAGE, NativeFormat(10, 10, "L"))
+        self.display_driver.display(image)
+        self.assertEqual([], self.display_driver.displayed_framebuffers)
+        self.assertEqual([image.data], self.display_driver.displayed_data)
+
+
+class TestFramebufferImage(unittest.TestCase):
+    """
+    Tests for `FramebufferImage`.
+    """
+
+    def setUp(self):
+        self.image = FramebufferImage.from_image(BLACK_IMAGE, EXAMPLE_NATIVE_FORMAT)
+
+    def test_from_image(self):
+        self.assertEqual(BLACK_IMAGE.identifier, self.image.identifier)
+        self.assertEqual(BLACK_IMAGE.metadata, self.image.metadata)
+        self.assertEqual(EXAMPLE_NATIVE_FORMAT, self.image.framebuffer.format)
+        self.assertEqual(
+            EXAMPLE_NATIVE_FORMAT.width * EXAMPLE_NATIVE_FORMAT.height // 8, len(self.image.framebuffer.data)
+        )
+
+    def test_data(self):
+        raster = PilImage.open(BytesIO(self.image.data))
+        self.assertEqual(EXAMPLE_NATIVE_FORMAT.size, raster.size)
+        self.assertEqual(EXAMPLE_NATIVE_FORMAT.mode, raster.mode)
+
+    def test_pickle(self):
+        unpickled_image = pickle.loads(pickle.dumps(self.image))
+        self.assertIsInstance(unpickled_image, DataBasedImage)
+        self.assertEqual(self.image, unpickled_image)
+
+
+class TestFindDirtyRectangles(unittest.TestCase):
+    """
+    Tests for `find_dirty_rectangles`.
+    """
+
+    def test_when_identical(self):
+        self.assertEqual([], find_dirty_rectangles(create_framebuffer(), create_framebuffer()))
+
+    def test_when_different(self):
+        self.assertEqual(
+            [Rectangle(3, 2, 11, 5)],
+            find_dirty_rectangles(create_framebuffer(), create_framebuffer([(3, 4), (10, 2)])),
+        )
+
+    def test_when_different_in_separate_bands(self):
+        self.assertEqual(
+            [Rectangle(3, 2, 4, 3), Rectangle(10, 40, 11, 41)],
+            find_dirty_rectangles(create_framebuffer(), create_framebuffer([(3, 2), (10, 40)]), band_height=8),
+        )
+
+    def test_when_different_in_adjacent_bands(self):
+        self.assertEqual(
+            [Rectangle(3, 6, 11, 10)],
+            find_dirty_rectangles(create_framebuffer(), create_framebuffer([(3, 6), (10, 9)]), band_height=8),
+        )
+
+    def test_when_different_formats(self):
+        other_framebuffer = FramebufferImage.from_image(WHITE_IMAGE, NativeFormat(10, 10, "L")).framebuffer
+        self.assertRaises(ValueError, find_dirty_rectangles, create_framebuffer(), other_framebuffer)
+
+
+class TestRefreshPolicy(unittest.TestCase):
+    """
+    Tests for `RefreshPolicy`.
+    """
+
+    def test_full_refresh_forced(self):
+        refresh_policy = RefreshPolicy(partial_refreshes_between_full=2)
+        choices = [refresh_policy.use_partial_refresh(EXAMPLE_NATIVE_FORMAT, [Rectangle(0, 0, 1, 1)]) for _ in range(6)]
+        self.assertEqual([True, True, False, True, True, False], choices)
+
+    def test_full_refresh_when_large_area_changed(self):
+        refresh_policy = RefreshPolicy(max_partial_refresh_area_fraction=0.5)
+        half_width = EXAMPLE_NATIVE_FORMAT.width // 2
+        self.assertTrue(
+            refresh_policy.use_partial_refresh(
+                EXAMPLE_NATIVE_FORMAT, [Rectangle(0, 0, half_width, EXAMPLE_NATIVE_FORMAT.height)]
+            )
+        )
+        self.assertFalse(
+            refresh_policy.use_partial_refresh(
+                EXAMPLE_NATIVE_FORMAT, [Rectangle(0, 0, half_width + 1, EXAMPLE_NATIVE_FORMAT.height)]
+            )
+        )
+        self.assertEqual(0, refresh_policy.partial_refreshes_since_full)
+
 
 class TestListenableDisplayDriver(AbstractTest.TestDisplayDriver[ListenableDisplayDriver], unittest.TestCase):
     """
@@ -92,6 +276,11 @@ class TestListenableDisplayDriver(AbstractTest.TestDisplayDriver[ListenableDispl
     def create_display_driver(self) -> ListenableDisplayDriver:
         return ListenableDisplayDriver(DummyBaseDisplayDriver())
 
+    def test_native_format(self):
+        self.assertIsNone(self.display_driver.native_format)
+        display_driver = ListenableDisplayDriver(DummyFramebufferDisplayDriver())
+        self.assertEqual(EXAMPLE_NATIVE_FORMAT, display_driver.native_format)
+
     def test_listener_display(self):
         self.display_driver.event_listeners.add(self.listener, ListenableDisplayDriver.Event.DISPLAY)
         self.display_driver.display(WHITE_IMAGE)
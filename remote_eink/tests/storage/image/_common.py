@@ -2,12 +2,14 @@ import unittest
 from abc import abstractmethod, ABCMeta
 from typing import TypeVar, Generic
 
-from remote_eink.images import FunctionBasedImage
+from remote_eink.images import FunctionBasedImage, DataBasedImage
 from remote_eink.storage.image.base import (
     ImageStore,
     ImageAlreadyExistsError,
+    ImageIdPage,
 )
 from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+from remote_eink.tests.storage.image.test_thumbnail import get_size
 
 _ImageStoreType = TypeVar("_ImageStoreType", bound=ImageStore)
 
@@ -41,11 +43,104 @@ class AbstractTest:
                 self.image_store.add(image)
             self.assertCountEqual(images, self.image_store)
 
+        def test_iter_in_list_order(self):
+            for image in (WHITE_IMAGE, BLACK_IMAGE):
+                self.image_store.add(image)
+            self.assertEqual(self.image_store.list(), list(self.image_store))
+
+        def test_iter_while_removing(self):
+            for image in (WHITE_IMAGE, BLACK_IMAGE):
+                self.image_store.add(image)
+            images = []
+            for image in self.image_store:
+                images.append(image)
+                for other_image in (WHITE_IMAGE, BLACK_IMAGE):
+                    self.image_store.remove(other_image.identifier)
+            self.assertEqual(1, len(images))
+
         def test_contains(self):
             self.image_store.add(BLACK_IMAGE)
             self.assertIn(BLACK_IMAGE, self.image_store)
             self.assertNotIn(WHITE_IMAGE, self.image_store)
 
+        def test_contains_with_same_id(self):
+            self.image_store.add(BLACK_IMAGE)
+            image = DataBasedImage(BLACK_IMAGE.identifier, WHITE_IMAGE.data, WHITE_IMAGE.type)
+            self.assertNotIn(image, self.image_store)
+            self.assertNotIn(BLACK_IMAGE.identifier, self.image_store)
+
+        def test_get_thumbnail(self):
+            self.image_store.add(WHITE_IMAGE)
+            for _ in range(2):
+                thumbnail = self.image_store.get_thumbnail(WHITE_IMAGE.identifier, width=10)
+                self.assertEqual((10, 20), get_size(thumbnail))
+                self.assertEqual(WHITE_IMAGE.identifier, thumbnail.identifier)
+                self.assertEqual(WHITE_IMAGE.type, thumbnail.type)
+            self.assertEqual((5, 10), get_size(self.image_store.get_thumbnail(WHITE_IMAGE.identifier, 10, 10)))
+
+        def test_get_thumbnail_larger_than_image(self):
+            self.image_store.add(WHITE_IMAGE)
+            self.assertEqual(WHITE_IMAGE.data, self.image_store.get_thumbnail(WHITE_IMAGE.identifier, height=1000).data)
+
+        def test_get_thumbnail_when_does_not_exist(self):
+            self.assertIsNone(self.image_store.get_thumbnail(WHITE_IMAGE.identifier, width=10))
+
+        def test_get_thumbnail_with_invalid_size(self):
+            self.image_store.add(WHITE_IMAGE)
+            self.assertRaises(ValueError, self.image_store.get_thumbnail, WHITE_IMAGE.identifier)
+            self.assertRaises(ValueError, self.image_store.get_thumbnail, WHITE_IMAGE.identifier, 0)
+
+        def test_list_ids(self):
+            self.image_store.add_many([WHITE_IMAGE, BLACK_IMAGE])
+            image_ids = sorted((WHITE_IMAGE.identifier, BLACK_IMAGE.identifier))
+            self.assertEqual(ImageIdPage(image_ids), self.image_store.list_ids())
+            self.assertEqual(ImageIdPage(image_ids), self.image_store.list_ids(limit=2))
+
+        def test_list_ids_paged(self):
+            self.image_store.add_many([WHITE_IMAGE, BLACK_IMAGE])
+            image_ids = sorted((WHITE_IMAGE.identifier, BLACK_IMAGE.identifier))
+            page = self.image_store.list_ids(limit=1)
+            self.assertEqual(image_ids[:1], page.image_ids)
+            page = self.image_store.list_ids(limit=1, cursor=page.next_cursor)
+            self.assertEqual(ImageIdPage(image_ids[1:]), page)
+
+        def test_list_ids_invalid_limit(self):
+            self.assertRaises(ValueError, self.image_store.list_ids, 0)
+
+        def test_add_many(self):
+            self.image_store.add_many([WHITE_IMAGE, BLACK_IMAGE])
+            self.assertCountEqual((WHITE_IMAGE, BLACK_IMAGE), self.image_store.list())
+
+        def test_add_many_with_existing_id(self):
+            self.image_store.add(WHITE_IMAGE)
+            self.assertRaises(ImageAlreadyExistsError, self.image_store.add_many, [BLACK_IMAGE, WHITE_IMAGE])
+            self.assertEqual([WHITE_IMAGE], self.image_store.list())
+
+        def test_add_many_with_same_id(self):
+            self.assertRaises(ImageAlreadyExistsError, self.image_store.add_many, [WHITE_IMAGE, WHITE_IMAGE])
+            self.assertEqual(0, len(self.image_store))
+
+        def test_remove_many(self):
+            self.image_store.add_many([WHITE_IMAGE, BLACK_IMAGE])
+            removed = self.image_store.remove_many([WHITE_IMAGE.identifier, "does-not-exist", WHITE_IMAGE.identifier])
+            self.assertEqual([WHITE_IMAGE.identifier], removed)
+            self.assertEqual([BLACK_IMAGE], self.image_store.list())
+
+        def test_replace_many(self):
+            self.image_store.add_many([WHITE_IMAGE, BLACK_IMAGE])
+            replacement = DataBasedImage(WHITE_IMAGE.identifier, BLACK_IMAGE.data, BLACK_IMAGE.type)
+            new_image = DataBasedImage("new-image", WHITE_IMAGE.data, WHITE_IMAGE.type)
+            removed = self.image_store.replace_many(
+                [replacement, new_image], [BLACK_IMAGE.identifier, "does-not-exist"]
+            )
+            self.assertEqual([BLACK_IMAGE.identifier], removed)
+            self.assertCountEqual([replacement, new_image], self.image_store.list())
+
+        def test_replace_many_with_same_id(self):
+            self.image_store.add(WHITE_IMAGE)
+            self.assertRaises(ImageAlreadyExistsError, self.image_store.replace_many, [BLACK_IMAGE, BLACK_IMAGE])
+            self.assertEqual([WHITE_IMAGE], self.image_store.list())
+
         def test_get_non_existent(self):
             self.assertIsNone(self.image_store.get("does-not-exist"))
 
@@ -60,6 +155,14 @@ class AbstractTest:
             self.assertEqual(WHITE_IMAGE, self.image_store.get(WHITE_IMAGE.identifier))
             self.assertEqual(BLACK_IMAGE, self.image_store.get(BLACK_IMAGE.identifier))
 
+        def test_buffer(self):
+            self.image_store.add(WHITE_IMAGE)
+            self.assertEqual(WHITE_IMAGE.data, bytes(self.image_store.get(WHITE_IMAGE.identifier).buffer()))
+
+        def test_digest(self):
+            self.image_store.add(WHITE_IMAGE)
+            self.assertEqual(WHITE_IMAGE.digest, self.image_store.get(WHITE_IMAGE.identifier).digest)
+
         def test_set_with_same_identifier(self):
             self.image_store.add(WHITE_IMAGE)
             self.assertRaises(ImageAlreadyExistsError, self.image_store.add, WHITE_IMAGE)
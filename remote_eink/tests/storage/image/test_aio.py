@@ -0,0 +1,65 @@
+import asyncio
+import unittest
+from contextlib import ExitStack
+
+from remote_eink.storage.image.aio import ExecutorImageStore, EventLoopImageStore
+from remote_eink.storage.image.memory import InMemoryImageStore
+from remote_eink.tests._common import event_loop_in_thread
+from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+from remote_eink.tests.storage.image._common import AbstractTest
+
+
+class TestExecutorImageStore(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests `ExecutorImageStore`.
+    """
+
+    def setUp(self):
+        self.image_store = ExecutorImageStore(InMemoryImageStore([WHITE_IMAGE]))
+
+    async def test_get(self):
+        self.assertEqual(WHITE_IMAGE, await self.image_store.get(WHITE_IMAGE.identifier))
+        self.assertIsNone(await self.image_store.get(BLACK_IMAGE.identifier))
+
+    async def test_add_and_remove(self):
+        await self.image_store.add(BLACK_IMAGE)
+        self.assertEqual(2, await self.image_store.count())
+        self.assertTrue(await self.image_store.contains(BLACK_IMAGE))
+        self.assertEqual([WHITE_IMAGE.identifier], await self.image_store.remove_many([WHITE_IMAGE.identifier]))
+        self.assertEqual([BLACK_IMAGE], await self.image_store.list())
+
+    async def test_get_thumbnails_together(self):
+        thumbnails = await asyncio.gather(
+            *(self.image_store.get_thumbnail(WHITE_IMAGE.identifier, width) for width in range(1, 5))
+        )
+        self.assertEqual(4, len(thumbnails))
+        self.assertNotIn(None, thumbnails)
+
+
+class TestEventLoopImageStore(AbstractTest.TestImageStore[EventLoopImageStore]):
+    """
+    Tests `EventLoopImageStore`, adapting an image store to and from an asynchronous image store.
+    """
+
+    def setUp(self):
+        self._exit_stack = ExitStack()
+        self.loop = self._exit_stack.enter_context(event_loop_in_thread())
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self._exit_stack.close()
+
+    def create_image_store(self, *args, **kwargs) -> EventLoopImageStore:
+        return EventLoopImageStore(ExecutorImageStore(InMemoryImageStore(*args, **kwargs)), self.loop)
+
+    def test_call_on_event_loop_thread(self):
+        async def call_on_event_loop():
+            return self.image_store.get(WHITE_IMAGE.identifier)
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run_coroutine_threadsafe(call_on_event_loop(), self.loop).result()
+
+
+if __name__ == "__main__":
+    unittest.main()
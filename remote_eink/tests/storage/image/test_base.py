@@ -3,6 +3,7 @@ import shutil
 import tempfile
 import unittest
 from typing import TypeVar
+from unittest.mock import MagicMock
 
 from remote_eink.storage.image.base import (
     ImageStore,
@@ -76,6 +77,31 @@ class TestListenableImageStore(AbstractTest.TestImageStore[ListenableImageStore]
         self.image_store.remove(WHITE_IMAGE.identifier)
         self.assertEqual(removed, WHITE_IMAGE.identifier)
 
+    def test_add_many_listener(self):
+        listener = MagicMock()
+        self.image_store.event_listeners.add_listener(listener, ListenableImageStore.Event.ADD_MANY)
+        self.image_store.add_many([WHITE_IMAGE, BLACK_IMAGE])
+        listener.assert_called_once_with([WHITE_IMAGE, BLACK_IMAGE])
+
+    def test_remove_many_listener(self):
+        listener = MagicMock()
+        self.image_store.event_listeners.add_listener(listener, ListenableImageStore.Event.REMOVE_MANY)
+        self.image_store.add(WHITE_IMAGE)
+        self.image_store.remove_many([WHITE_IMAGE.identifier, BLACK_IMAGE.identifier])
+        listener.assert_called_once_with([WHITE_IMAGE.identifier])
+
+    def test_replace_many_listeners(self):
+        add_many_listener = MagicMock()
+        remove_many_listener = MagicMock()
+        self.image_store.event_listeners.add_listener(add_many_listener, ListenableImageStore.Event.ADD_MANY)
+        self.image_store.event_listeners.add_listener(remove_many_listener, ListenableImageStore.Event.REMOVE_MANY)
+        self.image_store.add_many([WHITE_IMAGE, BLACK_IMAGE])
+        add_many_listener.reset_mock()
+        self.image_store.replace_many([WHITE_IMAGE], [BLACK_IMAGE.identifier])
+        # The replaced image is not announced as removed
+        remove_many_listener.assert_called_once_with([BLACK_IMAGE.identifier])
+        add_many_listener.assert_called_once_with([WHITE_IMAGE])
+
     def create_image_store(self, *args, **kwargs) -> ListenableImageStore:
         return ListenableImageStore(InMemoryImageStore(*args, **kwargs))
 
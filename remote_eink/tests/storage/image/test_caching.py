@@ -0,0 +1,75 @@
+import pickle
+import unittest
+
+from remote_eink.images import DataBasedImage
+from remote_eink.storage.image.base import ListenableImageStore
+from remote_eink.storage.image.caching import CachingImageStore
+from remote_eink.storage.image.memory import InMemoryImageStore
+from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+from remote_eink.tests.storage.image._common import AbstractTest
+
+
+class TestCachingImageStore(AbstractTest.TestImageStore[CachingImageStore]):
+    """
+    Tests `CachingImageStore`.
+    """
+
+    def create_image_store(self, *args, **kwargs) -> CachingImageStore:
+        return CachingImageStore(InMemoryImageStore(*args, **kwargs))
+
+    def test_data_cached(self):
+        self.image_store.add(WHITE_IMAGE)
+        self.assertEqual(WHITE_IMAGE.data, self.image_store.get(WHITE_IMAGE.identifier).data)
+        self.assertEqual(WHITE_IMAGE.data, self.image_store.get(WHITE_IMAGE.identifier).data)
+        self.assertEqual(1, self.image_store.cache.misses)
+        self.assertEqual(1, self.image_store.cache.hits)
+
+    def test_not_cached_until_read(self):
+        self.image_store.add(WHITE_IMAGE)
+        self.image_store.list()
+        self.assertEqual(0, len(self.image_store.cache))
+
+    def test_cache_bounded(self):
+        image_store = CachingImageStore(InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]), len(WHITE_IMAGE.data))
+        image_store.get(WHITE_IMAGE.identifier).data
+        image_store.get(BLACK_IMAGE.identifier).data
+        self.assertLessEqual(image_store.cache.size, len(WHITE_IMAGE.data))
+
+    def test_invalidated_on_remove(self):
+        self.image_store.add(WHITE_IMAGE)
+        self.image_store.get(WHITE_IMAGE.identifier).data
+        self.image_store.remove(WHITE_IMAGE.identifier)
+        self.assertEqual(0, len(self.image_store.cache))
+
+    def test_invalidated_on_underlying_store_events(self):
+        underlying_image_store = ListenableImageStore(InMemoryImageStore())
+        image_store = CachingImageStore(underlying_image_store)
+        underlying_image_store.add(WHITE_IMAGE)
+        image_store.get(WHITE_IMAGE.identifier).data
+
+        underlying_image_store.remove(WHITE_IMAGE.identifier)
+        replacement_image = DataBasedImage(WHITE_IMAGE.identifier, BLACK_IMAGE.data, BLACK_IMAGE.type)
+        underlying_image_store.add(replacement_image)
+        self.assertEqual(BLACK_IMAGE.data, image_store.get(WHITE_IMAGE.identifier).data)
+
+        underlying_image_store.remove_many([WHITE_IMAGE.identifier])
+        self.assertEqual(0, len(image_store.cache))
+
+    def test_replaced_image_not_read_from_old_image(self):
+        self.image_store.add(WHITE_IMAGE)
+        old_image = self.image_store.get(WHITE_IMAGE.identifier)
+        self.image_store.remove(WHITE_IMAGE.identifier)
+        self.image_store.add(DataBasedImage(WHITE_IMAGE.identifier, BLACK_IMAGE.data, BLACK_IMAGE.type))
+        # Reading the old image must not cache its data for the new image
+        self.assertEqual(WHITE_IMAGE.data, old_image.data)
+        self.assertEqual(BLACK_IMAGE.data, self.image_store.get(WHITE_IMAGE.identifier).data)
+
+    def test_pickled_without_cache(self):
+        self.image_store.add(WHITE_IMAGE)
+        image = self.image_store.get(WHITE_IMAGE.identifier)
+        image.data
+        self.assertEqual(WHITE_IMAGE, pickle.loads(pickle.dumps(image)))
+
+
+if __name__ == "__main__":
+    unittest.main()
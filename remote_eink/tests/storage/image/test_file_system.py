@@ -1,10 +1,18 @@
+import hashlib
+import io
+import mmap
 import os
 import shutil
 import tempfile
+import time
 import unittest
+from unittest.mock import patch
 
-from remote_eink.storage.image.file_system import FileSystemImageStore
+from remote_eink.images import DataBasedImage, FileBasedImage
+from remote_eink.storage.image.base import spool, ImageDataNotFoundError, SPOOL_FILE_PREFIX
+from remote_eink.storage.image.file_system import FileSystemImageStore, ConsistencyChecker, DeduplicationReport
 from remote_eink.storage.image.memory import InMemoryImageStore
+from remote_eink.storage.manifest.sqlite import SqliteManifest
 from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
 from remote_eink.tests.storage.image._common import AbstractTest
 
@@ -16,10 +24,13 @@ class TestFileSystemImageStore(AbstractTest.TestImageStore[InMemoryImageStore]):
 
     def setUp(self):
         self._temp_directories = []
+        self._image_stores = []
         super().setUp()
 
     def tearDown(self):
         super().tearDown()
+        for image_store in self._image_stores:
+            image_store.close()
         while len(self._temp_directories) > 0:
             directory = self._temp_directories.pop()
             shutil.rmtree(directory, ignore_errors=True)
@@ -27,7 +38,9 @@ class TestFileSystemImageStore(AbstractTest.TestImageStore[InMemoryImageStore]):
     def create_image_store(self, *args, **kwargs) -> FileSystemImageStore:
         temp_directory = tempfile.mkdtemp()
         self._temp_directories.append(temp_directory)
-        return FileSystemImageStore(temp_directory, *args, **kwargs)
+        image_store = FileSystemImageStore(temp_directory, *args, **kwargs)
+        self._image_stores.append(image_store)
+        return image_store
 
     def test_init_with_images(self):
         image_store = self.create_image_store([WHITE_IMAGE, BLACK_IMAGE])
@@ -41,6 +54,219 @@ class TestFileSystemImageStore(AbstractTest.TestImageStore[InMemoryImageStore]):
             store.list()
             self.assertTrue(os.path.exists(storage_directory))
 
+    def test_len_and_contains_without_checking_files(self):
+        self.image_store.add(WHITE_IMAGE)
+        with patch("remote_eink.storage.image.file_system.os.path.exists", side_effect=AssertionError()):
+            self.assertEqual(1, len(self.image_store))
+            self.assertNotIn(BLACK_IMAGE, self.image_store)
+            self.assertEqual([WHITE_IMAGE.identifier], list(self.image_store._iter_ids()))
+
+    def test_list_when_image_data_missing(self):
+        self.image_store.add(WHITE_IMAGE)
+        os.remove(os.path.join(self.image_store._root_directory, self._list_image_files(self.image_store)[0]))
+        (image,) = self.image_store.list()
+        self.assertEqual(WHITE_IMAGE.identifier, image.identifier)
+        self.assertRaises(ImageDataNotFoundError, lambda: image.data)
+        self.assertRaises(ImageDataNotFoundError, image.buffer)
+
+    def test_check_consistency(self):
+        self.image_store.add(WHITE_IMAGE)
+        self.image_store.add(BLACK_IMAGE)
+        self.assertTrue(self.image_store.check_consistency().consistent)
+
+        root_directory = self.image_store._root_directory
+        os.remove(os.path.join(root_directory, f"{WHITE_IMAGE.digest}.{WHITE_IMAGE.type.value}"))
+        for file_name in ("other", f"{SPOOL_FILE_PREFIX}in-progress"):
+            with open(os.path.join(root_directory, file_name), "wb") as file:
+                file.write(b"data")
+        report = self.image_store.check_consistency()
+        self.assertFalse(report.consistent)
+        self.assertEqual([WHITE_IMAGE.identifier], [manifest_record.identifier for manifest_record in report.missing])
+        self.assertEqual(["other"], report.unreferenced)
+
+    def test_consistency_checker(self):
+        self.image_store.add(WHITE_IMAGE)
+        checker = ConsistencyChecker(self.image_store)
+        self.assertIsNone(checker.last_report)
+        self.assertTrue(checker.check().consistent)
+
+        os.remove(os.path.join(self.image_store._root_directory, self._list_image_files(self.image_store)[0]))
+        with self.assertLogs("remote_eink.storage.image.file_system", level="WARNING") as logs:
+            report = checker.check()
+        self.assertFalse(report.consistent)
+        self.assertEqual(report, checker.last_report)
+        self.assertIn(WHITE_IMAGE.identifier, logs.output[0])
+
+    def test_consistency_checked_in_background(self):
+        self.assertIsNone(self.image_store.consistency_checker)
+        image_store = self.create_image_store(check_consistency_every_seconds=0.01)
+        image_store.add(WHITE_IMAGE)
+        with self.assertLogs("remote_eink.storage.image.file_system", level="WARNING"):
+            os.remove(os.path.join(image_store._root_directory, self._list_image_files(image_store)[0]))
+            for _ in range(500):
+                report = image_store.consistency_checker.last_report
+                if report is not None and not report.consistent:
+                    break
+                time.sleep(0.01)
+        self.assertFalse(image_store.consistency_checker.last_report.consistent)
+
+    def test_close_stops_consistency_checks(self):
+        self.image_store.start_consistency_checks(60)
+        checker = self.image_store.consistency_checker
+        self.assertTrue(checker._scheduler.running)
+        self.image_store.close()
+        self.assertFalse(checker._scheduler.running)
+
+    def test_consistency_checker_restart(self):
+        checker = ConsistencyChecker(self.image_store, 60)
+        checker.start()
+        checker.stop()
+        checker.start()
+        self.assertEqual(1, len(checker._scheduler.get_jobs()))
+        checker.stop()
+
+    def test_buffer_memory_mapped(self):
+        self.image_store.add(WHITE_IMAGE)
+        buffer = self.image_store.get(WHITE_IMAGE.identifier).buffer()
+        self.assertIsInstance(buffer.obj, mmap.mmap)
+        self.assertEqual(WHITE_IMAGE.data, bytes(buffer))
+
+    def test_digest_without_reading(self):
+        self.image_store.add(WHITE_IMAGE)
+        image = self.image_store.get(WHITE_IMAGE.identifier)
+        # Digest comes from the manifest so comparison should not require the file
+        os.remove(os.path.join(self.image_store._root_directory, f"{WHITE_IMAGE.digest}.{WHITE_IMAGE.type.value}"))
+        self.assertEqual(WHITE_IMAGE.digest, image.digest)
+        self.assertEqual(WHITE_IMAGE, image)
+
+    def test_add_spooled(self):
+        path, md5 = spool(io.BytesIO(WHITE_IMAGE.data), self.image_store.spool_directory)
+        self.image_store.add(FileBasedImage("spooled", path, WHITE_IMAGE.type, digest=md5, transferable=True))
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(WHITE_IMAGE.data, self.image_store.get("spooled").data)
+        self.assertEqual([f"{md5}.{WHITE_IMAGE.type.value}"], self._list_image_files(self.image_store))
+
+    def test_add_spooled_with_same_image_data(self):
+        self.image_store.add(WHITE_IMAGE)
+        path, md5 = spool(io.BytesIO(WHITE_IMAGE.data), self.image_store.spool_directory)
+        self.image_store.add(FileBasedImage("spooled", path, WHITE_IMAGE.type, digest=md5, transferable=True))
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(1, len(self._list_image_files(self.image_store)))
+
+    def test_add_file_based_not_transferable(self):
+        with tempfile.NamedTemporaryFile() as file:
+            file.write(WHITE_IMAGE.data)
+            file.flush()
+            self.image_store.add(FileBasedImage("file", file.name, WHITE_IMAGE.type))
+            self.assertTrue(os.path.exists(file.name))
+        self.assertEqual(WHITE_IMAGE.data, self.image_store.get("file").data)
+
+    def test_add_with_same_image_data_stored_once(self):
+        self.image_store.add(WHITE_IMAGE)
+        self.image_store.add(DataBasedImage("white-image-copy", WHITE_IMAGE.data, WHITE_IMAGE.type))
+        self.assertEqual(1, len(self._list_image_files(self.image_store)))
+
+    def test_remove_with_same_image_data(self):
+        white_image_copy = DataBasedImage("white-image-copy", WHITE_IMAGE.data, WHITE_IMAGE.type)
+        self.image_store.add(WHITE_IMAGE)
+        self.image_store.add(white_image_copy)
+        self.image_store.remove(WHITE_IMAGE.identifier)
+        self.assertEqual(white_image_copy, self.image_store.get(white_image_copy.identifier))
+        self.assertEqual(1, len(self._list_image_files(self.image_store)))
+        self.image_store.remove(white_image_copy.identifier)
+        self.assertEqual(0, len(self._list_image_files(self.image_store)))
+
+    def test_add_many_rolled_back_removes_data(self):
+        self.image_store.add(WHITE_IMAGE)
+        new_image = DataBasedImage("new-image", BLACK_IMAGE.data, BLACK_IMAGE.type)
+        with patch.object(self.image_store._manifest, "add", side_effect=RuntimeError()):
+            self.assertRaises(RuntimeError, self.image_store.add_many, [new_image])
+        self.assertEqual([WHITE_IMAGE], self.image_store.list())
+        self.assertEqual([f"{WHITE_IMAGE.digest}.{WHITE_IMAGE.type.value}"], self._list_image_files(self.image_store))
+
+    def test_replace_many_with_same_image_data(self):
+        self.image_store.add(WHITE_IMAGE)
+        replacement = DataBasedImage(WHITE_IMAGE.identifier, WHITE_IMAGE.data, WHITE_IMAGE.type, {"new": True})
+        self.image_store.replace_many([replacement])
+        self.assertEqual(replacement, self.image_store.get(WHITE_IMAGE.identifier))
+        self.assertEqual(WHITE_IMAGE.data, self.image_store.get(WHITE_IMAGE.identifier).data)
+        self.assertEqual(1, len(self._list_image_files(self.image_store)))
+
+    def test_thumbnail_kept(self):
+        self.image_store.add(WHITE_IMAGE)
+        thumbnail = self.image_store.get_thumbnail(WHITE_IMAGE.identifier, width=10)
+        self.assertIsInstance(thumbnail, FileBasedImage)
+        self.assertTrue(os.path.exists(thumbnail.path))
+        with patch("remote_eink.storage.image.file_system.create_thumbnail") as create_thumbnail:
+            self.assertEqual(thumbnail.data, self.image_store.get_thumbnail(WHITE_IMAGE.identifier, width=10).data)
+        create_thumbnail.assert_not_called()
+
+    def test_thumbnails_removed_with_image_data(self):
+        white_image_copy = DataBasedImage("white-image-copy", WHITE_IMAGE.data, WHITE_IMAGE.type)
+        self.image_store.add_many([WHITE_IMAGE, white_image_copy, BLACK_IMAGE])
+        thumbnails = [
+            self.image_store.get_thumbnail(WHITE_IMAGE.identifier, width=10),
+            self.image_store.get_thumbnail(WHITE_IMAGE.identifier, height=10),
+            self.image_store.get_thumbnail(BLACK_IMAGE.identifier, width=10),
+        ]
+        self.image_store.remove(WHITE_IMAGE.identifier)
+        self.assertTrue(all(os.path.exists(thumbnail.path) for thumbnail in thumbnails))
+        self.image_store.remove(white_image_copy.identifier)
+        self.assertEqual([False, False, True], [os.path.exists(thumbnail.path) for thumbnail in thumbnails])
+        self.assertTrue(self.image_store.check_consistency().consistent)
+
+    def test_deduplicate(self):
+        self.image_store.add(WHITE_IMAGE)
+        self.image_store.add(BLACK_IMAGE)
+        # Emulate a copy of the same content written before files were content-addressed
+        md5 = hashlib.md5(WHITE_IMAGE.data).hexdigest()
+        duplicate_location = f"{md5}-1.{WHITE_IMAGE.type.value}"
+        shutil.copyfile(
+            os.path.join(self.image_store._root_directory, f"{md5}.{WHITE_IMAGE.type.value}"),
+            os.path.join(self.image_store._root_directory, duplicate_location),
+        )
+        self.image_store._manifest.add("white-image-copy", WHITE_IMAGE.type, {}, duplicate_location)
+        assert len(self._list_image_files(self.image_store)) == 3
+
+        self.assertEqual(DeduplicationReport(removed=1), self.image_store.deduplicate())
+        self.assertEqual(2, len(self._list_image_files(self.image_store)))
+        self.assertEqual(WHITE_IMAGE.data, self.image_store.get("white-image-copy").data)
+        self.assertEqual(WHITE_IMAGE, self.image_store.get(WHITE_IMAGE.identifier))
+        self.assertEqual(BLACK_IMAGE, self.image_store.get(BLACK_IMAGE.identifier))
+        self.assertEqual(DeduplicationReport(removed=0), self.image_store.deduplicate())
+
+    def test_deduplicate_with_missing_data(self):
+        self.image_store.add(WHITE_IMAGE)
+        self.image_store.add(BLACK_IMAGE)
+        os.remove(os.path.join(self.image_store._root_directory, f"{WHITE_IMAGE.digest}.{WHITE_IMAGE.type.value}"))
+        with self.assertLogs("remote_eink.storage.image.file_system", level="WARNING"):
+            report = self.image_store.deduplicate()
+        self.assertEqual(0, report.removed)
+        self.assertEqual([WHITE_IMAGE.identifier], [manifest_record.identifier for manifest_record in report.missing])
+        self.assertEqual(BLACK_IMAGE, self.image_store.get(BLACK_IMAGE.identifier))
+
+    @staticmethod
+    def _list_image_files(image_store: FileSystemImageStore) -> list[str]:
+        return [
+            file_name for file_name in os.listdir(image_store._root_directory) if not file_name.startswith("manifest.")
+        ]
+
+
+class TestFileSystemImageStoreWithSqliteManifest(TestFileSystemImageStore):
+    """
+    Tests `FileSystemImageStore` with a `SqliteManifest`.
+    """
+
+    def create_image_store(self, *args, **kwargs) -> FileSystemImageStore:
+        return super().create_image_store(*args, manifest_type=SqliteManifest, **kwargs)
+
+    def test_migrate_from_tiny_db_manifest(self):
+        image_store = super().create_image_store([WHITE_IMAGE, BLACK_IMAGE])
+        image_store = FileSystemImageStore(image_store._root_directory, manifest_type=SqliteManifest)
+        self.assertIsInstance(image_store._manifest, SqliteManifest)
+        self.assertCountEqual((WHITE_IMAGE, BLACK_IMAGE), image_store.list())
+        self.assertFalse(os.path.exists(os.path.join(image_store._root_directory, "manifest.json")))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from io import BytesIO
+from typing import Tuple
+from unittest.mock import patch
+
+from PIL import Image as PilImage
+from PIL.JpegImagePlugin import JpegImageFile
+
+from remote_eink.images import Image
+from remote_eink.storage.image.thumbnail import create_thumbnail
+from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+
+
+def get_size(image: Image) -> Tuple[int, int]:
+    """
+    Gets the size of the given image.
+    :param image: image to get size of
+    :return: width, height tuple
+    """
+    return PilImage.open(BytesIO(image.data)).size
+
+
+class TestCreateThumbnail(unittest.TestCase):
+    """
+    Tests for `create_thumbnail`.
+    """
+
+    def test_with_width(self):
+        self.assertEqual((50, 100), get_size(create_thumbnail(WHITE_IMAGE, width=50)))
+
+    def test_with_height(self):
+        self.assertEqual((25, 50), get_size(create_thumbnail(WHITE_IMAGE, height=50)))
+
+    def test_with_width_and_height(self):
+        self.assertEqual((40, 80), get_size(create_thumbnail(BLACK_IMAGE, 50, 80)))
+
+    def test_keeps_image_properties(self):
+        thumbnail = create_thumbnail(BLACK_IMAGE, 10)
+        self.assertEqual(BLACK_IMAGE.identifier, thumbnail.identifier)
+        self.assertEqual(BLACK_IMAGE.type, thumbnail.type)
+        self.assertEqual(BLACK_IMAGE.metadata, thumbnail.metadata)
+        self.assertEqual(BLACK_IMAGE.type.value, PilImage.open(BytesIO(thumbnail.data)).format.lower())
+
+    def test_when_image_fits(self):
+        self.assertIs(WHITE_IMAGE, create_thumbnail(WHITE_IMAGE, 100, 200))
+
+    def test_jpeg_decoded_at_reduced_scale(self):
+        with patch.object(JpegImageFile, "draft", autospec=True, side_effect=JpegImageFile.draft) as draft:
+            create_thumbnail(WHITE_IMAGE, width=10)
+        self.assertEqual((10, 20), draft.call_args.args[2])
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, create_thumbnail, WHITE_IMAGE)
+        self.assertRaises(ValueError, create_thumbnail, WHITE_IMAGE, 0)
+        self.assertRaises(ValueError, create_thumbnail, WHITE_IMAGE, 10, -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+from abc import abstractmethod, ABCMeta
+from typing import TypeVar, Generic
+
+from remote_eink.images import ImageType
+from remote_eink.storage.manifest.base import Manifest, ManifestRecord, ManifestAlreadyExistsError
+
+_ManifestType = TypeVar("_ManifestType", bound=Manifest)
+
+EXAMPLE_RECORD_1 = ManifestRecord("image-1", ImageType.PNG, {"rotation": 90}, "location-1.png", "digest-1")
+EXAMPLE_RECORD_2 = ManifestRecord("image-2", ImageType.JPG, {}, "location-2.jpg", "digest-2")
+
+
+class AbstractTest:
+    class TestManifest(unittest.TestCase, Generic[_ManifestType], metaclass=ABCMeta):
+        """
+        Tests for `Manifest` implementations.
+        """
+
+        @abstractmethod
+        def create_manifest(self) -> _ManifestType:
+            """
+            Manifest to test.
+            :return: the manifest
+            """
+
+        def setUp(self):
+            super().setUp()
+            self.manifest: _ManifestType = self.create_manifest()
+
+        def add(self, manifest_record: ManifestRecord, manifest: Manifest = None):
+            manifest = manifest if manifest is not None else self.manifest
+            manifest.add(
+                manifest_record.identifier,
+                manifest_record.image_type,
+                manifest_record.metadata,
+                manifest_record.storage_location,
+                manifest_record.digest,
+            )
+
+        def test_add(self):
+            self.add(EXAMPLE_RECORD_1)
+            self.assertEqual(EXAMPLE_RECORD_1, self.manifest.get_by_image_id(EXAMPLE_RECORD_1.identifier))
+
+        def test_add_with_same_identifier(self):
+            self.add(EXAMPLE_RECORD_1)
+            self.assertRaises(ManifestAlreadyExistsError, self.add, EXAMPLE_RECORD_1)
+
+        def test_get_by_image_id_non_existent(self):
+            self.assertIsNone(self.manifest.get_by_image_id("does-not-exist"))
+
+        def test_get_by_storage_location(self):
+            self.add(EXAMPLE_RECORD_1)
+            self.add(EXAMPLE_RECORD_2)
+            self.assertEqual(EXAMPLE_RECORD_2, self.manifest.get_by_storage_location(EXAMPLE_RECORD_2.storage_location))
+            self.assertIsNone(self.manifest.get_by_storage_location("does-not-exist"))
+
+        def test_list_by_storage_location(self):
+            shared_record = ManifestRecord("image-3", ImageType.PNG, {}, EXAMPLE_RECORD_1.storage_location)
+            self.add(EXAMPLE_RECORD_1)
+            self.add(EXAMPLE_RECORD_2)
+            self.add(shared_record)
+            self.assertCountEqual(
+                (EXAMPLE_RECORD_1, shared_record),
+                self.manifest.list_by_storage_location(EXAMPLE_RECORD_1.storage_location),
+            )
+            self.assertEqual(2, self.manifest.get_reference_count(EXAMPLE_RECORD_1.storage_location))
+            self.assertEqual(0, self.manifest.get_reference_count("does-not-exist"))
+
+        def test_list_by_digest(self):
+            same_content_record = ManifestRecord(
+                "image-3", ImageType.PNG, {}, "location-3.png", EXAMPLE_RECORD_1.digest
+            )
+            self.add(EXAMPLE_RECORD_1)
+            self.add(EXAMPLE_RECORD_2)
+            self.add(same_content_record)
+            self.assertCountEqual(
+                (EXAMPLE_RECORD_1, same_content_record), self.manifest.list_by_digest(EXAMPLE_RECORD_1.digest)
+            )
+            self.manifest.remove(EXAMPLE_RECORD_1.identifier)
+            self.assertEqual([same_content_record], self.manifest.list_by_digest(EXAMPLE_RECORD_1.digest))
+            self.assertEqual([], self.manifest.list_by_digest("does-not-exist"))
+
+        def test_list(self):
+            self.assertEqual([], self.manifest.list())
+            self.add(EXAMPLE_RECORD_1)
+            self.add(EXAMPLE_RECORD_2)
+            self.assertCountEqual((EXAMPLE_RECORD_1, EXAMPLE_RECORD_2), self.manifest.list())
+
+        def test_count(self):
+            self.assertEqual(0, self.manifest.count())
+            self.add(EXAMPLE_RECORD_1)
+            self.add(EXAMPLE_RECORD_2)
+            self.assertEqual(2, self.manifest.count())
+
+        def test_iter_ids(self):
+            self.add(EXAMPLE_RECORD_1)
+            self.add(EXAMPLE_RECORD_2)
+            self.assertEqual(
+                [manifest_record.identifier for manifest_record in self.manifest.list()], list(self.manifest.iter_ids())
+            )
+
+        def test_list_ids(self):
+            for manifest_record in (EXAMPLE_RECORD_2, EXAMPLE_RECORD_1):
+                self.add(manifest_record)
+            image_ids = sorted((EXAMPLE_RECORD_1.identifier, EXAMPLE_RECORD_2.identifier))
+            self.assertEqual(image_ids, self.manifest.list_ids())
+            self.assertEqual(image_ids[:1], self.manifest.list_ids(limit=1))
+            self.assertEqual(image_ids[1:], self.manifest.list_ids(after=image_ids[0]))
+            self.assertEqual([], self.manifest.list_ids(limit=1, after=image_ids[1]))
+            self.manifest.remove(image_ids[0])
+            self.assertEqual(image_ids[1:], self.manifest.list_ids())
+
+        def test_remove(self):
+            self.add(EXAMPLE_RECORD_1)
+            self.add(EXAMPLE_RECORD_2)
+            self.assertTrue(self.manifest.remove(EXAMPLE_RECORD_1.identifier))
+            self.assertIsNone(self.manifest.get_by_image_id(EXAMPLE_RECORD_1.identifier))
+            self.assertIsNone(self.manifest.get_by_storage_location(EXAMPLE_RECORD_1.storage_location))
+            self.assertEqual([EXAMPLE_RECORD_2], self.manifest.list())
+
+        def test_relocate(self):
+            shared_record = ManifestRecord("image-3", ImageType.PNG, {}, EXAMPLE_RECORD_1.storage_location, "digest-1")
+            self.add(EXAMPLE_RECORD_1)
+            self.add(shared_record)
+            self.assertTrue(self.manifest.relocate(EXAMPLE_RECORD_1.identifier, "location-3.png", "digest-3"))
+            relocated_record = ManifestRecord(
+                EXAMPLE_RECORD_1.identifier,
+                EXAMPLE_RECORD_1.image_type,
+                EXAMPLE_RECORD_1.metadata,
+                "location-3.png",
+                "digest-3",
+            )
+            self.assertEqual(relocated_record, self.manifest.get_by_image_id(EXAMPLE_RECORD_1.identifier))
+            self.assertEqual([shared_record], self.manifest.list_by_storage_location(EXAMPLE_RECORD_1.storage_location))
+            self.assertEqual([relocated_record], self.manifest.list_by_storage_location("location-3.png"))
+            self.assertEqual([shared_record], self.manifest.list_by_digest("digest-1"))
+            self.assertEqual([relocated_record], self.manifest.list_by_digest("digest-3"))
+            self.assertEqual(2, self.manifest.count())
+
+        def test_relocate_non_existent(self):
+            self.assertFalse(self.manifest.relocate("does-not-exist", "location-3.png"))
+
+        def test_remove_non_existent(self):
+            self.assertFalse(self.manifest.remove("does-not-exist"))
@@ -0,0 +1,74 @@
+import time
+import unittest
+
+from remote_eink.images import ImageType
+from remote_eink.storage.manifest.memory import InMemoryManifest
+from remote_eink.tests.storage.manifest._common import AbstractTest
+
+
+class _ScanCountingDict(dict):
+    """
+    Dictionary that counts the number of times it is scanned.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scans = 0
+
+    def __iter__(self):
+        self.scans += 1
+        return super().__iter__()
+
+    def keys(self):
+        self.scans += 1
+        return super().keys()
+
+    def values(self):
+        self.scans += 1
+        return super().values()
+
+    def items(self):
+        self.scans += 1
+        return super().items()
+
+
+class TestInMemoryManifest(AbstractTest.TestManifest[InMemoryManifest]):
+    """
+    Tests `InMemoryManifest`.
+    """
+
+    def create_manifest(self) -> InMemoryManifest:
+        return InMemoryManifest()
+
+    def test_add_without_scanning_records(self):
+        manifest_records = _ScanCountingDict()
+        self.manifest._manifest_records = manifest_records
+        for i in range(1000):
+            storage_location = f"{i}.png"
+            # Mirrors the collision check made by stores before adding
+            assert self.manifest.get_by_storage_location(storage_location) is None
+            self.manifest.add(f"image-{i}", ImageType.PNG, {}, storage_location, str(i))
+            assert len(self.manifest.list_by_digest(str(i))) == 1
+        self.assertEqual(1000, self.manifest.count())
+        self.assertEqual(0, manifest_records.scans)
+
+    def test_list_ids_cost_flat(self):
+        page_size = 100
+
+        def time_page() -> float:
+            start_time = time.perf_counter()
+            for _ in range(100):
+                self.manifest.list_ids(page_size, "image-5")
+            return time.perf_counter() - start_time
+
+        for i in range(page_size):
+            self.manifest.add(f"image-{i}", ImageType.PNG, {}, f"{i}.png")
+        small_duration = time_page()
+        for i in range(page_size, 100000):
+            self.manifest.add(f"image-{i}", ImageType.PNG, {}, f"{i}.png")
+        # Generous bound as timings are noisy: the cost would grow by orders of magnitude if linear in manifest size
+        self.assertLess(time_page(), 10 * small_duration)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from remote_eink.storage.manifest.sqlite import SqliteManifest, migrate_from_tiny_db, MIGRATED_FILE_SUFFIX
+from remote_eink.storage.manifest.tiny_db import TinyDbManifest
+from remote_eink.tests.storage.manifest._common import AbstractTest, EXAMPLE_RECORD_1, EXAMPLE_RECORD_2
+
+
+class TestSqliteManifest(AbstractTest.TestManifest[SqliteManifest]):
+    """
+    Tests `SqliteManifest`.
+    """
+
+    def setUp(self):
+        self._temp_directory = tempfile.TemporaryDirectory()
+        super().setUp()
+
+    def tearDown(self):
+        self.manifest.close()
+        self._temp_directory.cleanup()
+        super().tearDown()
+
+    def create_manifest(self) -> SqliteManifest:
+        return SqliteManifest(os.path.join(self._temp_directory.name, "manifest.sqlite"))
+
+    def test_persisted(self):
+        self.add(EXAMPLE_RECORD_1)
+        manifest = self.create_manifest()
+        self.assertEqual([EXAMPLE_RECORD_1], manifest.list())
+        manifest.close()
+
+    def test_transaction(self):
+        with self.manifest.transaction():
+            self.add(EXAMPLE_RECORD_1)
+            with self.manifest.transaction():
+                self.add(EXAMPLE_RECORD_2)
+            self.assertEqual(EXAMPLE_RECORD_2, self.manifest.get_by_image_id(EXAMPLE_RECORD_2.identifier))
+        self.assertCountEqual((EXAMPLE_RECORD_1, EXAMPLE_RECORD_2), self.create_manifest().list())
+
+    def test_transaction_rolled_back_on_error(self):
+        self.add(EXAMPLE_RECORD_1)
+        try:
+            with self.manifest.transaction():
+                self.manifest.remove(EXAMPLE_RECORD_1.identifier)
+                self.add(EXAMPLE_RECORD_2)
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+        self.assertEqual([EXAMPLE_RECORD_1], self.manifest.list())
+
+    def test_migrate_from_tiny_db(self):
+        tiny_db_location = os.path.join(self._temp_directory.name, "manifest.json")
+        tiny_db_manifest = TinyDbManifest(tiny_db_location)
+        self.add(EXAMPLE_RECORD_1, tiny_db_manifest)
+        self.add(EXAMPLE_RECORD_2, tiny_db_manifest)
+        tiny_db_manifest.close()
+        # As if a previous migration was interrupted
+        self.add(EXAMPLE_RECORD_1)
+
+        self.assertEqual(1, migrate_from_tiny_db(tiny_db_location, self.manifest))
+        self.assertCountEqual((EXAMPLE_RECORD_1, EXAMPLE_RECORD_2), self.manifest.list())
+        self.assertFalse(os.path.exists(tiny_db_location))
+        self.assertTrue(os.path.exists(f"{tiny_db_location}{MIGRATED_FILE_SUFFIX}"))
+
+
+if __name__ == "__main__":
+    unittest.main()
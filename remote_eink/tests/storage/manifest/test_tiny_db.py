@@ -0,0 +1,113 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from tinydb import TinyDB
+from tinydb.table import Table
+
+from remote_eink.images import ImageType
+from remote_eink.storage.manifest.base import ManifestRecord
+from remote_eink.storage.manifest.tiny_db import TinyDbManifest, _ManifestRecordSchema
+from remote_eink.tests.storage.manifest._common import AbstractTest, EXAMPLE_RECORD_1, EXAMPLE_RECORD_2
+
+
+class TestTinyDbManifest(AbstractTest.TestManifest[TinyDbManifest]):
+    """
+    Tests `TinyDbManifest`.
+    """
+
+    def setUp(self):
+        self._temp_directory = tempfile.TemporaryDirectory()
+        super().setUp()
+
+    def tearDown(self):
+        self.manifest.close()
+        self._temp_directory.cleanup()
+        super().tearDown()
+
+    def create_manifest(self) -> TinyDbManifest:
+        return TinyDbManifest(os.path.join(self._temp_directory.name, "manifest.json"))
+
+    def test_persisted(self):
+        self.add(EXAMPLE_RECORD_1)
+        manifest = self.create_manifest()
+        self.assertEqual([EXAMPLE_RECORD_1], manifest.list())
+
+    def test_reload_when_changed_by_other_writer(self):
+        other_manifest = self.create_manifest()
+        self.add(EXAMPLE_RECORD_1)
+        self.assertEqual(EXAMPLE_RECORD_1, other_manifest.get_by_image_id(EXAMPLE_RECORD_1.identifier))
+        self.add(EXAMPLE_RECORD_2, other_manifest)
+        other_manifest.remove(EXAMPLE_RECORD_1.identifier)
+        self.assertEqual([EXAMPLE_RECORD_2], self.manifest.list())
+        self.assertIsNone(self.manifest.get_by_storage_location(EXAMPLE_RECORD_1.storage_location))
+
+    def test_relocate_persisted(self):
+        self.add(EXAMPLE_RECORD_1)
+        self.add(EXAMPLE_RECORD_2)
+        self.manifest.relocate(EXAMPLE_RECORD_1.identifier, EXAMPLE_RECORD_2.storage_location, EXAMPLE_RECORD_2.digest)
+        self.assertEqual(2, self.create_manifest().get_reference_count(EXAMPLE_RECORD_2.storage_location))
+
+    def test_transaction(self):
+        other_manifest = self.create_manifest()
+        with patch.object(Table, "insert", side_effect=AssertionError()):
+            with self.manifest.transaction():
+                self.add(EXAMPLE_RECORD_1)
+                self.add(EXAMPLE_RECORD_2)
+                self.manifest.remove(EXAMPLE_RECORD_1.identifier)
+                self.assertEqual([EXAMPLE_RECORD_2], self.manifest.list())
+                self.assertEqual([], other_manifest.list())
+        self.assertEqual([EXAMPLE_RECORD_2], other_manifest.list())
+        self.manifest.remove(EXAMPLE_RECORD_2.identifier)
+        self.assertEqual([], other_manifest.list())
+
+    def test_transaction_rolled_back_on_error(self):
+        self.add(EXAMPLE_RECORD_1)
+        try:
+            with self.manifest.transaction():
+                self.manifest.remove(EXAMPLE_RECORD_1.identifier)
+                self.add(EXAMPLE_RECORD_2)
+                raise RuntimeError()
+        except RuntimeError:
+            pass
+        self.assertEqual([EXAMPLE_RECORD_1], self.manifest.list())
+
+    def test_transaction_written_atomically(self):
+        self.add(EXAMPLE_RECORD_1)
+        with patch("os.replace", side_effect=OSError()):
+            with self.assertRaises(OSError):
+                with self.manifest.transaction():
+                    self.manifest.remove(EXAMPLE_RECORD_1.identifier)
+                    self.add(EXAMPLE_RECORD_2)
+        self.assertEqual([EXAMPLE_RECORD_1], self.create_manifest().list())
+        self.assertEqual(["manifest.json"], os.listdir(self._temp_directory.name))
+
+    def test_load_without_digest(self):
+        with TinyDB(self.manifest.database_location) as database:
+            database.insert({"id": "image", "image_type": "PNG", "metadata": {}, "storage_location": "image.png"})
+        self.assertEqual(
+            ManifestRecord("image", ImageType.PNG, {}, "image.png"), self.manifest.get_by_image_id("image")
+        )
+
+    def test_get_by_image_id_with_many_records(self):
+        number_of_records = 10000
+        schema = _ManifestRecordSchema()
+        with TinyDB(self.manifest.database_location) as database:
+            database.insert_multiple(
+                schema.dump(ManifestRecord(f"image-{i}", ImageType.PNG, {}, f"{i}.png", str(i)))
+                for i in range(number_of_records)
+            )
+        # First call loads the index
+        self.assertIsNotNone(self.manifest.get_by_image_id("image-0"))
+
+        start_time = time.perf_counter()
+        for i in range(number_of_records):
+            self.manifest.get_by_image_id(f"image-{i}")
+        duration_per_call = (time.perf_counter() - start_time) / number_of_records
+        self.assertLess(duration_per_call, 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from remote_eink.app_data import AppData, DispatchMode
+from remote_eink.controllers.cycling import CyclableDisplayController
+from remote_eink.controllers.simple import SimpleDisplayController
+from remote_eink.storage.image.memory import InMemoryImageStore
+from remote_eink.storage.image.file_system import FileSystemImageStore
+from remote_eink.tests._common import run_in_different_process
+from remote_eink.tests.drivers._common import DummyBaseDisplayDriver
+from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+
+
+class TestAppData(unittest.TestCase):
+    """
+    Tests `AppData`.
+    """
+
+    def setUp(self):
+        self.app_data = AppData(())
+
+    def tearDown(self):
+        self.app_data.destroy()
+
+    def test_file_system_image_stores_checked_until_destroyed(self):
+        with tempfile.TemporaryDirectory() as temp_directory:
+            image_store = FileSystemImageStore(temp_directory)
+            app_data = AppData((), file_system_image_stores=(image_store,))
+            self.assertTrue(image_store.consistency_checker._scheduler.running)
+            app_data.destroy()
+            self.assertFalse(image_store.consistency_checker._scheduler.running)
+
+    def test_display_controller_lock(self):
+        display_controller = SimpleDisplayController(DummyBaseDisplayDriver(), InMemoryImageStore())
+        self.app_data.add_display_controller(display_controller)
+        self.assertIs(display_controller.lock, self.app_data.get_display_controller_lock(display_controller.identifier))
+
+    def test_serving_request_pauses_pre_rendering_of_served_display(self):
+        display_controllers = [
+            CyclableDisplayController(DummyBaseDisplayDriver(), InMemoryImageStore([WHITE_IMAGE, BLACK_IMAGE]))
+            for _ in range(2)
+        ]
+        for display_controller in display_controllers:
+            self.app_data.add_display_controller(display_controller)
+        served, other = display_controllers
+        self.app_data.dispatch_mode = DispatchMode.DIRECT
+
+        def pre_render() -> tuple[bool, bool]:
+            served_future = served.pre_render_upcoming_images()
+            other_future = other.pre_render_upcoming_images()
+            other_future.result(timeout=10)
+            return served_future.done(), other_future.done()
+
+        self.assertEqual((False, True), self.app_data.dispatch(pre_render, dispatch_queue=served.identifier))
+
+    def test_destroy_closes_display_controllers(self):
+        display_controller = CyclableDisplayController(DummyBaseDisplayDriver(), InMemoryImageStore())
+        app_data = AppData((display_controller,))
+        with patch.object(display_controller, "close", wraps=display_controller.close) as close:
+            app_data.destroy()
+        close.assert_called_once()
+
+    def _dispatch_pid(self) -> tuple[int, bool]:
+        sender = self.app_data.communication_pipe.sender
+        with patch.object(sender, "call", wraps=sender.call) as call:
+            pid = self.app_data.dispatch(os.getpid)
+        return pid, call.called
+
+    def test_dispatch_auto_on_target_process(self):
+        self.assertEqual((os.getpid(), False), self._dispatch_pid())
+
+    def test_dispatch_auto_on_other_process(self):
+        app_data = self.app_data
+        self.assertEqual(os.getpid(), run_in_different_process(lambda: app_data.dispatch(os.getpid)))
+
+    def test_dispatch_direct(self):
+        self.app_data.dispatch_mode = DispatchMode.DIRECT
+        self.assertEqual((os.getpid(), False), self._dispatch_pid())
+
+    def test_dispatch_pipe(self):
+        self.app_data.dispatch_mode = DispatchMode.PIPE
+        self.assertEqual((os.getpid(), True), self._dispatch_pid())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from remote_eink.cache import LruCache
+
+
+class TestLruCache(unittest.TestCase):
+    """
+    Tests `LruCache`.
+    """
+
+    def setUp(self):
+        self.cache = LruCache[str, bytes](10)
+
+    def test_get(self):
+        self.assertTrue(self.cache.put("a", b"123"))
+        self.assertEqual(b"123", self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_put_replaces(self):
+        self.cache.put("a", b"123")
+        self.cache.put("a", b"12")
+        self.assertEqual(b"12", self.cache.get("a"))
+        self.assertEqual(2, self.cache.size)
+
+    def test_put_larger_than_cache(self):
+        self.assertFalse(self.cache.put("a", b"0" * 11))
+        self.assertNotIn("a", self.cache)
+        self.assertEqual(0, self.cache.size)
+
+    def test_evicts_least_recently_used(self):
+        self.cache.put("a", b"1234")
+        self.cache.put("b", b"1234")
+        self.cache.get("a")
+        self.cache.put("c", b"1234")
+        self.assertIn("a", self.cache)
+        self.assertNotIn("b", self.cache)
+        self.assertIn("c", self.cache)
+        self.assertEqual(8, self.cache.size)
+
+    def test_remove(self):
+        self.cache.put("a", b"1234")
+        self.assertTrue(self.cache.remove("a"))
+        self.assertFalse(self.cache.remove("a"))
+        self.assertEqual(0, self.cache.size)
+
+    def test_keys(self):
+        self.cache.put("a", b"1")
+        self.cache.put("b", b"1")
+        self.cache.get("a")
+        self.assertEqual(["b", "a"], self.cache.keys())
+
+    def test_clear(self):
+        self.cache.put("a", b"1234")
+        self.cache.put("b", b"1234")
+        self.cache.clear()
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.size)
+
+    def test_size_of(self):
+        cache = LruCache[str, str](10, size_of=lambda value: 5)
+        cache.put("a", "")
+        cache.put("b", "")
+        cache.put("c", "")
+        self.assertEqual(2, len(cache))
+
+
+if __name__ == "__main__":
+    unittest.main()
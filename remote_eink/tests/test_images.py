@@ -0,0 +1,92 @@
+import hashlib
+import io
+import unittest
+from unittest.mock import MagicMock
+
+from PIL import Image as PilImage
+
+from remote_eink.images import (
+    ImageBufferStream,
+    get_image_type_from_header,
+    ImageType,
+    IMAGE_TYPE_HEADER_SIZE,
+    FunctionBasedImage,
+)
+from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
+
+
+class TestImage(unittest.TestCase):
+    """
+    Tests `Image`.
+    """
+
+    def test_digest(self):
+        data_reader = MagicMock(return_value=WHITE_IMAGE.data)
+        image = FunctionBasedImage("image", data_reader, WHITE_IMAGE.type)
+        self.assertEqual(hashlib.md5(WHITE_IMAGE.data).hexdigest(), image.digest)
+        self.assertEqual(image.digest, image.digest)
+        self.assertEqual(1, data_reader.call_count)
+
+    def test_equality_uses_digest(self):
+        data_reader = MagicMock(side_effect=AssertionError("Data should not be read"))
+        image = FunctionBasedImage("image", data_reader, WHITE_IMAGE.type, digest=WHITE_IMAGE.digest)
+        other_image = FunctionBasedImage("image", data_reader, WHITE_IMAGE.type, digest=BLACK_IMAGE.digest)
+        self.assertEqual(FunctionBasedImage("image", data_reader, WHITE_IMAGE.type, digest=WHITE_IMAGE.digest), image)
+        self.assertNotEqual(other_image, image)
+        self.assertIn(WHITE_IMAGE.digest, repr(image))
+        self.assertFalse(data_reader.called)
+
+
+class TestImageBufferStream(unittest.TestCase):
+    """
+    Tests `ImageBufferStream`.
+    """
+
+    def setUp(self):
+        self.stream = ImageBufferStream(memoryview(b"0123456789"))
+
+    def test_read(self):
+        self.assertEqual(b"0123", self.stream.read(4))
+        self.assertEqual(b"456789", self.stream.read())
+        self.assertEqual(b"", self.stream.read(1))
+
+    def test_seek(self):
+        self.stream.seek(-2, io.SEEK_END)
+        self.assertEqual(b"89", self.stream.read())
+        self.stream.seek(2)
+        self.stream.seek(3, io.SEEK_CUR)
+        self.assertEqual(5, self.stream.tell())
+        self.assertEqual(b"5", self.stream.read(1))
+
+    def test_seek_negative(self):
+        self.assertRaises(ValueError, self.stream.seek, -1)
+
+    def test_open_with_pillow(self):
+        for image in (WHITE_IMAGE, BLACK_IMAGE):
+            with self.subTest(image=image.identifier):
+                expected = PilImage.open(io.BytesIO(image.data))
+                actual = PilImage.open(ImageBufferStream(image.buffer()))
+                self.assertEqual(expected.size, actual.size)
+                self.assertEqual(expected.tobytes(), actual.tobytes())
+
+
+class TestGetImageTypeFromHeader(unittest.TestCase):
+    """
+    Tests `get_image_type_from_header`.
+    """
+
+    def test_known_types(self):
+        for image_type in ImageType:
+            with self.subTest(image_type=image_type):
+                data = io.BytesIO()
+                PilImage.new("RGB", (4, 4)).save(data, image_type.name if image_type != ImageType.JPG else "JPEG")
+                header = data.getvalue()[:IMAGE_TYPE_HEADER_SIZE]
+                self.assertEqual(image_type, get_image_type_from_header(header))
+
+    def test_unknown_type(self):
+        self.assertIsNone(get_image_type_from_header(b"invalid"))
+        self.assertIsNone(get_image_type_from_header(b""))
+
+
+if __name__ == "__main__":
+    unittest.main()
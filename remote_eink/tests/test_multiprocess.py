@@ -0,0 +1,253 @@
+import os
+import pickle
+import subprocess
+import sys
+import time
+import unittest
+from contextlib import contextmanager
+from threading import Thread, Event, Lock
+from typing import Optional, Hashable, Iterator
+from unittest.mock import patch
+
+from multiprocessing_on_dill.connection import Pipe
+
+from remote_eink.images import DataBasedImage, FunctionBasedImage
+from remote_eink import multiprocess
+from remote_eink.multiprocess import (
+    SharedMemoryTransport,
+    CommunicationPipe,
+    _SharedMemoryPickler,
+    RequestTimeoutError,
+    QueueBusyError,
+    _Request,
+)
+from remote_eink.tests._common import run_in_different_process
+from remote_eink.tests.storage._common import WHITE_IMAGE
+
+_PROJECT_DIRECTORY = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_THRESHOLD = 16
+_PAYLOAD = os.urandom(1024)
+_released = Event()
+
+
+def _wait_until_released() -> bool:
+    return _released.wait(timeout=15)
+
+
+def _raise_error():
+    raise ValueError("error")
+
+
+def _shared_memory_segments() -> set[str]:
+    return set(os.listdir("/dev/shm"))
+
+
+class TestSharedMemoryTransport(unittest.TestCase):
+    """
+    Tests `SharedMemoryTransport`.
+    """
+
+    def setUp(self):
+        connection_1, connection_2 = Pipe(duplex=True)
+        self.sender = SharedMemoryTransport(connection_1, _THRESHOLD)
+        self.receiver = SharedMemoryTransport(connection_2, _THRESHOLD)
+        self.segments_before = _shared_memory_segments()
+
+    def test_send_small_payload(self):
+        with patch.object(multiprocess, "SharedMemory") as shared_memory:
+            self.sender.send(b"123")
+            self.assertEqual(b"123", self.receiver.recv())
+        self.assertFalse(shared_memory.called)
+
+    def test_send_large_payload(self):
+        connection = self.sender._connection
+        with patch.object(connection, "send_bytes", wraps=connection.send_bytes) as send_bytes:
+            self.sender.send(("a", _PAYLOAD, [_PAYLOAD]))
+        self.assertLess(len(send_bytes.call_args.args[0]), len(_PAYLOAD))
+        received = self.receiver.recv()
+        self.assertEqual(("a", _PAYLOAD, [_PAYLOAD]), received)
+        self.assertIs(received[1], received[2][0])
+        self.assertEqual(self.segments_before, _shared_memory_segments())
+
+    def test_send_image(self):
+        image = DataBasedImage("1", WHITE_IMAGE.data, WHITE_IMAGE.type)
+        self.sender.send(image)
+        self.assertEqual(image, self.receiver.recv())
+        self.assertEqual(self.segments_before, _shared_memory_segments())
+
+    def test_send_closure(self):
+        data = _PAYLOAD
+        self.sender.send(FunctionBasedImage("1", lambda: data, WHITE_IMAGE.type))
+        self.assertEqual(_PAYLOAD, self.receiver.recv().data)
+        self.assertEqual(self.segments_before, _shared_memory_segments())
+
+    def test_send_failure_releases_segments(self):
+        with patch.object(self.sender._connection, "send_bytes", side_effect=OSError()):
+            self.assertRaises(OSError, self.sender.send, _PAYLOAD)
+        self.assertEqual(self.segments_before, _shared_memory_segments())
+
+    def test_send_between_processes_without_resource_tracker_warnings(self):
+        # Run in a new interpreter so that the resource trackers' warnings (written when they exit) can be captured. The
+        # sender is forked before any segments are created, so it starts its own resource tracker
+        script = f"""
+from multiprocessing_on_dill.connection import Pipe
+from multiprocessing_on_dill.context import Process
+from remote_eink.multiprocess import SharedMemoryTransport
+
+def send(connection):
+    SharedMemoryTransport(connection, {_THRESHOLD}).send(bytes({len(_PAYLOAD)}))
+
+sender_connection, receiver_connection = Pipe(duplex=True)
+process = Process(target=send, args=(sender_connection,))
+process.start()
+assert SharedMemoryTransport(receiver_connection, {_THRESHOLD}).recv() == bytes({len(_PAYLOAD)})
+process.join()
+"""
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, timeout=60, cwd=_PROJECT_DIRECTORY
+        )
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertNotIn("resource_tracker", result.stderr)
+        self.assertEqual(self.segments_before, _shared_memory_segments())
+
+    def test_send_without_threshold(self):
+        connection_1, connection_2 = Pipe(duplex=True)
+        with patch.object(_SharedMemoryPickler, "persistent_id") as persistent_id:
+            SharedMemoryTransport(connection_1, None).send(_PAYLOAD)
+            self.assertEqual(_PAYLOAD, SharedMemoryTransport(connection_2, None).recv())
+        self.assertFalse(persistent_id.called)
+
+
+class TestCommunicationPipe(unittest.TestCase):
+    """
+    Tests `CommunicationPipe`.
+    """
+
+    def setUp(self):
+        _released.clear()
+        self.communication_pipe = CommunicationPipe(shared_memory_threshold=_THRESHOLD)
+        self.sender = self.communication_pipe.sender
+        self.receiver_thread = Thread(target=self.communication_pipe.receiver.run)
+        self.receiver_thread.start()
+        self.segments_before = _shared_memory_segments()
+
+    def tearDown(self):
+        _released.set()
+        self.sender.stop_receiver()
+        self.receiver_thread.join()
+
+    def test_communicate(self):
+        self.assertEqual(_PAYLOAD[::-1], self.sender.communicate(lambda data: data[::-1], _PAYLOAD))
+
+    def test_communicate_raises(self):
+        self.assertRaises(ValueError, self.sender.communicate, _raise_error)
+
+    def test_communicate_unpicklable_result(self):
+        self.assertRaises(RuntimeError, self.sender.communicate, lambda: (x for x in ()))
+
+    def test_communicate_concurrently(self):
+        results = []
+        thread = Thread(target=lambda: results.append(self.sender.communicate(_wait_until_released)))
+        thread.start()
+        self.assertEqual(1, self.sender.communicate(lambda: 1))
+        self.assertEqual([], results)
+        _released.set()
+        thread.join()
+        self.assertEqual([True], results)
+
+    def test_call_timeout(self):
+        self.assertRaises(RequestTimeoutError, self.sender.call, _wait_until_released, timeout=0.1)
+        _released.set()
+        self.assertEqual(2, self.sender.call(lambda x: x, (2,)))
+
+    def test_call_timeout_pickled(self):
+        error = pickle.loads(pickle.dumps(RequestTimeoutError(1, 0.1)))
+        self.assertEqual((1, 0.1), (error.request_id, error.timeout))
+
+    def test_communicate_from_different_process(self):
+        sender = self.sender
+        result = run_in_different_process(lambda: sender.communicate(lambda data: data[::-1], _PAYLOAD))
+        self.assertEqual(_PAYLOAD[::-1], result)
+        self.assertEqual(self.segments_before, _shared_memory_segments())
+
+    def test_communicate_from_different_processes_concurrently(self):
+        sender = self.sender
+        # Forked processes inherit the connection of this process
+        self.assertEqual(1, sender.communicate(lambda: 1))
+
+        def communicate_repeatedly() -> bool:
+            pid = os.getpid()
+            return all(sender.communicate(lambda x: x, (pid, i)) == (pid, i) for i in range(20))
+
+        results = []
+        threads = [
+            Thread(target=lambda: results.append(run_in_different_process(communicate_repeatedly))) for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([True, True, True], results)
+
+    def test_queued_requests_do_not_occupy_workers(self):
+        number_of_requests = multiprocess.DEFAULT_MAX_WORKERS + 1
+        threads = [
+            Thread(target=self.sender.call, args=(_wait_until_released,), kwargs=dict(queue="busy"))
+            for _ in range(number_of_requests)
+        ]
+        for thread in threads:
+            thread.start()
+        receiver = self.communication_pipe.receiver
+        while len(receiver._queues.get("busy", ())) < number_of_requests - 1:
+            time.sleep(0.01)
+        self.assertEqual(1, self.sender.call(lambda: 1, queue="other", timeout=5))
+        _released.set()
+        for thread in threads:
+            thread.join()
+
+    def test_request_context_given_queue(self):
+        queues = []
+
+        @contextmanager
+        def request_context(queue: Optional[Hashable]) -> Iterator[None]:
+            queues.append(queue)
+            yield
+
+        communication_pipe = CommunicationPipe(request_context)
+        receiver_thread = Thread(target=communication_pipe.receiver.run)
+        receiver_thread.start()
+        try:
+            communication_pipe.sender.call(lambda: 1, queue="display")
+            communication_pipe.sender.call(lambda: 1)
+        finally:
+            communication_pipe.sender.stop_receiver()
+            receiver_thread.join()
+        self.assertEqual(["display", None], queues)
+
+    def test_call_to_busy_queue_rejected(self):
+        self.assertRaises(RequestTimeoutError, self.sender.call, _wait_until_released, queue="hung", timeout=0.1)
+        self.assertRaises(QueueBusyError, self.sender.call, lambda: 1, queue="hung", timeout=5)
+        self.assertEqual(1, self.sender.call(lambda: 1, queue="other", timeout=5))
+        _released.set()
+        receiver = self.communication_pipe.receiver
+        while "hung" in receiver._current:
+            time.sleep(0.01)
+        self.assertEqual(1, self.sender.call(lambda: 1, queue="hung", timeout=5))
+
+    def test_overdue_requests_do_not_occupy_workers(self):
+        for i in range(multiprocess.DEFAULT_MAX_WORKERS):
+            self.assertRaises(RequestTimeoutError, self.sender.call, _wait_until_released, queue=i, timeout=0.1)
+        self.assertEqual(1, self.sender.call(lambda: 1, queue="other", timeout=5))
+
+    def test_respond_when_cannot_send(self):
+        connection = SharedMemoryTransport(Pipe(duplex=True)[0], _THRESHOLD)
+        request = _Request(connection, Lock(), 0, None, lambda: 1, (), {}, None)
+        with patch.object(connection, "send", side_effect=OSError()):
+            with self.assertLogs(multiprocess.logger, level="ERROR") as logs:
+                self.communication_pipe.receiver._respond(request, 1, False)
+        self.assertEqual(2, len(logs.records))
+        connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,19 @@
+import pickle
 import unittest
 from abc import abstractmethod, ABCMeta
+from io import BytesIO
 from threading import Semaphore
 from typing import TypeVar, Generic
 
+from PIL import Image as PilImage
+
+from remote_eink.images import DataBasedImage
+from remote_eink.tests.storage._common import WHITE_IMAGE
 from remote_eink.transformers.base import (
     ImageTransformer,
     InvalidConfigurationError,
     ListenableMutableImageTransformer,
+    RasterImage,
 )
 from remote_eink.transformers.simple import SimpleImageTransformer
 
@@ -66,3 +73,74 @@ class TestListenableImageTransformer(unittest.TestCase):
         )
         self.image_transformer.active = True
         self.assertTrue(changed.acquire(timeout=15))
+
+    def test_listen_to_configuration_change(self):
+        configurations = []
+        self.image_transformer.event_listeners.add_listener(
+            configurations.append, ListenableMutableImageTransformer.Event.CONFIGURATION
+        )
+        self.image_transformer.modify_configuration({"value": 1})
+        self.assertEqual([{"value": 1}], configurations)
+
+
+class TestRasterImage(unittest.TestCase):
+    """
+    Tests for `RasterImage`.
+    """
+
+    def setUp(self):
+        self.image = RasterImage.from_image(WHITE_IMAGE)
+
+    def test_from_image_when_raster_image(self):
+        self.assertIs(self.image, RasterImage.from_image(self.image))
+
+    def test_data_when_not_decoded(self):
+        self.assertEqual(WHITE_IMAGE.data, self.image.data)
+        self.assertEqual(WHITE_IMAGE, self.image)
+
+    def test_raster(self):
+        self.assertEqual(PilImage.open(BytesIO(WHITE_IMAGE.data)).size, self.image.raster.size)
+
+    def test_derive_with_raster(self):
+        raster = self.image.raster.rotate(90, expand=True)
+        derived_image = self.image.derive(raster, {"rotation": 90})
+        self.assertEqual({"rotation": 90}, derived_image.metadata)
+        self.assertEqual(raster.size, PilImage.open(BytesIO(derived_image.data)).size)
+
+    def test_raster_released_once_encoded(self):
+        derived_image = self.image.derive(self.image.raster.rotate(90, expand=True))
+        data = derived_image.data
+        self.assertIsNone(derived_image._raster)
+        self.assertEqual(data, derived_image.data)
+        self.assertEqual(PilImage.open(BytesIO(data)).size, derived_image.raster.size)
+
+    def test_raster_when_encoded_concurrently(self):
+        derived_image = self.image.derive(self.image.raster.rotate(90, expand=True))
+        lock = derived_image._lock
+        encoded = False
+
+        class EncodeOnRelease:
+            def __enter__(self):
+                lock.acquire()
+
+            def __exit__(self, *args):
+                nonlocal encoded
+                lock.release()
+                if not encoded:
+                    encoded = True
+                    derived_image.buffer()
+
+        derived_image._lock = EncodeOnRelease()
+        self.assertIsNotNone(derived_image.raster)
+        self.assertTrue(encoded)
+
+    def test_derive_with_metadata(self):
+        derived_image = self.image.derive(metadata={"rotation": 90})
+        self.assertEqual(WHITE_IMAGE.data, derived_image.data)
+        self.assertEqual({}, self.image.metadata)
+
+    def test_pickle(self):
+        derived_image = self.image.derive(self.image.raster.rotate(90, expand=True))
+        unpickled_image = pickle.loads(pickle.dumps(derived_image))
+        self.assertIsInstance(unpickled_image, DataBasedImage)
+        self.assertEqual(derived_image, unpickled_image)
@@ -3,11 +3,12 @@ import unittest
 from abc import ABCMeta
 from io import BytesIO
 from typing import Tuple, TypeVar, Generic
+from unittest.mock import patch
 
 import math
 from PIL import Image as PilImage
 
-from remote_eink.images import Image, FunctionBasedImage
+from remote_eink.images import Image, FunctionBasedImage, DataBasedImage, ImageType
 from remote_eink.tests.storage._common import WHITE_IMAGE
 from remote_eink.tests.transformers.test_base import AbstractTest
 from remote_eink.transformers.rotate import (
@@ -16,6 +17,7 @@ from remote_eink.transformers.rotate import (
     ImageRotationAwareRotateImageTransformer,
     ROTATION_METADATA_KEY,
 )
+from remote_eink.transformers.sequence import SimpleImageTransformerSequence
 
 EXAMPLE_ANGLE = 10
 EXAMPLE_EXPAND = False
@@ -33,6 +35,17 @@ def _get_size(image: Image) -> Tuple[int, int]:
     return PilImage.open(BytesIO(image.data)).size
 
 
+def _to_png(raster: PilImage.Image) -> bytes:
+    """
+    Encodes the given raster as a PNG.
+    :param raster: raster to encode
+    :return: PNG data
+    """
+    byte_io = BytesIO()
+    raster.save(byte_io, "PNG")
+    return byte_io.getvalue()
+
+
 def _calculate_new_size(image_size: Tuple[int, int], angle: float) -> Tuple[int, int]:
     """
     Calculates horizontal and vertical size of an image of the given size after it has been rotated by the given
@@ -77,6 +90,17 @@ class BaseTest(
         two_primary_colours = list(itertools.islice(sorted(new_colours, key=lambda y: y[0], reverse=True), 2))
         self.assertCountEqual(((0, 0, 0), (255, 255, 255)), (x[1] for x in two_primary_colours))
 
+    def test_right_angle_rotation_lossless(self):
+        self.image_transformer.expand = True
+        raster = PilImage.open(BytesIO(WHITE_IMAGE.data)).convert("RGB")
+        raster.putpixel((0, 0), (255, 0, 0))
+        image = DataBasedImage(WHITE_IMAGE.identifier, _to_png(raster), ImageType.PNG)
+        for angle, transpose in ((90, PilImage.Transpose.ROTATE_90), (180, PilImage.Transpose.ROTATE_180)):
+            with self.subTest(angle=angle):
+                self.image_transformer.angle = angle
+                rotated_raster = PilImage.open(BytesIO(self.image_transformer.transform(image).data))
+                self.assertEqual(list(raster.transpose(transpose).getdata()), list(rotated_raster.getdata()))
+
     def test_configuration(self):
         image_transformer = self.create_image_transformer(
             angle=EXAMPLE_ANGLE, expand=EXAMPLE_EXPAND, fill_color=EXAMPLE_FILL_COLOR
@@ -155,6 +179,34 @@ class TestImageRotationAwareRotateImageTransformer(BaseTest[ImageRotationAwareRo
         expected_size = _calculate_new_size(_get_size(image), 45 + 45)
         self.assertEqual(expected_size, _get_size(rotated_image))
 
+    def test_rotate_once_with_image_rotation(self):
+        self.image_transformer.angle = 90
+        image = DataBasedImage(WHITE_IMAGE.identifier, WHITE_IMAGE.data, WHITE_IMAGE.type, {ROTATION_METADATA_KEY: 90})
+        with patch.object(PilImage.Image, "rotate", autospec=True, side_effect=PilImage.Image.rotate) as pil_rotate:
+            self.image_transformer.transform(image).data
+        self.assertEqual(1, pil_rotate.call_count)
+        self.assertEqual(180, pil_rotate.call_args.args[1])
+
+
+class TestRotateRasterPipeline(unittest.TestCase):
+    """
+    Tests for chaining rotate image transformers.
+    """
+
+    def test_decoded_and_encoded_once(self):
+        image_transformers = SimpleImageTransformerSequence(
+            [RotateImageTransformer(f"rotate-{i}", angle=90) for i in range(3)]
+        )
+        with patch.object(PilImage, "open", wraps=PilImage.open) as pil_open, patch.object(
+            PilImage.Image, "save", autospec=True, side_effect=PilImage.Image.save
+        ) as pil_save:
+            image = image_transformers.transform(WHITE_IMAGE)
+            rotated_size = _get_size(image)
+            image.data
+        self.assertEqual(2, pil_open.call_count)  # once for the pipeline and once by `_get_size`
+        self.assertEqual(1, pil_save.call_count)
+        self.assertEqual(_calculate_new_size(_get_size(WHITE_IMAGE), 270), rotated_size)
+
 
 del BaseTest
 
@@ -3,6 +3,7 @@ from abc import ABCMeta, abstractmethod
 from threading import Semaphore
 from typing import Sequence, TypeVar, Generic
 
+from remote_eink.tests.storage._common import WHITE_IMAGE, BLACK_IMAGE
 from remote_eink.transformers.base import (
     ImageTransformer,
     InvalidPositionError,
@@ -129,6 +130,12 @@ class AbstractTest:
         def test_str(self):
             self.assertIsInstance(str(self.image_transformers), str)
 
+        def test_transform(self):
+            self.image_transformers.get_by_id(self.image_transformers_list[0].identifier).active = False
+            self.image_transformers.add(SimpleImageTransformer(lambda image: BLACK_IMAGE))
+            self.image_transformers.add(SimpleImageTransformer(lambda image: WHITE_IMAGE, active=False))
+            self.assertEqual(BLACK_IMAGE, self.image_transformers.transform(WHITE_IMAGE))
+
 
 class TestSimpleImageTransformerSequence(AbstractTest.TestImageTransformerSequence[SimpleImageTransformerSequence]):
     """
@@ -1,10 +1,15 @@
 import logging
 from abc import abstractmethod, ABCMeta
 from enum import unique, Enum, auto
-from typing import Dict, Any
+from io import BytesIO
+from threading import Lock
+from types import MappingProxyType
+from typing import Dict, Any, Optional
+
+from PIL import Image as PilImage
 
 from remote_eink.events import EventListenerController
-from remote_eink.images import Image, ImageType
+from remote_eink.images import Image, ImageType, ImageMetadata, ImageBufferStream, DataBasedImage
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +17,102 @@ ImageTypeToPillowFormat = {ImageType.BMP: "BMP", ImageType.JPG: "JPEG", ImageTyp
 assert len(ImageTypeToPillowFormat) == len(ImageType)
 
 
+class RasterImage(Image):
+    """
+    Image that holds its decoded raster, so that a chain of transforms only decodes and encodes the image once.
+
+    The raster is decoded from the source image when first required and encoded (to the image's type) when the data
+    is first required. If the raster is never decoded, the source image's data is used unchanged. Once encoded, the
+    raster is released so that the image only holds its data (the raster is decoded from the data if required again).
+    """
+
+    @staticmethod
+    def from_image(image: Image) -> "RasterImage":
+        """
+        Gets a raster image of the given image, which is decoded lazily.
+        :param image: image to get raster image of
+        :return: the given image if it is already a raster image, else a raster image backed by the given image
+        """
+        if isinstance(image, RasterImage):
+            return image
+        raster_image = RasterImage(image.identifier, None, image.type, image.metadata)
+        raster_image._source = image
+        return raster_image
+
+    @property
+    def raster(self) -> PilImage.Image:
+        """
+        Decoded raster of the image, which must not be modified in place (transform to a new raster instead).
+        :return: the raster
+        """
+        with self._lock:
+            raster = self._raster
+            if raster is None:
+                buffer = self._source.buffer() if self._source is not None else memoryview(self._data)
+                raster = PilImage.open(ImageBufferStream(buffer))
+                raster.load()
+                self._raster = raster
+        # Not read from `self._raster` here, as it may have been released by a concurrent call to `buffer`
+        return raster
+
+    @property
+    def data(self) -> bytes:
+        return bytes(self.buffer())
+
+    def buffer(self) -> memoryview:
+        with self._lock:
+            if self._data is None:
+                if self._source is not None:
+                    return self._source.buffer()
+                byte_io = BytesIO()
+                self._raster.save(byte_io, ImageTypeToPillowFormat[self.type])
+                self._data = byte_io.getvalue()
+                self._raster = None
+        return memoryview(self._data)
+
+    def __init__(
+        self,
+        identifier: str,
+        raster: Optional[PilImage.Image],
+        image_type: ImageType,
+        metadata: ImageMetadata = MappingProxyType({}),
+    ):
+        """
+        Constructor.
+        :param identifier: see `Image.__init__`
+        :param raster: decoded image raster
+        :param image_type: see `Image.__init__` (the raster is encoded as this type)
+        :param metadata: see `Image.__init__`
+        """
+        super().__init__(identifier, image_type, metadata=metadata)
+        self._raster = raster
+        self._source: Optional[Image] = None
+        self._data: Optional[bytes] = None
+        self._lock = Lock()
+
+    def derive(
+        self, raster: Optional[PilImage.Image] = None, metadata: Optional[ImageMetadata] = None
+    ) -> "RasterImage":
+        """
+        Creates a raster image from this image with a different raster and/or metadata.
+        :param raster: raster of the new image (shares this image's raster, undecoded if not yet decoded, if `None`)
+        :param metadata: metadata of the new image (this image's metadata if `None`)
+        :return: the new raster image
+        """
+        metadata = metadata if metadata is not None else self.metadata
+        if raster is not None:
+            return RasterImage(self.identifier, raster, self.type, metadata)
+        derived_image = RasterImage(self.identifier, None, self.type, metadata)
+        with self._lock:
+            derived_image._raster = self._raster
+            derived_image._source = self._source
+            derived_image._data = self._data
+        return derived_image
+
+    def __reduce__(self):
+        return DataBasedImage, (self.identifier, self.data, self.type, self.metadata)
+
+
 class InvalidConfigurationError(ValueError):
     def __init__(self, configuration: Any, details: str = ""):
         if details != "":
@@ -102,6 +203,26 @@ class ImageTransformer(metaclass=ABCMeta):
         return hash(self.identifier)
 
 
+class RasterImageTransformer(ImageTransformer, metaclass=ABCMeta):
+    """
+    Image transformer that operates on decoded rasters.
+
+    Given a `RasterImage`, the transformer works on its raster directly, therefore a chain of raster image transformers
+    decodes the image once, before the first transform, and encodes it once, when the result's data is read.
+    """
+
+    @abstractmethod
+    def transform_raster(self, image: RasterImage) -> RasterImage:
+        """
+        Applies transform to the given raster image and returns the result as a new raster image.
+        :param image: raster image to apply transform to
+        :return: resulting raster image
+        """
+
+    def transform(self, image: Image) -> Image:
+        return self.transform_raster(RasterImage.from_image(image))
+
+
 class BaseMutableImageTransformer(ImageTransformer, metaclass=ABCMeta):
     """
     Image transformer.
@@ -138,6 +259,7 @@ class ListenableMutableImageTransformer(ImageTransformer):
     class Event(Enum):
         ACTIVATE_STATE = auto()
         TRANSFORM = auto()
+        CONFIGURATION = auto()
 
     @property
     def active(self) -> bool:
@@ -169,7 +291,10 @@ class ListenableMutableImageTransformer(ImageTransformer):
         self.event_listeners = EventListenerController[ListenableMutableImageTransformer.Event]()
 
     def modify_configuration(self, configuration: Dict[str, Any]):
-        return self._image_transformer.modify_configuration(configuration)
+        self._image_transformer.modify_configuration(configuration)
+        self.event_listeners.call_listeners(
+            ListenableMutableImageTransformer.Event.CONFIGURATION, [self._image_transformer.configuration]
+        )
 
     def transform(self, image: Image) -> Image:
         transformed_image = self._image_transformer.transform(image)
@@ -1,20 +1,17 @@
 import logging
 from enum import Enum, unique
-from io import BytesIO
 from typing import Dict, Any
 
-from remote_eink.images import Image, FunctionBasedImage
+from remote_eink.images import ImageMetadata
 from remote_eink.transformers.base import (
-    ImageTypeToPillowFormat,
     InvalidConfigurationError,
     BaseMutableImageTransformer,
+    RasterImage,
+    RasterImageTransformer,
 )
 
 _logger = logging.getLogger(__name__)
 
-from PIL import Image as PilImage
-
-
 ROTATION_METADATA_KEY = "rotation"
 
 
@@ -29,30 +26,11 @@ class RotateConfigurationParameter(Enum):
     FILL_COLOR = "fill_color"
 
 
-class RotateImageTransformer(BaseMutableImageTransformer):
+class RotateImageTransformer(BaseMutableImageTransformer, RasterImageTransformer):
     """
     Transformer that rotates the image by a common angle (the rotation on the image itself is ignored).
     """
 
-    @staticmethod
-    def rotate(image: Image, angle: float, expand: bool, fill_color: str) -> bytes:
-        """
-        Rotates the given image according to the given specification.
-        :param image: image to rotate
-        :param angle: counter clockwise angle (in degrees) to rotate image by
-        :param expand: if true, expands the output image to make it large enough to hold the entire rotated image
-                       If false, makes the output image the same size as the input image.
-        :param fill_color: color for area outside the rotated image
-        :return: bytes of rotated image
-        """
-        if angle % 360 == 0:
-            return image.data
-        image_data = PilImage.open(BytesIO(image.data))
-        image_data = image_data.rotate(angle, expand=expand, fillcolor=fill_color)
-        byte_io = BytesIO()
-        image_data.save(byte_io, ImageTypeToPillowFormat[image.type])
-        return byte_io.getvalue()
-
     @property
     def configuration(self) -> Dict[str, Any]:
         return {
@@ -76,10 +54,11 @@ class RotateImageTransformer(BaseMutableImageTransformer):
         """
         Constructor.
         :param identifier: transformer's identifier
-        :param active: see `RotateImageTransformer.rotate`
-        :param angle: see `RotateImageTransformer.rotate`
-        :param expand: see `RotateImageTransformer.rotate`
-        :param fill_color: see `RotateImageTransformer.rotate`
+        :param active: whether the transformer is active
+        :param angle: counter clockwise angle (in degrees) to rotate images by
+        :param expand: if true, expands the output image to make it large enough to hold the entire rotated image.
+                       If false, makes the output image the same size as the input image
+        :param fill_color: color for area outside the rotated image
         """
         super().__init__(identifier, active)
         self.angle = angle
@@ -97,12 +76,21 @@ class RotateImageTransformer(BaseMutableImageTransformer):
             else:
                 raise InvalidConfigurationError(configuration, f"unknown property: {key}")
 
-    def transform(self, image: Image) -> Image:
-        return FunctionBasedImage(
-            image.identifier,
-            lambda: RotateImageTransformer.rotate(image, self.angle, self.expand, self.fill_color),
-            image.type,
-        )
+    def transform_raster(self, image: RasterImage) -> RasterImage:
+        return self._rotate_raster(image, self.angle, {})
+
+    def _rotate_raster(self, image: RasterImage, angle: float, metadata: ImageMetadata) -> RasterImage:
+        """
+        Rotates the given raster image according to this transformer's specification.
+        :param image: image to rotate
+        :param angle: counter clockwise angle (in degrees) to rotate image by
+        :param metadata: metadata of the rotated image
+        :return: rotated image
+        """
+        if angle % 360 == 0:
+            return image.derive(metadata=metadata)
+        raster = image.raster.rotate(angle, expand=self.expand, fillcolor=self.fill_color)
+        return image.derive(raster, metadata)
 
 
 class ImageRotationAwareRotateImageTransformer(RotateImageTransformer):
@@ -117,11 +105,6 @@ class ImageRotationAwareRotateImageTransformer(RotateImageTransformer):
             f"rotation)"
         )
 
-    def transform(self, image: Image) -> Image:
+    def transform_raster(self, image: RasterImage) -> RasterImage:
         image_rotation = image.metadata.get(ROTATION_METADATA_KEY, 0)
-        return FunctionBasedImage(
-            image.identifier,
-            lambda: RotateImageTransformer.rotate(image, self.angle + image_rotation, self.expand, self.fill_color),
-            image.type,
-            image.metadata,
-        )
+        return self._rotate_raster(image, self.angle + image_rotation, image.metadata)
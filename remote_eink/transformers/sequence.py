@@ -4,6 +4,7 @@ from functools import singledispatch, singledispatchmethod
 from typing import Sequence, Optional, Union, Iterator
 
 from remote_eink.events import EventListenerController
+from remote_eink.images import Image
 from remote_eink.transformers.base import InvalidPositionError, ImageTransformer
 
 
@@ -40,6 +41,17 @@ class ImageTransformerSequence(Sequence[ImageTransformer], metaclass=ABCMeta):
         :raises KeyError: when the image transformer is not in the sequence
         """
 
+    def transform(self, image: Image) -> Image:
+        """
+        Applies the active image transformers in the sequence, in order, to the given image.
+
+        Consecutive `RasterImageTransformer`s pass the decoded raster between themselves, so the image is decoded and
+        encoded once for the run rather than once per transformer.
+        :param image: image to transform
+        :return: transformed image
+        """
+        return apply_image_transformers(image, [transformer for transformer in self if transformer.active])
+
     @abstractmethod
     def add(self, image_transformer: ImageTransformer, position: Optional[int] = None):
         """
@@ -128,3 +140,15 @@ class SimpleImageTransformerSequence(ImageTransformerSequence):
             pass
         self.event_listeners.call_listeners(SimpleImageTransformerSequence.Event.REMOVE, [image_transformer, removed])
         return removed
+
+
+def apply_image_transformers(image: Image, image_transformers: Sequence[ImageTransformer]) -> Image:
+    """
+    Applies the given image transformers, in order, to the given image (see `ImageTransformerSequence.transform`).
+    :param image: image to transform
+    :param image_transformers: transformers to apply (regardless of whether they are active)
+    :return: transformed image
+    """
+    for image_transformer in image_transformers:
+        image = image_transformer.transform(image)
+    return image